@@ -0,0 +1,169 @@
+"""Motion Graphics — Benchmark Suite
+
+Renders every implemented registry preset with its fixture params (see
+benchmarks/fixtures.py) over a matrix of item counts and durations, each case
+in a fresh process, and records frames/s, wall time per phase, peak RSS and
+output size from the render's metrics record (shared.metrics).
+
+    python3 -m benchmarks.bench -o baseline.json                  # full matrix
+    python3 -m benchmarks.bench --quick -o quick.json             # 3 items, 4 s
+    python3 -m benchmarks.bench --quick --compare quick.json      # flag regressions
+    python3 -m benchmarks.bench --presets title_card,listicle_scroll --items 10 --durations 4,30
+
+--compare exits with status 1 when a case got slower (wall time, frames/s),
+heavier (peak RSS) or bigger (output) than the baseline by more than
+--threshold. Run from the motion-graphics directory.
+"""
+import sys, os, json, time, platform, subprocess, tempfile
+from shared.profiles import load_registry
+from benchmarks.fixtures import load_fixtures, with_items, item_count
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ITEM_COUNTS = (3, 10, 30)
+DURATIONS = (4.0, 12.0, 30.0)
+QUICK = {"items": (3,), "durations": (4.0,)}
+THRESHOLD = 0.10
+# Below these, differences are timer/allocator noise rather than regressions
+MIN_DELTA = {"wall_s": 0.05, "peak_rss_mb": 5.0, "output_bytes": 4096}
+
+
+def implemented_presets():
+    return [p for p in load_registry()["presets"] if os.path.exists(os.path.join(ROOT, p["script"]))]
+
+
+def cases(fixtures, presets=None, items=ITEM_COUNTS, durations=DURATIONS, width=1920, height=1080, extra=None):
+    """(case id, preset entry, params) for every preset × item count × duration."""
+    for entry in implemented_presets():
+        if presets and entry["id"] not in presets:
+            continue
+        base = fixtures.get(entry["id"])
+        if base is None:
+            continue
+        counts = items if item_count(base) else (None,)
+        for n in counts:
+            for duration in durations:
+                params = dict(with_items(base, n) if n else base, duration=duration,
+                              width=width, height=height, **(extra or {}))
+                case_id = f"{entry['id']}/{n}i/{duration:g}s/{width}x{height}" if n else \
+                          f"{entry['id']}/{duration:g}s/{width}x{height}"
+                yield case_id, entry, params
+
+
+def run_case(entry, params, work_dir):
+    """Render one case in a fresh process; returns the summarised metrics record."""
+    out = os.path.join(work_dir, entry["id"] + ".mp4")
+    metrics_path = os.path.join(work_dir, entry["id"] + ".metrics.json")
+    params = dict(params, metrics_path=metrics_path)
+    proc = subprocess.run([sys.executable, os.path.join(ROOT, entry["script"]), json.dumps(params), out],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError((proc.stderr or proc.stdout).strip()[-500:])
+    with open(metrics_path, encoding="utf-8") as f:
+        m = json.load(f)
+    os.unlink(m.get("output", out))
+    rss = m["peak_rss_mb"]
+    return {
+        "frames": m["frames"],
+        "wall_s": m["wall_s"],
+        "fps": round(m["frames"] / m["wall_s"], 2) if m["wall_s"] else None,
+        "spans_s": m["spans_s"],
+        "peak_rss_mb": round(rss["python"] + rss["children"], 1),
+        "peak_rss_python_mb": rss["python"],
+        "peak_rss_ffmpeg_mb": rss["children"],
+        "output_bytes": m["counters"].get("output_bytes"),
+    }
+
+
+def run(presets=None, items=ITEM_COUNTS, durations=DURATIONS, width=1920, height=1080, repeat=1,
+        extra=None, log=print):
+    """Run the suite; with repeat > 1 the fastest run of each case is kept."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="mg-bench-") as work_dir:
+        fixtures = load_fixtures(os.path.join(work_dir, "assets"))
+        for case_id, entry, params in cases(fixtures, presets, items, durations, width, height, extra):
+            best = None
+            try:
+                for _ in range(repeat):
+                    r = run_case(entry, params, work_dir)
+                    if best is None or r["wall_s"] < best["wall_s"]:
+                        best = r
+            except RuntimeError as e:
+                log(f"  FAIL {case_id}: {e}")
+                results[case_id] = {"error": str(e)}
+                continue
+            results[case_id] = best
+            log(f"  {case_id:42s} {best['wall_s']:7.2f}s {best['fps']:7.1f} fps "
+                f"{best['peak_rss_mb']:7.0f} MB {best['output_bytes'] / 1e6:7.2f} MB out")
+    return {
+        "machine": {"node": platform.node(), "cpus": os.cpu_count(), "python": platform.python_version()},
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {"width": width, "height": height, "items": list(items), "durations": list(durations),
+                     "repeat": repeat, **(extra or {})},
+        "cases": results,
+    }
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """Per-case relative changes; returns (rows, regressions)."""
+    rows, regressions = [], []
+    for case_id, cur in current["cases"].items():
+        base = baseline["cases"].get(case_id)
+        if not base or "error" in base or "error" in cur:
+            continue
+        for key, higher_is_worse in (("wall_s", True), ("fps", False), ("peak_rss_mb", True), ("output_bytes", True)):
+            b, c = base.get(key), cur.get(key)
+            if not b or c is None:
+                continue
+            change = (c - b) / b
+            worse = change if higher_is_worse else -change
+            floor = MIN_DELTA.get(key, 0)
+            regressed = worse > threshold and (floor == 0 or abs(c - b) > floor)
+            rows.append((case_id, key, b, c, change, regressed))
+            if regressed:
+                regressions.append((case_id, key, b, c, change))
+    return rows, regressions
+
+
+def print_comparison(rows, log=print):
+    for case_id, key, b, c, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        log(f"  {case_id:42s} {key:12s} {b:12.2f} → {c:12.2f} {change:+7.1%}{flag}")
+
+
+def _csv(value, cast):
+    return tuple(cast(v) for v in value.split(",")) if value else None
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Benchmark every implemented motion graphics preset")
+    ap.add_argument("--presets", help="comma-separated registry ids (default: all implemented)")
+    ap.add_argument("--items", help=f"comma-separated item counts (default: {','.join(map(str, ITEM_COUNTS))})")
+    ap.add_argument("--durations", help="comma-separated durations in seconds (default: 4,12,30)")
+    ap.add_argument("--quick", action="store_true", help="3 items, 4 s only")
+    ap.add_argument("--size", default="1920x1080")
+    ap.add_argument("--params", default="{}", help="extra params for every case, e.g. '{\"profile\": \"draft\"}'")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("-o", "--output", help="write the results JSON (a new baseline) here")
+    ap.add_argument("--compare", help="baseline JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=THRESHOLD, help="relative change counted as regression")
+    args = ap.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    items = _csv(args.items, int) or (QUICK["items"] if args.quick else ITEM_COUNTS)
+    durations = _csv(args.durations, float) or (QUICK["durations"] if args.quick else DURATIONS)
+    presets = set(_csv(args.presets, str) or ())
+    results = run(presets, items, durations, width, height, args.repeat, json.loads(args.params))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows, regressions = compare(baseline, results, args.threshold)
+        print_comparison(rows)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print("No regressions")
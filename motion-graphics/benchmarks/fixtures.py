@@ -0,0 +1,113 @@
+"""Motion Graphics — Benchmark Fixtures
+
+Canonical params per registry preset (fixtures.json). Asset paths are written
+as tokens ("@thumbnail", "@portrait", "@logo") and resolved to generated
+placeholder images, so runs are reproducible without project media.
+"""
+import os, json, copy
+from PIL import Image, ImageDraw
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures.json")
+
+# token → (size, format); sizes are typical of what the pipeline downloads
+PLACEHOLDER_ASSETS = {
+    "@thumbnail": ((1280, 720), "JPEG"),
+    "@portrait": ((800, 1000), "JPEG"),
+    "@logo": ((256, 256), "PNG"),
+}
+
+
+def make_placeholder(path, size, fmt):
+    """Deterministic gradient with some shapes: compresses and decodes like a real photo would."""
+    w, h = size
+    img = Image.linear_gradient("L").resize((w, h)).convert("RGB")
+    img = Image.merge("RGB", (img.getchannel(0), img.getchannel(0).rotate(90, expand=False).resize((w, h)),
+                              Image.new("L", (w, h), 96)))
+    draw = ImageDraw.Draw(img)
+    for i in range(12):
+        x, y = (i * 97) % w, (i * 61) % h
+        r = max(8, min(w, h) // (4 + i % 5))
+        draw.ellipse([(x - r, y - r), (x + r, y + r)], fill=((i * 53) % 256, (i * 101) % 256, (i * 29) % 256))
+    if fmt == "PNG":
+        img = img.convert("RGBA")
+        mask = Image.new("L", (w, h), 0)
+        ImageDraw.Draw(mask).ellipse([(0, 0), (w - 1, h - 1)], fill=255)
+        img.putalpha(mask)
+        img.save(path, "PNG")
+    else:
+        img.save(path, fmt, quality=88)
+    return path
+
+
+def placeholder_assets(asset_dir):
+    """Generate (once) the placeholder images in asset_dir; returns token → path."""
+    os.makedirs(asset_dir, exist_ok=True)
+    paths = {}
+    for token, (size, fmt) in PLACEHOLDER_ASSETS.items():
+        path = os.path.join(asset_dir, f"{token[1:]}_{size[0]}x{size[1]}.{'png' if fmt == 'PNG' else 'jpg'}")
+        if not os.path.exists(path):
+            make_placeholder(path, size, fmt)
+        paths[token] = path
+    return paths
+
+
+def _resolve(value, assets):
+    if isinstance(value, str):
+        return assets.get(value, "") if value.startswith("@") else value
+    if isinstance(value, list):
+        return [_resolve(v, assets) for v in value]
+    if isinstance(value, dict):
+        return {k: _resolve(v, assets) for k, v in value.items()}
+    return value
+
+
+def load_fixtures(asset_dir=None, path=FIXTURES_PATH):
+    """Fixture params per preset id, asset tokens resolved (to "" without an asset_dir)."""
+    with open(path, encoding="utf-8") as f:
+        fixtures = json.load(f)
+    assets = placeholder_assets(asset_dir) if asset_dir else {}
+    return {preset: _resolve(params, assets) for preset, params in fixtures.items()}
+
+
+def _lists(value, path=()):
+    if isinstance(value, list):
+        yield path
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            yield from _lists(v, path + (k,))
+
+
+def item_count(params):
+    return sum(len(_get(params, p)) for p in _lists(params))
+
+
+def _get(value, path):
+    for k in path:
+        value = value[k]
+    return value
+
+
+def with_items(params, n):
+    """Copy of params whose lists together hold n entries (spread evenly, entries cycled).
+
+    Repeated dict entries get a numbered label so every card stays distinct.
+    Returns params unchanged for presets without lists.
+    """
+    paths = list(_lists(params))
+    if not paths:
+        return params
+    params = copy.deepcopy(params)
+    for i, path in enumerate(paths):
+        src = _get(params, path)
+        want = n // len(paths) + (1 if i < n % len(paths) else 0)
+        out = []
+        for j in range(want):
+            entry = copy.deepcopy(src[j % len(src)])
+            if j >= len(src) and isinstance(entry, dict) and "label" in entry:
+                entry["label"] = f"{entry['label']} {j + 1}"
+            elif j >= len(src) and isinstance(entry, str):
+                entry = f"{entry} {j + 1}"
+            out.append(entry)
+        parent = _get(params, path[:-1])
+        parent[path[-1]] = out
+    return params
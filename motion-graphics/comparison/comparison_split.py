@@ -12,22 +12,27 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from PIL import Image, ImageDraw
 from shared.colors import get_theme, hex_to_rgba
+from shared.metrics import timed
+from shared.assets import fit_image, asset_exists
 from shared.fonts import get_font, get_text_size
-from shared.grid_background import create_grid_background
-from shared.render import render_frames_to_video, ease_out_cubic, clamp
+from shared.profiles import get_profile
+from shared.layout import get_layout
+from shared.grid_background import create_frame_background
+from shared.scene import Scene, render_preset, job_from_argv
+from shared.sidecar import event
+from shared.render import ease_out_cubic, clamp
 
 
+@timed("assets")
 def load_logo(path, size=48):
     try:
-        if path and os.path.exists(path):
-            img = Image.open(path).convert("RGBA")
-            img = img.resize((size, size), Image.LANCZOS)
-            return img
+        if asset_exists(path):
+            return fit_image(path, size, size, crop=False)
     except: pass
     return None
 
 
-def render(params, output_path):
+def build_scene(params):
     theme = get_theme(params)
     title = params.get("title", "")
     left = params.get("left", {})
@@ -36,10 +41,11 @@ def render(params, output_path):
     source = params.get("source", "")
     duration = params.get("duration", 5.0)
     stagger = params.get("stagger_delay", 0.25)
-    fps = 30
-    W, H = 1920, 1080
+    profile = get_profile(params)
+    fps = profile["fps"]
+    L = get_layout(params, profile)
+    W, H, u = L.W, L.H, L.u
 
-    total_frames = int(duration * fps)
     slide_dur = 0.6
     point_dur = 0.35
 
@@ -49,76 +55,72 @@ def render(params, output_path):
     right_heading = right.get("heading", "")
     left_points = left.get("points", [])
     right_points = right.get("points", [])
-    left_logo = load_logo(left.get("logo_path", ""), 52)
-    right_logo = load_logo(right.get("logo_path", ""), 52)
+    left_logo = load_logo(left.get("logo_path", ""), u(52))
+    right_logo = load_logo(right.get("logo_path", ""), u(52))
 
     max_points = max(len(left_points), len(right_points), 1)
 
     # Dynamic font sizes - BIGGER than v2
     if max_points <= 4:
-        pt_size = 28
-        pt_spacing = 58
+        pt_size = u(28)
+        pt_spacing = u(58)
     elif max_points <= 7:
-        pt_size = 24
-        pt_spacing = 46
+        pt_size = u(24)
+        pt_spacing = u(46)
     else:
-        pt_size = 20
-        pt_spacing = 38
+        pt_size = u(20)
+        pt_spacing = u(38)
 
-    font_title = get_font(theme["font_title"], 52)
-    font_heading = get_font(theme["font_title"], 40)
+    font_title = get_font(theme["font_title"], u(52))
+    font_heading = get_font(theme["font_title"], u(40))
     font_point = get_font(theme["font_body"], pt_size)
-    font_conclusion = get_font(theme["font_body"], 24)
-    font_source = get_font(theme["font_body"], 16)
+    font_conclusion = get_font(theme["font_body"], u(24))
+    font_source = get_font(theme["font_body"], u(16))
 
-    bg = create_grid_background(W, H, theme)
+    bg, plate = create_frame_background(W, H, theme, params)
     text_color = hex_to_rgba(theme["primary_text"], 255)
     sub_color = hex_to_rgba(theme["secondary_text"], 255)
 
     # Layout - more centered
     half = W // 2
-    title_h = 100 if title else 0
-    source_h = 40 if source else 0
-    conclusion_h = 70 if conclusion else 0
+    title_h = u(100) if title else 0
+    source_h = u(40) if source else 0
+    conclusion_h = u(70) if conclusion else 0
     bottom_reserve = source_h + conclusion_h
 
     # Content area centered vertically
-    content_needed = 70 + max_points * pt_spacing  # heading + points
-    content_top = max(title_h + 40, (H - content_needed - bottom_reserve) // 2)
+    content_needed = u(70) + max_points * pt_spacing  # heading + points
+    content_top = max(title_h + u(40), (H - content_needed - bottom_reserve) // 2)
 
     # Horizontal: push content more toward center
-    left_x = half - 520  # closer to center than v2
-    right_x = half + 80
-
-    frames = []
+    left_x = half - u(520)  # closer to center than v2
+    right_x = half + u(80)
 
-    for fi in range(total_frames):
-        frame = bg.copy()
+    def draw_frame(frame, tsec):
         draw = ImageDraw.Draw(frame)
-        tsec = fi / fps
 
         # Title
         if title:
             tw, th = get_text_size(draw, title, font_title)
-            draw.text(((W - tw) // 2, 45), title, fill=text_color, font=font_title)
+            draw.text(((W - tw) // 2, u(45)), title, fill=text_color, font=font_title)
 
         # Divider
         div_t = clamp(tsec / slide_dur)
         div_prog = ease_out_cubic(div_t)
-        div_top = content_top - 10
-        div_bot = H - bottom_reserve - 20
+        div_top = content_top - u(10)
+        div_bot = H - bottom_reserve - u(20)
         div_h = int((div_bot - div_top) * div_prog)
         mid_y = (div_top + div_bot) // 2
         draw.line([(half, mid_y - div_h//2), (half, mid_y + div_h//2)],
-                  fill=(*sub_color[:3], 140), width=2)
+                  fill=(*sub_color[:3], 140), width=u(2))
 
         # VS badge
         if div_prog > 0.5:
             vs_a = int(255 * min(1, (div_prog - 0.5) * 2))
-            vs_font = get_font(theme["font_title"], 22)
+            vs_font = get_font(theme["font_title"], u(22))
             draw.rounded_rectangle(
-                [(half - 24, mid_y - 18), (half + 24, mid_y + 18)],
-                radius=18, fill=(26, 26, 46, vs_a), outline=(*sub_color[:3], vs_a), width=1
+                [(half - u(24), mid_y - u(18)), (half + u(24), mid_y + u(18))],
+                radius=u(18), fill=(26, 26, 46, vs_a), outline=(*sub_color[:3], vs_a), width=u(1)
             )
             vw, vh = get_text_size(draw, "VS", vs_font)
             draw.text((half - vw//2, mid_y - vh//2), "VS", fill=(*sub_color[:3], vs_a), font=vs_font)
@@ -126,7 +128,7 @@ def render(params, output_path):
         # === LEFT SIDE ===
         l_slide = clamp(tsec / slide_dur)
         l_prog = ease_out_cubic(l_slide)
-        l_offset = int((1 - l_prog) * -120)
+        l_offset = int((1 - l_prog) * -u(120))
         la = int(255 * l_prog)
 
         if la > 0:
@@ -138,15 +140,15 @@ def render(params, output_path):
                 r2, g2, b2, a2 = lc.split()
                 a2 = a2.point(lambda p: int(p * logo_a / 255))
                 lc = Image.merge("RGBA", (r2, g2, b2, a2))
-                frame.paste(lc, (left_x + l_offset, content_top - 5), lc)
-                logo_offset = 60
+                frame.paste(lc, (left_x + l_offset, content_top - u(5)), lc)
+                logo_offset = u(60)
 
             draw.text((left_x + l_offset + logo_offset, content_top),
                       left_heading, fill=(*left_color[:3], la), font=font_heading)
             hw, hh = get_text_size(draw, left_heading, font_heading)
             draw.rectangle(
-                [(left_x + l_offset + logo_offset, content_top + hh + 8),
-                 (left_x + l_offset + logo_offset + hw, content_top + hh + 12)],
+                [(left_x + l_offset + logo_offset, content_top + hh + u(8)),
+                 (left_x + l_offset + logo_offset + hw, content_top + hh + u(12))],
                 fill=(*left_color[:3], la)
             )
 
@@ -157,18 +159,18 @@ def render(params, output_path):
             if pt_t <= 0: continue
             pt_prog = ease_out_cubic(pt_t)
             pa = int(255 * pt_prog)
-            py = content_top + 70 + i * pt_spacing
+            py = content_top + u(70) + i * pt_spacing
 
             draw.rounded_rectangle(
-                [(left_x, py + 6), (left_x + 12, py + 18)],
-                radius=3, fill=(*left_color[:3], pa)
+                [(left_x, py + u(6)), (left_x + u(12), py + u(18))],
+                radius=u(3), fill=(*left_color[:3], pa)
             )
-            draw.text((left_x + 22, py), pt, fill=(*text_color[:3], pa), font=font_point)
+            draw.text((left_x + u(22), py), pt, fill=(*text_color[:3], pa), font=font_point)
 
         # === RIGHT SIDE ===
         r_slide = clamp(tsec / slide_dur)
         r_prog = ease_out_cubic(r_slide)
-        r_offset = int((1 - r_prog) * 120)
+        r_offset = int((1 - r_prog) * u(120))
         ra = int(255 * r_prog)
 
         if ra > 0:
@@ -179,15 +181,15 @@ def render(params, output_path):
                 r2, g2, b2, a2 = rc.split()
                 a2 = a2.point(lambda p: int(p * logo_a / 255))
                 rc = Image.merge("RGBA", (r2, g2, b2, a2))
-                frame.paste(rc, (right_x + r_offset, content_top - 5), rc)
-                logo_offset_r = 60
+                frame.paste(rc, (right_x + r_offset, content_top - u(5)), rc)
+                logo_offset_r = u(60)
 
             draw.text((right_x + r_offset + logo_offset_r, content_top),
                       right_heading, fill=(*right_color[:3], ra), font=font_heading)
             hw2, hh2 = get_text_size(draw, right_heading, font_heading)
             draw.rectangle(
-                [(right_x + r_offset + logo_offset_r, content_top + hh2 + 8),
-                 (right_x + r_offset + logo_offset_r + hw2, content_top + hh2 + 12)],
+                [(right_x + r_offset + logo_offset_r, content_top + hh2 + u(8)),
+                 (right_x + r_offset + logo_offset_r + hw2, content_top + hh2 + u(12))],
                 fill=(*right_color[:3], ra)
             )
 
@@ -198,13 +200,13 @@ def render(params, output_path):
             if pt_t <= 0: continue
             pt_prog = ease_out_cubic(pt_t)
             pa = int(255 * pt_prog)
-            py = content_top + 70 + i * pt_spacing
+            py = content_top + u(70) + i * pt_spacing
 
             draw.rounded_rectangle(
-                [(right_x, py + 6), (right_x + 12, py + 18)],
-                radius=3, fill=(*right_color[:3], pa)
+                [(right_x, py + u(6)), (right_x + u(12), py + u(18))],
+                radius=u(3), fill=(*right_color[:3], pa)
             )
-            draw.text((right_x + 22, py), pt, fill=(*text_color[:3], pa), font=font_point)
+            draw.text((right_x + u(22), py), pt, fill=(*text_color[:3], pa), font=font_point)
 
         # Conclusion bar
         if conclusion:
@@ -226,13 +228,28 @@ def render(params, output_path):
             if src_t > 0:
                 sa = int(150 * ease_out_cubic(src_t))
                 sw, sh = get_text_size(draw, source, font_source)
-                draw.text((W - sw - 30, H - source_h + 8), source,
+                draw.text((W - sw - u(30), H - source_h + u(8)), source,
                           fill=(*sub_color[:3], sa), font=font_source)
 
-        frames.append(frame)
+    events = [event(0, "sides_in"), event(slide_dur, "sides_landed")]
+    for side, points in (("left", left_points), ("right", right_points)):
+        events += [event(slide_dur + i * stagger, "point_in", side=side, point=i) for i in range(len(points))]
+    if conclusion:
+        all_pts = max(len(left_points), len(right_points))
+        events.append(event(slide_dur + all_pts * stagger + 0.3, "conclusion_in"))
+    if source:
+        events.append(event(0.5, "source_in"))
+
+    # A point's text only shows from its entrance on
+    regions = [((side, "points", i), slide_dur + i * stagger, duration)
+               for side, points in (("left", left_points), ("right", right_points)) for i in range(len(points))]
 
-    render_frames_to_video(frames, output_path, fps=fps)
+    return Scene(W, H, fps, duration, bg, plate, draw_frame, profile, theme=theme, events=events, regions=regions)
+
+
+def render(params, output_path):
+    output_path = render_preset("comparison_split", build_scene, params, output_path)
     print(f"Rendered comparison_split to {output_path}")
 
 if __name__ == "__main__":
-    render(json.loads(sys.argv[1]), sys.argv[2])
+    render(*job_from_argv(sys.argv))
@@ -12,30 +12,26 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter
 from shared.colors import get_theme, hex_to_rgba, hex_to_rgb
+from shared.metrics import timed
+from shared.assets import fit_image, asset_exists
 from shared.fonts import get_font, get_text_size
-from shared.grid_background import create_grid_background
-from shared.render import render_frames_to_video, ease_out_cubic, ease_in_out_cubic, clamp
+from shared.profiles import get_profile
+from shared.layout import get_layout
+from shared.grid_background import create_frame_background
+from shared.scene import Scene, render_preset, job_from_argv
+from shared.sidecar import zoom_cycle_events
+from shared.budget import item_images
+from shared.render import ease_out_cubic, ease_in_out_cubic, clamp
 
 GOOD_COLOR = "#44cc88"
 BAD_COLOR = "#ff4444"
 
 
+@timed("assets")
 def load_thumbnail(path, w, h):
     try:
-        if path and os.path.exists(path):
-            img = Image.open(path).convert("RGBA")
-            iw, ih = img.size
-            ratio = w / h
-            ir = iw / ih
-            if ir > ratio:
-                nw = int(ih * ratio)
-                l = (iw - nw) // 2
-                img = img.crop((l, 0, l + nw, ih))
-            else:
-                nh = int(iw / ratio)
-                t = (ih - nh) // 2
-                img = img.crop((0, t, iw, t + nh))
-            return img.resize((w, h), Image.LANCZOS)
+        if asset_exists(path):
+            return fit_image(path, w, h)
     except: pass
     return None
 
@@ -58,7 +54,7 @@ def make_faded(img, darkness=0.15):
     return dark
 
 
-def render(params, output_path):
+def build_scene(params):
     theme = get_theme(params)
     good_items = params.get("good", [])
     bad_items = params.get("bad", [])
@@ -66,9 +62,11 @@ def render(params, output_path):
     duration = params.get("duration", 12.0)
     zoom_dur = params.get("zoom_duration", 0.5)
     scroll_dur = params.get("scroll_duration", 0.3)
-    fps = 30
-    W, H = 1920, 1080
-    border_w = 7
+    profile = get_profile(params)
+    fps = profile["fps"]
+    L = get_layout(params, profile)
+    W, H, u = L.W, L.H, L.u
+    border_w = u(7)
 
     good_color = params.get("good_color", GOOD_COLOR)
     bad_color = params.get("bad_color", BAD_COLOR)
@@ -77,16 +75,15 @@ def render(params, output_path):
 
     n_good = len(good_items)
     n_bad = len(bad_items)
-    total_frames = int(duration * fps)
 
     good_rgb = hex_to_rgb(good_color)
     bad_rgb = hex_to_rgb(bad_color)
 
     # Overview layout: two rows, max 3 visible, 16:9 cards, centered
-    label_h = 28
-    gap_y = 10
-    gap_x = 8
-    margin_x = 10
+    label_h = u(28)
+    gap_y = u(10)
+    gap_x = u(8)
+    margin_x = u(10)
     max_visible = 3
 
     avail_w = W - margin_x * 2 - (max_visible - 1) * gap_x
@@ -103,12 +100,12 @@ def render(params, output_path):
     viewport_w = max_visible * card_w + (max_visible - 1) * gap_x
     viewport_x = (W - viewport_w) // 2
 
-    font_row_label = get_font(theme["font_title"], 22)
-    font_num = get_font(theme["font_numbers"], 36)
-    font_q = get_font(theme["font_title"], 50)
-    font_source = get_font(theme["font_body"], 14)
+    font_row_label = get_font(theme["font_title"], u(22))
+    font_num = get_font(theme["font_numbers"], u(36))
+    font_q = get_font(theme["font_title"], u(50))
+    font_source = get_font(theme["font_body"], u(14))
 
-    bg = create_grid_background(W, H, theme)
+    bg, plate = create_frame_background(W, H, theme, params)
     sub_color = hex_to_rgba(theme["secondary_text"], 255)
 
     # Build unified item sequence: alternate good/bad
@@ -123,9 +120,18 @@ def render(params, output_path):
     n_seq = len(sequence)
 
     # Pre-create thumbnails
+    def load_full(k):
+        # Good items first, then bad: k = i for good[i], n_good + i for bad[i]
+        i, item, color = (k, good_items[k], good_color) if k < n_good else (k - n_good, bad_items[k - n_good], bad_color)
+        tf = load_thumbnail(item.get("thumbnail_path",""), W-border_w*2, H-border_w*2)
+        if not tf: tf = create_placeholder(W-border_w*2, H-border_w*2, i+1, color, show_number=False)
+        return tf
+
+    # Full screen thumbs: decoded up front, or an LRU under a memory budget
+    thumbs_full = item_images(load_full, n_good + n_bad)
+
     good_thumbs_strip = []
     good_thumbs_faded = []
-    good_thumbs_full = []
     for i, item in enumerate(good_items):
         inner_w = card_w - border_w * 2
         inner_h = card_h - border_w * 2
@@ -133,13 +139,9 @@ def render(params, output_path):
         if not ts: ts = create_placeholder(inner_w, inner_h, i+1, good_color)
         good_thumbs_strip.append(ts)
         good_thumbs_faded.append(make_faded(ts))
-        tf = load_thumbnail(item.get("thumbnail_path",""), W-border_w*2, H-border_w*2)
-        if not tf: tf = create_placeholder(W-border_w*2, H-border_w*2, i+1, good_color, show_number=False)
-        good_thumbs_full.append(tf)
 
     bad_thumbs_strip = []
     bad_thumbs_faded = []
-    bad_thumbs_full = []
     for i, item in enumerate(bad_items):
         inner_w = card_w - border_w * 2
         inner_h = card_h - border_w * 2
@@ -147,9 +149,6 @@ def render(params, output_path):
         if not ts: ts = create_placeholder(inner_w, inner_h, i+1, bad_color)
         bad_thumbs_strip.append(ts)
         bad_thumbs_faded.append(make_faded(ts))
-        tf = load_thumbnail(item.get("thumbnail_path",""), W-border_w*2, H-border_w*2)
-        if not tf: tf = create_placeholder(W-border_w*2, H-border_w*2, i+1, bad_color, show_number=False)
-        bad_thumbs_full.append(tf)
 
     # Auto-timing
     transition_total = zoom_dur * 2 + scroll_dur
@@ -160,14 +159,11 @@ def render(params, output_path):
         sequence[si] = (*sequence[si], si * per_item, si * per_item + per_item)
         # (row_type, row_idx, item_data, start_time, end_time)
 
-    visited_good = set()
-    visited_bad = set()
-    frames = []
-
-    for fi in range(total_frames):
-        frame = bg.copy()
+    def draw_frame(frame, tsec):
         draw = ImageDraw.Draw(frame)
-        tsec = fi / fps
+        # Rebuilt every frame from tsec alone: everything up to the current item counts as visited
+        visited_good = set()
+        visited_bad = set()
 
         # Determine current state from sequence
         current_si = 0
@@ -265,7 +261,7 @@ def render(params, output_path):
 
                     cx = viewport_x + i * (card_w + gap_x)
                     cy = row_y
-                    if cx + card_w < -50 or cx > W + 50:
+                    if cx + card_w < -u(50) or cx > W + u(50):
                         continue
 
                     is_vis = i in visited_set
@@ -273,12 +269,12 @@ def render(params, output_path):
 
                     # Border
                     bc = (*color_rgb, int(ia * (1.0 if is_vis else 0.4)))
-                    draw.rounded_rectangle([(cx, cy), (cx+card_w, cy+card_h)], radius=5, fill=bc)
+                    draw.rounded_rectangle([(cx, cy), (cx+card_w, cy+card_h)], radius=u(5), fill=bc)
 
                     # Thumb
                     inner_w2 = card_w - border_w*2
                     inner_h2 = card_h - border_w*2
-                    if inner_w2 > 10 and inner_h2 > 10:
+                    if inner_w2 > u(10) and inner_h2 > u(10):
                         thumb = thumbs_strip_list[i] if is_vis else thumbs_faded_list[i]
                         t2 = thumb.copy()
                         if ia < 255:
@@ -290,10 +286,10 @@ def render(params, output_path):
                     if is_vis:
                         badge = f"#{i+1}"
                         bw2, bh2 = get_text_size(draw, badge, font_num)
-                        bx = cx + 5
-                        by = cy + card_h - bh2 - 8
-                        draw.rounded_rectangle([(bx,by),(bx+bw2+12,by+bh2+6)], radius=4, fill=(*color_rgb, min(255, ia+30)))
-                        draw.text((bx+6, by+2), badge, fill=(255,255,255,ia), font=font_num)
+                        bx = cx + u(5)
+                        by = cy + card_h - bh2 - u(8)
+                        draw.rounded_rectangle([(bx,by),(bx+bw2+u(12),by+bh2+u(6))], radius=u(4), fill=(*color_rgb, min(255, ia+30)))
+                        draw.text((bx+u(6), by+u(2)), badge, fill=(255,255,255,ia), font=font_num)
                     else:
                         qw, qh = get_text_size(draw, "?", font_q)
                         draw.text((cx+(card_w-qw)//2, cy+(card_h-qh)//2), "?", fill=(255,255,255,int(ia*0.5)), font=font_q)
@@ -304,18 +300,18 @@ def render(params, output_path):
             if source and oa > 50:
                 sa = int(min(130, oa*0.5))
                 ssw, ssh = get_text_size(draw, source, font_source)
-                draw.text((W-ssw-16, H-22), source, fill=(*sub_color[:3], sa), font=font_source)
+                draw.text((W-ssw-u(16), H-u(22)), source, fill=(*sub_color[:3], sa), font=font_source)
 
         # === DRAW ACTIVE ITEM (zooming/full screen) ===
         if zoom > 0.05:
             if cur_row_type == "good":
                 color_rgb_cur = good_rgb
-                thumb_full = good_thumbs_full[cur_row_idx]
+                thumb_full = thumbs_full[cur_row_idx]
                 strip_x = viewport_x + cur_row_idx * (card_w + gap_x) + card_w / 2
                 strip_y = good_row_y + card_h / 2
             else:
                 color_rgb_cur = bad_rgb
-                thumb_full = bad_thumbs_full[cur_row_idx]
+                thumb_full = thumbs_full[n_good + cur_row_idx]
                 strip_x = viewport_x + cur_row_idx * (card_w + gap_x) + card_w / 2
                 strip_y = bad_row_y + card_h / 2
 
@@ -331,11 +327,11 @@ def render(params, output_path):
 
             bw_eff = max(1, int(border_w * (1.0 - zoom*0.8)))
             ba = int(255 * max(0.05, 1.0 - zoom*0.8))
-            cr = int(5 * (1.0 - zoom*0.9))
+            cr = int(u(5) * (1.0 - zoom*0.9))
             draw.rounded_rectangle([(x1,y1),(x2,y2)], radius=cr, fill=(*color_rgb_cur, ba))
 
-            iw = max(10, int(cw) - bw_eff*2)
-            ih = max(10, int(ch) - bw_eff*2)
+            iw = max(u(10), int(cw) - bw_eff*2)
+            ih = max(u(10), int(ch) - bw_eff*2)
             resized = thumb_full.resize((iw, ih), Image.LANCZOS)
             frame.paste(resized, (x1+bw_eff, y1+bw_eff), resized)
 
@@ -343,13 +339,18 @@ def render(params, output_path):
                 badge_a = int(255 * (1.0 - zoom/0.7))
                 badge = f"#{cur_row_idx+1}"
                 bw3, bh3 = get_text_size(draw, badge, font_num)
-                draw.rounded_rectangle([(x1+8, y2-bh3-10),(x1+bw3+20, y2-4)], radius=4, fill=(*color_rgb_cur, min(255, badge_a+30)))
-                draw.text((x1+14, y2-bh3-8), badge, fill=(255,255,255,badge_a), font=font_num)
+                draw.rounded_rectangle([(x1+u(8), y2-bh3-u(10)),(x1+bw3+u(20), y2-u(4))], radius=u(4), fill=(*color_rgb_cur, min(255, badge_a+30)))
+                draw.text((x1+u(14), y2-bh3-u(8)), badge, fill=(255,255,255,badge_a), font=font_num)
+
+    events = zoom_cycle_events([(st, et, {"row": row_type, "item": row_idx, "label": item_data.get("label", "")})
+                                for row_type, row_idx, item_data, st, et in sequence], zoom_dur, scroll_dur)
 
-        frames.append(frame)
+    return Scene(W, H, fps, duration, bg, plate, draw_frame, profile, theme=theme, events=events)
 
-    render_frames_to_video(frames, output_path, fps=fps)
+
+def render(params, output_path):
+    output_path = render_preset("listicle_goodbad", build_scene, params, output_path)
     print(f"Rendered listicle_goodbad to {output_path}")
 
 if __name__ == "__main__":
-    render(json.loads(sys.argv[1]), sys.argv[2])
+    render(*job_from_argv(sys.argv))
@@ -14,31 +14,27 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter
 from shared.colors import get_theme, hex_to_rgba, hex_to_rgb
+from shared.metrics import timed
+from shared.assets import fit_image, asset_exists
 from shared.fonts import get_font, get_text_size
-from shared.grid_background import create_grid_background
-from shared.render import render_frames_to_video, ease_out_cubic, ease_in_out_cubic, clamp
+from shared.profiles import get_profile
+from shared.layout import get_layout
+from shared.grid_background import create_frame_background
+from shared.scene import Scene, render_preset, job_from_argv
+from shared.sidecar import zoom_cycle_events
+from shared.budget import item_images
+from shared.render import ease_out_cubic, ease_in_out_cubic, clamp
 
 ITEM_PALETTE = ["#ff4444","#4488ff","#44cc88","#ffaa00","#cc44cc","#44cccc","#ff8844","#88aa44","#ff44aa","#4444ff"]
 
 GRID_LAYOUTS = {2:(2,1), 3:(3,1), 4:(2,2), 5:(3,2), 6:(3,2), 7:(4,2), 8:(4,2), 9:(3,3), 10:(4,3), 11:(4,3), 12:(4,3)}
 
 
+@timed("assets")
 def load_thumbnail(path, w, h):
     try:
-        if path and os.path.exists(path):
-            img = Image.open(path).convert("RGBA")
-            iw, ih = img.size
-            ratio = w / h
-            ir = iw / ih
-            if ir > ratio:
-                nw = int(ih * ratio)
-                l = (iw - nw) // 2
-                img = img.crop((l, 0, l + nw, ih))
-            else:
-                nh = int(iw / ratio)
-                t = (ih - nh) // 2
-                img = img.crop((0, t, iw, t + nh))
-            return img.resize((w, h), Image.LANCZOS)
+        if asset_exists(path):
+            return fit_image(path, w, h)
     except: pass
     return None
 
@@ -61,31 +57,33 @@ def make_faded(img, darkness=0.15):
     return dark
 
 
-def render(params, output_path):
+def build_scene(params):
     theme = get_theme(params)
     title = params.get("title", "")
     items = params.get("items", [])
     source = params.get("source", "")
     duration = params.get("duration", 12.0)
     zoom_dur = params.get("zoom_duration", 0.5)
-    fps = 30
-    W, H = 1920, 1080
-    border_w = 6
+    profile = get_profile(params)
+    fps = profile["fps"]
+    L = get_layout(params, profile)
+    W, H, u = L.W, L.H, L.u
+    border_w = u(6)
     if not items: raise ValueError("No items")
 
     n = len(items)
-    total_frames = int(duration * fps)
 
     # Grid layout
     cols, rows = GRID_LAYOUTS.get(n, (4, 3))
     if n > 12: cols, rows = 5, 3
+    if L.portrait: cols, rows = rows, cols  # tall frames stack more rows
 
-    margin = 30
-    gap = 12
-    title_h = 70 if title else 10
+    margin = u(30)
+    gap = u(12)
+    title_h = u(70) if title else u(10)
 
     avail_w = W - margin * 2 - (cols - 1) * gap
-    avail_h = H - title_h - margin - (rows - 1) * gap - 30
+    avail_h = H - title_h - margin - (rows - 1) * gap - u(30)
     card_w = avail_w // cols
     card_h = int(card_w * 9 / 16)
     if card_h * rows + (rows - 1) * gap > avail_h:
@@ -98,12 +96,12 @@ def render(params, output_path):
     grid_x0 = (W - grid_w) // 2
     grid_y0 = title_h + (H - title_h - grid_h) // 2
 
-    font_title = get_font(theme["font_title"], 38)
-    font_num = get_font(theme["font_numbers"], min(32, card_h // 5))
-    font_q = get_font(theme["font_title"], min(48, card_h // 2))
-    font_source = get_font(theme["font_body"], 14)
+    font_title = get_font(theme["font_title"], u(38))
+    font_num = get_font(theme["font_numbers"], min(u(32), card_h // 5))
+    font_q = get_font(theme["font_title"], min(u(48), card_h // 2))
+    font_source = get_font(theme["font_body"], u(14))
 
-    bg = create_grid_background(W, H, theme)
+    bg, plate = create_frame_background(W, H, theme, params)
     text_color = hex_to_rgba(theme["primary_text"], 255)
     sub_color = hex_to_rgba(theme["secondary_text"], 255)
 
@@ -121,7 +119,15 @@ def render(params, output_path):
     # Thumbnails
     thumbs_grid = []
     thumbs_faded = []
-    thumbs_full = []
+
+    def load_full(i):
+        color = items[i].get("color", ITEM_PALETTE[i % len(ITEM_PALETTE)])
+        tf = load_thumbnail(items[i].get("thumbnail_path",""), W-border_w*2, H-border_w*2)
+        if not tf: tf = create_placeholder(W-border_w*2, H-border_w*2, i+1, color, show_number=False)
+        return tf
+
+    # Full screen thumbs: decoded up front, or an LRU under a memory budget
+    thumbs_full = item_images(load_full, n)
     for i, item in enumerate(items):
         color = item.get("color", ITEM_PALETTE[i % len(ITEM_PALETTE)])
         inner_w = card_w - border_w * 2
@@ -130,22 +136,15 @@ def render(params, output_path):
         if not ts: ts = create_placeholder(inner_w, inner_h, i+1, color)
         thumbs_grid.append(ts)
         thumbs_faded.append(make_faded(ts))
-        tf = load_thumbnail(item.get("thumbnail_path",""), W-border_w*2, H-border_w*2)
-        if not tf: tf = create_placeholder(W-border_w*2, H-border_w*2, i+1, color, show_number=False)
-        thumbs_full.append(tf)
 
     # Auto-timing
     transition_total = zoom_dur * 2
     hold_time = max(0.5, (duration - transition_total * n) / n)
     per_item = hold_time + transition_total
 
-    visited = set()
-    frames = []
-
-    for fi in range(total_frames):
-        frame = bg.copy()
+    def draw_frame(frame, tsec):
         draw = ImageDraw.Draw(frame)
-        tsec = fi / fps
+        visited = set()  # rebuilt from tsec alone, so any frame can be drawn on its own
 
         current_item = 0
         phase = "hold"
@@ -204,7 +203,7 @@ def render(params, output_path):
 
             if title:
                 tw, th = get_text_size(draw, title, font_title)
-                draw.text(((W-tw)//2, 20), title, fill=(*text_color[:3], oa), font=font_title)
+                draw.text(((W-tw)//2, u(20)), title, fill=(*text_color[:3], oa), font=font_title)
 
             for i in range(n):
                 if i == current_item and zoom > 0.1:
@@ -216,11 +215,11 @@ def render(params, output_path):
 
                 ia = int(oa * (1.0 if is_vis else 0.5))
                 bc = (*color_rgb, int(ia * (1.0 if is_vis else 0.4)))
-                draw.rounded_rectangle([(px,py),(px+card_w,py+card_h)], radius=5, fill=bc)
+                draw.rounded_rectangle([(px,py),(px+card_w,py+card_h)], radius=u(5), fill=bc)
 
                 inner_w2 = card_w - border_w*2
                 inner_h2 = card_h - border_w*2
-                if inner_w2 > 10 and inner_h2 > 10:
+                if inner_w2 > u(10) and inner_h2 > u(10):
                     thumb = thumbs_grid[i] if is_vis else thumbs_faded[i]
                     t2 = thumb.copy()
                     if ia < 255:
@@ -232,9 +231,9 @@ def render(params, output_path):
                 if is_vis:
                     badge = f"#{i+1}"
                     bw2, bh2 = get_text_size(draw, badge, font_num)
-                    bx, by = px+5, py+card_h-bh2-8
-                    draw.rounded_rectangle([(bx,by),(bx+bw2+12,by+bh2+6)], radius=4, fill=(*color_rgb, min(255,ia+30)))
-                    draw.text((bx+6,by+2), badge, fill=(255,255,255,ia), font=font_num)
+                    bx, by = px+u(5), py+card_h-bh2-u(8)
+                    draw.rounded_rectangle([(bx,by),(bx+bw2+u(12),by+bh2+u(6))], radius=u(4), fill=(*color_rgb, min(255,ia+30)))
+                    draw.text((bx+u(6),by+u(2)), badge, fill=(255,255,255,ia), font=font_num)
                 else:
                     qw, qh = get_text_size(draw, "?", font_q)
                     draw.text((px+(card_w-qw)//2, py+(card_h-qh)//2), "?", fill=(255,255,255,int(ia*0.5)), font=font_q)
@@ -242,7 +241,7 @@ def render(params, output_path):
             if source and oa > 50:
                 sa = int(min(130, oa*0.5))
                 ssw, ssh = get_text_size(draw, source, font_source)
-                draw.text((W-ssw-16, H-22), source, fill=(*sub_color[:3], sa), font=font_source)
+                draw.text((W-ssw-u(16), H-u(22)), source, fill=(*sub_color[:3], sa), font=font_source)
 
         # === DRAW ACTIVE ITEM ===
         if zoom > 0.05:
@@ -265,11 +264,11 @@ def render(params, output_path):
 
             bw_eff = max(1, int(border_w * (1.0 - zoom*0.8)))
             ba = int(255 * max(0.05, 1.0 - zoom*0.8))
-            cr = int(5 * (1.0 - zoom*0.9))
+            cr = int(u(5) * (1.0 - zoom*0.9))
             draw.rounded_rectangle([(x1,y1),(x2,y2)], radius=cr, fill=(*color_rgb, ba))
 
-            iw = max(10, int(cw) - bw_eff*2)
-            ih = max(10, int(ch) - bw_eff*2)
+            iw = max(u(10), int(cw) - bw_eff*2)
+            ih = max(u(10), int(ch) - bw_eff*2)
             resized = thumbs_full[current_item].resize((iw, ih), Image.LANCZOS)
             frame.paste(resized, (x1+bw_eff, y1+bw_eff), resized)
 
@@ -277,13 +276,18 @@ def render(params, output_path):
                 badge_a = int(255 * (1.0 - zoom/0.7))
                 badge = f"#{current_item+1}"
                 bw3, bh3 = get_text_size(draw, badge, font_num)
-                draw.rounded_rectangle([(x1+8,y2-bh3-10),(x1+bw3+20,y2-4)], radius=4, fill=(*color_rgb, min(255,badge_a+30)))
-                draw.text((x1+14, y2-bh3-8), badge, fill=(255,255,255,badge_a), font=font_num)
+                draw.rounded_rectangle([(x1+u(8),y2-bh3-u(10)),(x1+bw3+u(20),y2-u(4))], radius=u(4), fill=(*color_rgb, min(255,badge_a+30)))
+                draw.text((x1+u(14), y2-bh3-u(8)), badge, fill=(255,255,255,badge_a), font=font_num)
+
+    events = zoom_cycle_events([(i * per_item, (i + 1) * per_item, {"item": i, "label": item.get("label", "")})
+                                for i, item in enumerate(items)], zoom_dur)
 
-        frames.append(frame)
+    return Scene(W, H, fps, duration, bg, plate, draw_frame, profile, theme=theme, events=events)
 
-    render_frames_to_video(frames, output_path, fps=fps)
+
+def render(params, output_path):
+    output_path = render_preset("listicle_grid", build_scene, params, output_path)
     print(f"Rendered listicle_grid_highlight to {output_path}")
 
 if __name__ == "__main__":
-    render(json.loads(sys.argv[1]), sys.argv[2])
+    render(*job_from_argv(sys.argv))
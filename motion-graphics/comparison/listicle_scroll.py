@@ -23,29 +23,25 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter
 from shared.colors import get_theme, hex_to_rgba, hex_to_rgb
+from shared.metrics import timed
+from shared.assets import fit_image, asset_exists
 from shared.fonts import get_font, get_text_size
-from shared.grid_background import create_grid_background
-from shared.render import render_frames_to_video, ease_out_cubic, ease_in_out_cubic, clamp
+from shared.profiles import get_profile
+from shared.layout import get_layout
+from shared.grid_background import create_frame_background
+from shared.scene import Scene, render_preset, job_from_argv
+from shared.sidecar import zoom_cycle_events
+from shared.budget import item_images
+from shared.render import ease_out_cubic, ease_in_out_cubic, clamp
 
 ITEM_PALETTE = ["#ff4444","#4488ff","#44cc88","#ffaa00","#cc44cc","#44cccc","#ff8844","#88aa44","#ff44aa","#4444ff"]
 
 
+@timed("assets")
 def load_thumbnail(path, w, h):
     try:
-        if path and os.path.exists(path):
-            img = Image.open(path).convert("RGBA")
-            iw, ih = img.size
-            ratio = w / h
-            ir = iw / ih
-            if ir > ratio:
-                nw = int(ih * ratio)
-                l = (iw - nw) // 2
-                img = img.crop((l, 0, l + nw, ih))
-            else:
-                nh = int(iw / ratio)
-                t = (ih - nh) // 2
-                img = img.crop((0, t, iw, t + nh))
-            return img.resize((w, h), Image.LANCZOS)
+        if asset_exists(path):
+            return fit_image(path, w, h)
     except:
         pass
     return None
@@ -73,7 +69,7 @@ def make_faded(img, darkness=0.15):
     return dark
 
 
-def render(params, output_path):
+def build_scene(params):
     theme = get_theme(params)
     title = params.get("title", "")
     items = params.get("items", [])
@@ -81,47 +77,51 @@ def render(params, output_path):
     duration = params.get("duration", 12.0)
     zoom_dur = params.get("zoom_duration", 0.5)
     scroll_dur = params.get("scroll_duration", 0.4)
-    fps = 30
-    W, H = 1920, 1080
-    border_w = 8
+    profile = get_profile(params)
+    fps = profile["fps"]
+    L = get_layout(params, profile)
+    W, H, u = L.W, L.H, L.u
+    border_w = u(8)
     if not items:
         raise ValueError("No items")
 
     n = len(items)
-    total_frames = int(duration * fps)
 
     # Strip card size in overview
-    strip_card_w = 420
-    strip_card_h = int(strip_card_w * 9 / 16)  # 236
-    strip_gap = 20
+    strip_card_w = u(420)
+    strip_card_h = int(strip_card_w * 9 / 16)  # 236 at 1080p
+    strip_gap = u(20)
     strip_spacing = strip_card_w + strip_gap
-    strip_cy = H // 2 + (25 if title else 0)
+    strip_cy = H // 2 + (u(25) if title else 0)
 
-    font_title = get_font(theme["font_title"], 44)
-    font_num = get_font(theme["font_numbers"], 44)
-    font_q = get_font(theme["font_title"], 60)
-    font_source = get_font(theme["font_body"], 16)
+    font_title = get_font(theme["font_title"], u(44))
+    font_num = get_font(theme["font_numbers"], u(44))
+    font_q = get_font(theme["font_title"], u(60))
+    font_source = get_font(theme["font_body"], u(16))
 
-    bg = create_grid_background(W, H, theme)
+    bg, plate = create_frame_background(W, H, theme, params)
     text_color = hex_to_rgba(theme["primary_text"], 255)
     sub_color = hex_to_rgba(theme["secondary_text"], 255)
 
     # Thumbnails — full res for zoom, strip res for overview
-    thumbs_full = []
     thumbs_strip = []
     thumbs_strip_faded = []
 
+    def load_full(i):
+        color = items[i].get("color", ITEM_PALETTE[i % len(ITEM_PALETTE)])
+        t_full = load_thumbnail(items[i].get("thumbnail_path", ""), W - border_w * 2, H - border_w * 2)
+        if not t_full:
+            t_full = create_placeholder(W - border_w * 2, H - border_w * 2, i + 1, color, show_number=False)
+        return t_full
+
+    # Full screen thumbs: decoded up front, or an LRU under a memory budget
+    thumbs_full = item_images(load_full, n)
+
     for i, item in enumerate(items):
         color = item.get("color", ITEM_PALETTE[i % len(ITEM_PALETTE)])
         inner_w = strip_card_w - border_w * 2
         inner_h = strip_card_h - border_w * 2
 
-        # Full screen thumb
-        t_full = load_thumbnail(item.get("thumbnail_path", ""), W - border_w * 2, H - border_w * 2)
-        if not t_full:
-            t_full = create_placeholder(W - border_w * 2, H - border_w * 2, i + 1, color, show_number=False)
-        thumbs_full.append(t_full)
-
         # Strip thumb (normal)
         t_strip = load_thumbnail(item.get("thumbnail_path", ""), inner_w, inner_h)
         if not t_strip:
@@ -154,15 +154,10 @@ def render(params, output_path):
     #   Phase D: ZOOM IN to next — zoom_dur
     #   Then HOLD on next...
 
-    # Track which items have been visited
-    visited = set()
-
-    frames = []
-
-    for fi in range(total_frames):
-        frame = bg.copy()
+    def draw_frame(frame, tsec):
         draw = ImageDraw.Draw(frame)
-        tsec = fi / fps
+        # Track which items have been visited (rebuilt from tsec, so frames are independent)
+        visited = set()
 
         # Determine state
         current_item = display_order[0]
@@ -264,7 +259,7 @@ def render(params, output_path):
             # Title
             if title and overview_alpha > 20:
                 tw, th = get_text_size(draw, title, font_title)
-                draw.text(((W - tw) // 2, 30), title, fill=(*text_color[:3], overview_alpha), font=font_title)
+                draw.text(((W - tw) // 2, u(30)), title, fill=(*text_color[:3], overview_alpha), font=font_title)
 
             # Draw all items in strip
             for i in range(n):
@@ -275,7 +270,7 @@ def render(params, output_path):
                 iy = strip_cy - strip_card_h // 2
 
                 # Skip if off-screen
-                if ix + strip_card_w < -50 or ix > W + 50:
+                if ix + strip_card_w < -u(50) or ix > W + u(50):
                     continue
 
                 color_hex = items[i].get("color", ITEM_PALETTE[i % len(ITEM_PALETTE)])
@@ -297,12 +292,12 @@ def render(params, output_path):
                     border_color = (*color_rgb, int(item_alpha * 0.4))
                 else:
                     border_color = (*color_rgb, item_alpha)
-                draw.rounded_rectangle([(x1, y1), (x2, y2)], radius=6, fill=border_color)
+                draw.rounded_rectangle([(x1, y1), (x2, y2)], radius=u(6), fill=border_color)
 
                 # Thumbnail
                 inner_w = strip_card_w - border_w * 2
                 inner_h = strip_card_h - border_w * 2
-                if inner_w > 10 and inner_h > 10:
+                if inner_w > u(10) and inner_h > u(10):
                     if is_upcoming:
                         thumb = thumbs_strip_faded[i]
                     else:
@@ -326,19 +321,19 @@ def render(params, output_path):
                     draw.text((qx, qy), "?", fill=(255, 255, 255, int(item_alpha * 0.6)), font=font_q)
                 else:
                     # Normal badge bottom-left
-                    bx = x1 + 5
-                    by = y2 - bh2 - 8
+                    bx = x1 + u(5)
+                    by = y2 - bh2 - u(8)
                     draw.rounded_rectangle(
-                        [(bx, by), (bx + bw2 + 12, by + bh2 + 6)],
-                        radius=4, fill=(*color_rgb, min(255, item_alpha + 30))
+                        [(bx, by), (bx + bw2 + u(12), by + bh2 + u(6))],
+                        radius=u(4), fill=(*color_rgb, min(255, item_alpha + 30))
                     )
-                    draw.text((bx + 6, by + 2), badge, fill=(255, 255, 255, item_alpha), font=font_num)
+                    draw.text((bx + u(6), by + u(2)), badge, fill=(255, 255, 255, item_alpha), font=font_num)
 
             # Source (overview only)
             if source and overview_alpha > 50:
                 sa = int(min(150, overview_alpha * 0.6))
                 ssw, ssh = get_text_size(draw, source, font_source)
-                draw.text((W - ssw - 30, H - 35), source, fill=(*sub_color[:3], sa), font=font_source)
+                draw.text((W - ssw - u(30), H - u(35)), source, fill=(*sub_color[:3], sa), font=font_source)
 
         # === DRAW ACTIVE ITEM (zooming or full screen) ===
         if zoom > 0.05:
@@ -366,15 +361,15 @@ def render(params, output_path):
             # Border (fades as we go full screen)
             bw_eff = max(1, int(border_w * (1.0 - zoom * 0.8)))
             border_alpha = int(255 * max(0.05, 1.0 - zoom * 0.8))
-            corner_r = int(6 * (1.0 - zoom * 0.9))
+            corner_r = int(u(6) * (1.0 - zoom * 0.9))
             draw.rounded_rectangle(
                 [(x1, y1), (x2, y2)],
                 radius=corner_r, fill=(*color_rgb, border_alpha)
             )
 
             # Thumbnail
-            inner_w = max(10, int(card_w) - bw_eff * 2)
-            inner_h = max(10, int(card_h) - bw_eff * 2)
+            inner_w = max(u(10), int(card_w) - bw_eff * 2)
+            inner_h = max(u(10), int(card_h) - bw_eff * 2)
             resized = thumbs_full[current_item].resize((inner_w, inner_h), Image.LANCZOS)
             frame.paste(resized, (x1 + bw_eff, y1 + bw_eff), resized)
 
@@ -383,19 +378,39 @@ def render(params, output_path):
                 ba = int(255 * (1.0 - zoom / 0.7))
                 badge = f"#{current_item + 1}"
                 bw3, bh3 = get_text_size(draw, badge, font_num)
-                bx = x1 + 8
-                by = y2 - bh3 - 10
+                bx = x1 + u(8)
+                by = y2 - bh3 - u(10)
                 draw.rounded_rectangle(
-                    [(bx, by), (bx + bw3 + 12, by + bh3 + 6)],
-                    radius=4, fill=(*color_rgb, min(255, ba + 30))
+                    [(bx, by), (bx + bw3 + u(12), by + bh3 + u(6))],
+                    radius=u(4), fill=(*color_rgb, min(255, ba + 30))
                 )
-                draw.text((bx + 6, by + 2), badge, fill=(255, 255, 255, ba), font=font_num)
+                draw.text((bx + u(6), by + u(2)), badge, fill=(255, 255, 255, ba), font=font_num)
+
+    events = zoom_cycle_events([(items[i]["start_time"], items[i]["end_time"],
+                                 {"item": i, "label": items[i].get("label", "")}) for i in display_order],
+                               zoom_dur, scroll_dur)
 
-        frames.append(frame)
+    # An item shows full screen from the zoom in on it to the end of its window and in the strip
+    # during every transition (and the opening zoom); the first item also fills any time outside the windows
+    first_start = items[display_order[0]]["start_time"]
+    transitions = [(first_start, first_start + zoom_dur)]
+    transitions += [(items[i]["end_time"] - zoom_dur * 2 - scroll_dur, items[i]["end_time"]) for i in range(n)]
+    regions = []
+    for i in range(n):
+        spans = [(items[i]["start_time"] - zoom_dur, items[i]["end_time"]), *transitions]
+        if i == display_order[0]:
+            spans = [(0, duration)]
+        elif i == display_order[-1]:
+            spans.append((items[i]["end_time"], duration))
+        regions += [(("items", i), t0, t1) for t0, t1 in spans]
 
-    render_frames_to_video(frames, output_path, fps=fps)
+    return Scene(W, H, fps, duration, bg, plate, draw_frame, profile, theme=theme, events=events, regions=regions)
+
+
+def render(params, output_path):
+    output_path = render_preset("listicle_scroll", build_scene, params, output_path)
     print(f"Rendered listicle_scroll to {output_path}")
 
 
 if __name__ == "__main__":
-    render(json.loads(sys.argv[1]), sys.argv[2])
+    render(*job_from_argv(sys.argv))
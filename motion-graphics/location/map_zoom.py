@@ -11,37 +11,91 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from PIL import Image, ImageDraw
 from shared.colors import get_theme, hex_to_rgba, hex_to_rgb
 from shared.fonts import get_font, get_text_size
-from shared.grid_background import create_grid_background
-from shared.render import render_frames_to_video, ease_out_cubic, ease_in_out_cubic, clamp
+from shared.profiles import get_profile
+from shared.layout import get_layout
+from shared.grid_background import create_frame_background
+from shared.scene import Scene, render_preset, job_from_argv
+from shared.sidecar import event
+from shared.render import ease_out_cubic, ease_in_out_cubic, clamp
+from shared.filtergraph import sprite_layer, make_sprite, progress, ease_out_cubic_expr
 
 
-def render(params, output_path):
+def build_scene(params):
     theme = get_theme(params)
     location = params.get("location", "NEW YORK")
     subtitle = params.get("subtitle", "")
     source = params.get("source", "")
     accent_color = params.get("accent_color", "#ff4444")
     duration = params.get("duration", 4.0)
-    fps = 30
-    W, H = 1920, 1080
+    profile = get_profile(params)
+    fps = profile["fps"]
+    L = get_layout(params, profile)
+    W, H, u = L.W, L.H, L.u
 
-    total_frames = int(duration * fps)
     accent_rgb = hex_to_rgb(accent_color)
 
-    font_location = get_font(theme["font_title"], 72)
-    font_sub = get_font(theme["font_body"], 32)
-    font_source = get_font(theme["font_body"], 16)
+    font_location = get_font(theme["font_title"], u(72))
+    font_sub = get_font(theme["font_body"], u(32))
+    font_source = get_font(theme["font_body"], u(16))
 
-    bg = create_grid_background(W, H, theme)
+    bg, plate = create_frame_background(W, H, theme, params)
     text_color = hex_to_rgba(theme["primary_text"], 255)
     sub_color = hex_to_rgba(theme["secondary_text"], 255)
 
-    frames = []
+    def build_sprites():
+        # Same geometry as the frame loop at rest; drop, pulse and fades become ffmpeg expressions
+        pin_cx, pin_target_y, pin_r, stem_h = W // 2, H // 2 - u(60), u(28), u(35)
+        pin_dy = f"{-u(100) - pin_target_y}*(1-{ease_out_cubic_expr(progress(0, 0.5))})"
+        sprites = []
+
+        layer, d = sprite_layer(W, H)
+        d.ellipse([(pin_cx - pin_r, pin_target_y - pin_r), (pin_cx + pin_r, pin_target_y + pin_r)],
+                  fill=(*accent_rgb, 255))
+        inner_r = pin_r // 3
+        d.ellipse([(pin_cx - inner_r, pin_target_y - inner_r), (pin_cx + inner_r, pin_target_y + inner_r)],
+                  fill=(255, 255, 255, 255))
+        d.polygon([(pin_cx - u(12), pin_target_y + pin_r - u(5)), (pin_cx + u(12), pin_target_y + pin_r - u(5)),
+                   (pin_cx, pin_target_y + pin_r + stem_h)], fill=(*accent_rgb, 255))
+        sprites.append(make_sprite(layer, dy=pin_dy, alpha="clip({t}/0.25,0,1)",
+                                   scale="if(gte({t},0.5),1+0.03*sin({t}*4),1)", enable="gt({t},0)"))
+
+        # Ripple drawn at its mid radius, then grown 40 → 120 units while fading out
+        layer, d = sprite_layer(W, H)
+        ripple_y = pin_target_y + pin_r + stem_h
+        d.ellipse([(pin_cx - u(80), ripple_y - u(80) // 3), (pin_cx + u(80), ripple_y + u(80) // 3)],
+                  outline=(*accent_rgb, 120), width=u(2))
+        ripple_t = progress(0.4, 0.8)
+        sprites.append(make_sprite(layer, dy=pin_dy, alpha=f"(1-{ripple_t})",
+                                   scale=f"(40+80*{ripple_t})/80", enable="between({t},0.4,1.2)"))
+
+        text_in = ease_out_cubic_expr(progress(0.5, 0.5))
+        layer, d = sprite_layer(W, H)
+        lw, lh = get_text_size(d, location, font_location)
+        text_y = pin_target_y + u(28) + u(35) + u(30)
+        d.text(((W - lw) // 2, text_y), location, fill=text_color, font=font_location)
+        sprites.append(make_sprite(layer, alpha=text_in))
+
+        layer, d = sprite_layer(W, H)
+        line_y = text_y + lh + u(8)
+        d.rounded_rectangle([((W - lw) // 2, line_y), ((W - lw) // 2 + lw, line_y + u(4))],
+                            radius=u(2), fill=(*accent_rgb, 255))
+        sprites.append(make_sprite(layer, alpha=text_in, reveal=text_in, reveal_from="center"))
+
+        if subtitle:
+            layer, d = sprite_layer(W, H)
+            sw, sh = get_text_size(d, subtitle, font_sub)
+            d.text(((W - sw) // 2, line_y + u(20)), subtitle, fill=(*sub_color[:3], 200), font=font_sub)
+            sprites.append(make_sprite(layer, alpha=ease_out_cubic_expr(progress(0.8, 0.4))))
+        if source:
+            layer, d = sprite_layer(W, H)
+            ssw, ssh = get_text_size(d, source, font_source)
+            d.text((W - ssw - u(30), H - u(35)), source, fill=(*sub_color[:3], 130), font=font_source)
+            sprites.append(make_sprite(layer, alpha=ease_out_cubic_expr(progress(1.0, 0.5))))
+
+        return sprites
 
-    for fi in range(total_frames):
-        frame = bg.copy()
+    def draw_frame(frame, tsec):
         draw = ImageDraw.Draw(frame)
-        tsec = fi / fps
 
         # Pin animation: drops from above (0-0.5s)
         pin_drop = clamp(tsec / 0.5)
@@ -49,8 +103,8 @@ def render(params, output_path):
 
         # Pin position (center of screen, slightly above middle)
         pin_cx = W // 2
-        pin_target_y = H // 2 - 60
-        pin_start_y = -100
+        pin_target_y = H // 2 - u(60)
+        pin_start_y = -u(100)
         pin_y = int(pin_start_y + (pin_target_y - pin_start_y) * pin_ease)
 
         # Draw pin
@@ -58,7 +112,7 @@ def render(params, output_path):
             pin_alpha = int(255 * min(1.0, pin_drop * 2))
 
             # Pin head (circle)
-            pin_r = 28
+            pin_r = u(28)
             # Subtle pulse after landing
             if pin_drop >= 1.0:
                 pulse = 1.0 + 0.03 * math.sin(tsec * 4)
@@ -75,23 +129,23 @@ def render(params, output_path):
                 fill=(255, 255, 255, pin_alpha)
             )
             # Pin stem (triangle pointing down)
-            stem_h = 35
+            stem_h = u(35)
             draw.polygon([
-                (pin_cx - 12, pin_y + pin_r - 5),
-                (pin_cx + 12, pin_y + pin_r - 5),
+                (pin_cx - u(12), pin_y + pin_r - u(5)),
+                (pin_cx + u(12), pin_y + pin_r - u(5)),
                 (pin_cx, pin_y + pin_r + stem_h)
             ], fill=(*accent_rgb, pin_alpha))
 
             # Ripple effect on landing
             if 0.4 < tsec < 1.2:
                 ripple_t = (tsec - 0.4) / 0.8
-                ripple_r = int(40 + 80 * ripple_t)
+                ripple_r = int(u(40) + u(80) * ripple_t)
                 ripple_a = int(120 * (1.0 - ripple_t))
                 ripple_y = pin_y + pin_r + stem_h
                 draw.ellipse(
                     [(pin_cx - ripple_r, ripple_y - ripple_r // 3),
                      (pin_cx + ripple_r, ripple_y + ripple_r // 3)],
-                    outline=(*accent_rgb, ripple_a), width=2
+                    outline=(*accent_rgb, ripple_a), width=u(2)
                 )
 
         # Location text (fades in after pin lands, 0.5-1.0s)
@@ -101,17 +155,17 @@ def render(params, output_path):
 
             # Location name below pin
             lw, lh = get_text_size(draw, location, font_location)
-            text_y = pin_target_y + 28 + 35 + 30  # below pin stem + gap
+            text_y = pin_target_y + u(28) + u(35) + u(30)  # below pin stem + gap
             draw.text(((W - lw) // 2, text_y), location,
                       fill=(*text_color[:3], ta), font=font_location)
 
             # Accent underline
             line_w = int(lw * ease_out_cubic(text_fade))
-            line_y = text_y + lh + 8
+            line_y = text_y + lh + u(8)
             line_x = (W - line_w) // 2
             draw.rounded_rectangle(
-                [(line_x, line_y), (line_x + line_w, line_y + 4)],
-                radius=2, fill=(*accent_rgb, ta)
+                [(line_x, line_y), (line_x + line_w, line_y + u(4))],
+                radius=u(2), fill=(*accent_rgb, ta)
             )
 
             # Subtitle
@@ -120,7 +174,7 @@ def render(params, output_path):
                 if sub_fade > 0:
                     sa = int(200 * ease_out_cubic(sub_fade))
                     sw, sh = get_text_size(draw, subtitle, font_sub)
-                    draw.text(((W - sw) // 2, line_y + 20), subtitle,
+                    draw.text(((W - sw) // 2, line_y + u(20)), subtitle,
                               fill=(*sub_color[:3], sa), font=font_sub)
 
         # Source
@@ -129,12 +183,21 @@ def render(params, output_path):
             if src_t > 0:
                 sa = int(130 * ease_out_cubic(src_t))
                 ssw, ssh = get_text_size(draw, source, font_source)
-                draw.text((W - ssw - 30, H - 35), source, fill=(*sub_color[:3], sa), font=font_source)
+                draw.text((W - ssw - u(30), H - u(35)), source, fill=(*sub_color[:3], sa), font=font_source)
 
-        frames.append(frame)
+    events = [event(0, "pin_drop"), event(0.5, "pin_landed"), event(0.5, "location_in")]
+    if subtitle:
+        events.append(event(0.8, "subtitle_in"))
+    if source:
+        events.append(event(1.0, "source_in"))
 
-    render_frames_to_video(frames, output_path, fps=fps)
+    return Scene(W, H, fps, duration, bg, plate, draw_frame, profile, theme=theme, sprites=build_sprites,
+                 events=events)
+
+
+def render(params, output_path):
+    output_path = render_preset("map_zoom", build_scene, params, output_path)
     print(f"Rendered map_zoom to {output_path}")
 
 if __name__ == "__main__":
-    render(json.loads(sys.argv[1]), sys.argv[2])
+    render(*job_from_argv(sys.argv))
@@ -11,23 +11,23 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from PIL import Image, ImageDraw
 from shared.colors import get_theme, hex_to_rgba, hex_to_rgb
+from shared.metrics import timed
+from shared.assets import fit_image, asset_exists
 from shared.fonts import get_font, get_text_size
-from shared.grid_background import create_grid_background
-from shared.render import render_frames_to_video, ease_out_cubic, ease_in_out_cubic, clamp
+from shared.profiles import get_profile
+from shared.layout import get_layout
+from shared.grid_background import create_frame_background
+from shared.scene import Scene, render_preset, job_from_argv
+from shared.sidecar import event
+from shared.render import ease_out_cubic, ease_in_out_cubic, clamp
 
 
+@timed("assets")
 def load_portrait(path, size):
     """Load and crop portrait to circle-ready square."""
     try:
-        if path and os.path.exists(path):
-            img = Image.open(path).convert("RGBA")
-            iw, ih = img.size
-            # Center crop to square
-            s = min(iw, ih)
-            l = (iw - s) // 2
-            t = (ih - s) // 2
-            img = img.crop((l, t, l + s, t + s))
-            return img.resize((size, size), Image.LANCZOS)
+        if asset_exists(path):
+            return fit_image(path, size, size)  # centre crop to square
     except: pass
     return None
 
@@ -52,7 +52,7 @@ def create_portrait_placeholder(size, color_hex, initials=""):
     return img
 
 
-def render(params, output_path):
+def build_scene(params):
     theme = get_theme(params)
     name = params.get("name", "SPEAKER")
     title_text = params.get("title", "")  # role/company
@@ -62,26 +62,27 @@ def render(params, output_path):
     is_overlay = params.get("overlay", False)
     source = params.get("source", "")
     duration = params.get("duration", 4.0)
-    fps = 30
-    W, H = 1920, 1080
+    profile = get_profile(params)
+    fps = profile["fps"]
+    L = get_layout(params, profile)
+    W, H, u = L.W, L.H, L.u
 
-    total_frames = int(duration * fps)
     accent_rgb = hex_to_rgb(accent_color)
 
-    font_name = get_font(theme["font_title"], 36)
-    font_title = get_font(theme["font_body"], 24)
-    font_source = get_font(theme["font_body"], 16)
+    font_name = get_font(theme["font_title"], u(36))
+    font_title = get_font(theme["font_body"], u(24))
+    font_source = get_font(theme["font_body"], u(16))
 
     if is_overlay:
-        bg = Image.new("RGBA", (W, H), (0, 0, 0, 0))
+        bg, plate = Image.new("RGBA", (W, H), (0, 0, 0, 0)), None
     else:
-        bg = create_grid_background(W, H, theme)
+        bg, plate = create_frame_background(W, H, theme, params)
 
     text_color = hex_to_rgba(theme["primary_text"], 255)
     sub_color = hex_to_rgba(theme["secondary_text"], 255)
 
     # Portrait
-    portrait_size = 320
+    portrait_size = u(320)
     portrait = load_portrait(portrait_path, portrait_size)
     if not portrait:
         initials = "".join(w[0] for w in name.split()[:2]).upper()
@@ -96,14 +97,10 @@ def render(params, output_path):
         cx = W * 3 // 4
     else:
         cx = W // 2
-    cy = H // 2 - 40
-
-    frames = []
+    cy = H // 2 - u(40)
 
-    for fi in range(total_frames):
-        frame = bg.copy()
+    def draw_frame(frame, tsec):
         draw = ImageDraw.Draw(frame)
-        tsec = fi / fps
 
         # Portrait scale in (0-0.5s)
         scale_t = clamp(tsec / 0.5)
@@ -130,8 +127,8 @@ def render(params, output_path):
             # Circle border (accent)
             border_a = int(255 * scale)
             draw.ellipse(
-                [(px - 3, py - 3), (px + s + 3, py + s + 3)],
-                outline=(*accent_rgb, border_a), width=4
+                [(px - u(3), py - u(3)), (px + s + u(3), py + s + u(3))],
+                outline=(*accent_rgb, border_a), width=u(4)
             )
 
         # Name banner (slides up, 0.4-0.8s)
@@ -139,14 +136,14 @@ def render(params, output_path):
         if name_t > 0:
             name_ease = ease_out_cubic(name_t)
             na = int(255 * name_ease)
-            slide = int(20 * (1.0 - name_ease))
+            slide = int(u(20) * (1.0 - name_ease))
 
             # Name background pill
             nw, nh = get_text_size(draw, name, font_name)
-            pill_w = nw + 40
-            pill_h = nh + 16
+            pill_w = nw + u(40)
+            pill_h = nh + u(16)
             pill_x = cx - pill_w // 2
-            pill_y = cy + portrait_size // 2 + 20 + slide
+            pill_y = cy + portrait_size // 2 + u(20) + slide
 
             draw.rounded_rectangle(
                 [(pill_x, pill_y), (pill_x + pill_w, pill_y + pill_h)],
@@ -154,10 +151,10 @@ def render(params, output_path):
             )
             # Accent left edge on pill
             draw.rounded_rectangle(
-                [(pill_x, pill_y), (pill_x + 5, pill_y + pill_h)],
-                radius=2, fill=(*accent_rgb, na)
+                [(pill_x, pill_y), (pill_x + u(5), pill_y + pill_h)],
+                radius=u(2), fill=(*accent_rgb, na)
             )
-            draw.text((pill_x + 20, pill_y + 8), name,
+            draw.text((pill_x + u(20), pill_y + u(8)), name,
                       fill=(*text_color[:3], na), font=font_name)
 
             # Title/role below name (0.6-1.0s)
@@ -166,7 +163,7 @@ def render(params, output_path):
                 if title_t > 0:
                     ta = int(180 * ease_out_cubic(title_t))
                     tw2, th2 = get_text_size(draw, title_text, font_title)
-                    draw.text((cx - tw2 // 2, pill_y + pill_h + 10 + slide),
+                    draw.text((cx - tw2 // 2, pill_y + pill_h + u(10) + slide),
                               title_text, fill=(*sub_color[:3], ta), font=font_title)
 
         # Source
@@ -175,12 +172,21 @@ def render(params, output_path):
             if src_t > 0:
                 sa = int(130 * ease_out_cubic(src_t))
                 ssw, ssh = get_text_size(draw, source, font_source)
-                draw.text((W - ssw - 30, H - 35), source, fill=(*sub_color[:3], sa), font=font_source)
+                draw.text((W - ssw - u(30), H - u(35)), source, fill=(*sub_color[:3], sa), font=font_source)
+
+    events = [event(0, "portrait_in"), event(0.4, "name_in"), event(0.5, "portrait_landed")]
+    if title_text:
+        events.append(event(0.6, "title_in"))
+    if source and not is_overlay:
+        events.append(event(1.0, "source_in"))
 
-        frames.append(frame)
+    return Scene(W, H, fps, duration, bg, plate, draw_frame, profile, theme=theme, overlay=is_overlay,
+                 events=events)
 
-    render_frames_to_video(frames, output_path, fps=fps)
+
+def render(params, output_path):
+    output_path = render_preset("person_pip", build_scene, params, output_path)
     print(f"Rendered person_pip to {output_path}")
 
 if __name__ == "__main__":
-    render(json.loads(sys.argv[1]), sys.argv[2])
+    render(*job_from_argv(sys.argv))
@@ -10,27 +10,22 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from PIL import Image, ImageDraw
 from shared.colors import get_theme, hex_to_rgba, hex_to_rgb
+from shared.metrics import timed
+from shared.assets import fit_image, asset_exists
 from shared.fonts import get_font, get_text_size
-from shared.grid_background import create_grid_background
-from shared.render import render_frames_to_video, ease_out_cubic, ease_in_out_cubic, clamp
+from shared.profiles import get_profile
+from shared.layout import get_layout
+from shared.grid_background import create_frame_background
+from shared.scene import Scene, render_preset, job_from_argv
+from shared.sidecar import event
+from shared.render import ease_out_cubic, ease_in_out_cubic, clamp
 
 
+@timed("assets")
 def load_portrait(path, w, h):
     try:
-        if path and os.path.exists(path):
-            img = Image.open(path).convert("RGBA")
-            iw, ih = img.size
-            ratio = w / h
-            ir = iw / ih
-            if ir > ratio:
-                nw = int(ih * ratio)
-                l = (iw - nw) // 2
-                img = img.crop((l, 0, l + nw, ih))
-            else:
-                nh = int(iw / ratio)
-                t = (ih - nh) // 2
-                img = img.crop((0, t, iw, t + nh))
-            return img.resize((w, h), Image.LANCZOS)
+        if asset_exists(path):
+            return fit_image(path, w, h)
     except: pass
     return None
 
@@ -63,7 +58,7 @@ def wrap_text(draw, text, font, max_width):
     return lines
 
 
-def render(params, output_path):
+def build_scene(params):
     theme = get_theme(params)
     name = params.get("name", "SPEAKER")
     title_text = params.get("title", "")
@@ -74,26 +69,27 @@ def render(params, output_path):
     source = params.get("source", "")
     duration = params.get("duration", 6.0)
     typing_speed = params.get("typing_speed", 0.04)
-    fps = 30
-    W, H = 1920, 1080
+    profile = get_profile(params)
+    fps = profile["fps"]
+    L = get_layout(params, profile)
+    W, H, u = L.W, L.H, L.u
 
-    total_frames = int(duration * fps)
     accent_rgb = hex_to_rgb(accent_color)
 
-    font_quote = get_font(theme["font_body"], 44)
-    font_mark = get_font(theme["font_title"], 120)
-    font_name = get_font(theme["font_title"], 30)
-    font_role = get_font(theme["font_body"], 22)
-    font_source = get_font(theme["font_body"], 16)
+    font_quote = get_font(theme["font_body"], u(44))
+    font_mark = get_font(theme["font_title"], u(120))
+    font_name = get_font(theme["font_title"], u(30))
+    font_role = get_font(theme["font_body"], u(22))
+    font_source = get_font(theme["font_body"], u(16))
 
-    bg = create_grid_background(W, H, theme)
+    bg, plate = create_frame_background(W, H, theme, params)
     text_color = hex_to_rgba(theme["primary_text"], 255)
     sub_color = hex_to_rgba(theme["secondary_text"], 255)
 
     # Layout
-    portrait_w = 500
-    portrait_h = H - 80
-    split_x = W - portrait_w - 40 if portrait_side == "right" else portrait_w + 40
+    portrait_w = u(500)
+    portrait_h = H - u(80)
+    split_x = W - portrait_w - u(40) if portrait_side == "right" else portrait_w + u(40)
 
     portrait = load_portrait(portrait_path, portrait_w, portrait_h)
     if not portrait:
@@ -102,36 +98,32 @@ def render(params, output_path):
 
     # Pre-wrap quote
     tmp = ImageDraw.Draw(bg)
-    quote_area_w = split_x - 160 if portrait_side == "right" else W - split_x - 160
+    quote_area_w = split_x - u(160) if portrait_side == "right" else W - split_x - u(160)
     quote_lines = wrap_text(tmp, quote, font_quote, quote_area_w)
-    line_h = get_text_size(tmp, "Ay", font_quote)[1] + 10
+    line_h = get_text_size(tmp, "Ay", font_quote)[1] + u(10)
     total_quote_h = len(quote_lines) * line_h
 
     total_chars = len(quote)
     typing_start = 0.6
 
-    frames = []
-
-    for fi in range(total_frames):
-        frame = bg.copy()
+    def draw_frame(frame, tsec):
         draw = ImageDraw.Draw(frame)
-        tsec = fi / fps
 
         # Portrait slide in (0-0.5s)
         slide_t = clamp(tsec / 0.5)
         slide_ease = ease_out_cubic(slide_t)
 
         if portrait_side == "right":
-            p_target_x = W - portrait_w - 20
-            p_start_x = W + 20
-            quote_x = 100
+            p_target_x = W - portrait_w - u(20)
+            p_start_x = W + u(20)
+            quote_x = u(100)
         else:
-            p_target_x = 20
-            p_start_x = -portrait_w - 20
-            quote_x = split_x + 60
+            p_target_x = u(20)
+            p_start_x = -portrait_w - u(20)
+            quote_x = split_x + u(60)
 
         px = int(p_start_x + (p_target_x - p_start_x) * slide_ease)
-        py = 40
+        py = u(40)
 
         p_alpha = int(255 * min(1.0, slide_t * 2))
         port = portrait.copy()
@@ -144,8 +136,8 @@ def render(params, output_path):
         if slide_t > 0.2:
             ba = int(180 * min(1.0, (slide_t - 0.2) * 2))
             draw.rounded_rectangle(
-                [(px - 3, py - 3), (px + portrait_w + 3, py + portrait_h + 3)],
-                radius=8, outline=(*accent_rgb, ba), width=4
+                [(px - u(3), py - u(3)), (px + portrait_w + u(3), py + portrait_h + u(3))],
+                radius=u(8), outline=(*accent_rgb, ba), width=u(4)
             )
 
         # Name tag on portrait (bottom, over portrait)
@@ -153,20 +145,20 @@ def render(params, output_path):
         if name_t > 0:
             na = int(255 * ease_out_cubic(name_t))
             nw, nh = get_text_size(draw, name, font_name)
-            tag_w = nw + 30
-            tag_h = nh + 10
+            tag_w = nw + u(30)
+            tag_h = nh + u(10)
             tag_x = px + portrait_w // 2 - tag_w // 2
-            tag_y = py + portrait_h - tag_h - 15
+            tag_y = py + portrait_h - tag_h - u(15)
 
             draw.rounded_rectangle(
                 [(tag_x, tag_y), (tag_x + tag_w, tag_y + tag_h)],
-                radius=4, fill=(10, 10, 20, int(200 * ease_out_cubic(name_t)))
+                radius=u(4), fill=(10, 10, 20, int(200 * ease_out_cubic(name_t)))
             )
             draw.rounded_rectangle(
-                [(tag_x, tag_y), (tag_x + 4, tag_y + tag_h)],
-                radius=1, fill=(*accent_rgb, na)
+                [(tag_x, tag_y), (tag_x + u(4), tag_y + tag_h)],
+                radius=u(1), fill=(*accent_rgb, na)
             )
-            draw.text((tag_x + 15, tag_y + 5), name,
+            draw.text((tag_x + u(15), tag_y + u(5)), name,
                       fill=(255, 255, 255, na), font=font_name)
 
             # Role below name tag
@@ -175,7 +167,7 @@ def render(params, output_path):
                 if rt > 0:
                     ra = int(160 * ease_out_cubic(rt))
                     rw, rh = get_text_size(draw, title_text, font_role)
-                    draw.text((px + portrait_w // 2 - rw // 2, tag_y - rh - 5),
+                    draw.text((px + portrait_w // 2 - rw // 2, tag_y - rh - u(5)),
                               title_text, fill=(*sub_color[:3], ra), font=font_role)
 
         # Opening quote mark (0.3-0.6s)
@@ -183,8 +175,8 @@ def render(params, output_path):
         if mark_t > 0:
             ma = int(60 * ease_out_cubic(mark_t))
             mw, mh = get_text_size(draw, "\u201C", font_mark)
-            quote_base_y = H // 2 - total_quote_h // 2 - 20
-            draw.text((quote_x - 20, quote_base_y - mh // 2 - 10), "\u201C",
+            quote_base_y = H // 2 - total_quote_h // 2 - u(20)
+            draw.text((quote_x - u(20), quote_base_y - mh // 2 - u(10)), "\u201C",
                       fill=(*accent_rgb, ma), font=font_mark)
 
         # Typewriter quote (0.6s+)
@@ -223,12 +215,12 @@ def render(params, output_path):
         if n_chars > 0:
             if n_chars < total_chars:
                 draw.rectangle(
-                    [(cursor_x + 4, cursor_y + 4), (cursor_x + 7, cursor_y + line_h - 14)],
+                    [(cursor_x + u(4), cursor_y + u(4)), (cursor_x + u(7), cursor_y + line_h - u(14))],
                     fill=(*accent_rgb, 230)
                 )
             elif int(tsec * 2.5) % 2 == 0:
                 draw.rectangle(
-                    [(cursor_x + 4, cursor_y + 4), (cursor_x + 7, cursor_y + line_h - 14)],
+                    [(cursor_x + u(4), cursor_y + u(4)), (cursor_x + u(7), cursor_y + line_h - u(14))],
                     fill=(*accent_rgb, 200)
                 )
 
@@ -238,8 +230,8 @@ def render(params, output_path):
             bar_h = int(total_quote_h * ease_out_cubic(bar_t))
             bar_y = quote_base_y + (total_quote_h - bar_h) // 2
             draw.rounded_rectangle(
-                [(quote_x - 16, bar_y), (quote_x - 11, bar_y + bar_h)],
-                radius=2, fill=(*accent_rgb, int(100 * ease_out_cubic(bar_t)))
+                [(quote_x - u(16), bar_y), (quote_x - u(11), bar_y + bar_h)],
+                radius=u(2), fill=(*accent_rgb, int(100 * ease_out_cubic(bar_t)))
             )
 
         # Source
@@ -249,12 +241,22 @@ def render(params, output_path):
             if src_t > 0:
                 sa = int(130 * ease_out_cubic(src_t))
                 ssw, ssh = get_text_size(draw, source, font_source)
-                draw.text((W - ssw - 30, H - 35), source, fill=(*sub_color[:3], sa), font=font_source)
+                draw.text((W - ssw - u(30), H - u(35)), source, fill=(*sub_color[:3], sa), font=font_source)
+
+    typing_end = typing_start + total_chars * typing_speed
+    events = [event(0, "portrait_in"), event(0.4, "name_in"), event(0.5, "portrait_landed"),
+              event(typing_start, "typing_start"), event(typing_end, "typing_done")]
+    if title_text:
+        events.append(event(0.5, "title_in"))
+    if source:
+        events.append(event(typing_end, "source_in"))
 
-        frames.append(frame)
+    return Scene(W, H, fps, duration, bg, plate, draw_frame, profile, theme=theme, events=events)
 
-    render_frames_to_video(frames, output_path, fps=fps)
+
+def render(params, output_path):
+    output_path = render_preset("person_quote", build_scene, params, output_path)
     print(f"Rendered person_quote to {output_path}")
 
 if __name__ == "__main__":
-    render(json.loads(sys.argv[1]), sys.argv[2])
+    render(*job_from_argv(sys.argv))
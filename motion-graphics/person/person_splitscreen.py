@@ -10,27 +10,22 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from PIL import Image, ImageDraw
 from shared.colors import get_theme, hex_to_rgba, hex_to_rgb
+from shared.metrics import timed
+from shared.assets import fit_image, asset_exists
 from shared.fonts import get_font, get_text_size
-from shared.grid_background import create_grid_background
-from shared.render import render_frames_to_video, ease_out_cubic, ease_in_out_cubic, clamp
+from shared.profiles import get_profile
+from shared.layout import get_layout
+from shared.grid_background import create_frame_background
+from shared.scene import Scene, render_preset, job_from_argv
+from shared.sidecar import event
+from shared.render import ease_out_cubic, ease_in_out_cubic, clamp
 
 
+@timed("assets")
 def load_portrait(path, w, h):
     try:
-        if path and os.path.exists(path):
-            img = Image.open(path).convert("RGBA")
-            iw, ih = img.size
-            ratio = w / h
-            ir = iw / ih
-            if ir > ratio:
-                nw = int(ih * ratio)
-                l = (iw - nw) // 2
-                img = img.crop((l, 0, l + nw, ih))
-            else:
-                nh = int(iw / ratio)
-                t = (ih - nh) // 2
-                img = img.crop((0, t, iw, t + nh))
-            return img.resize((w, h), Image.LANCZOS)
+        if asset_exists(path):
+            return fit_image(path, w, h)
     except: pass
     return None
 
@@ -46,7 +41,7 @@ def create_portrait_placeholder(w, h, color_hex, initials=""):
     return img
 
 
-def render(params, output_path):
+def build_scene(params):
     theme = get_theme(params)
     name = params.get("name", "SPEAKER")
     title_text = params.get("title", "")
@@ -56,37 +51,34 @@ def render(params, output_path):
     portrait_side = params.get("portrait_side", "left")
     source = params.get("source", "")
     duration = params.get("duration", 4.0)
-    fps = 30
-    W, H = 1920, 1080
+    profile = get_profile(params)
+    fps = profile["fps"]
+    L = get_layout(params, profile)
+    W, H, u = L.W, L.H, L.u
 
-    total_frames = int(duration * fps)
     accent_rgb = hex_to_rgb(accent_color)
 
-    font_name = get_font(theme["font_title"], 56)
-    font_title = get_font(theme["font_body"], 32)
-    font_org = get_font(theme["font_body"], 28)
-    font_source = get_font(theme["font_body"], 16)
+    font_name = get_font(theme["font_title"], u(56))
+    font_title = get_font(theme["font_body"], u(32))
+    font_org = get_font(theme["font_body"], u(28))
+    font_source = get_font(theme["font_body"], u(16))
 
-    bg = create_grid_background(W, H, theme)
+    bg, plate = create_frame_background(W, H, theme, params)
     text_color = hex_to_rgba(theme["primary_text"], 255)
     sub_color = hex_to_rgba(theme["secondary_text"], 255)
 
     # Portrait area: left or right half
     split_x = W // 2
-    portrait_w = split_x - 40
-    portrait_h = H - 80
+    portrait_w = split_x - u(40)
+    portrait_h = H - u(80)
 
     portrait = load_portrait(portrait_path, portrait_w, portrait_h)
     if not portrait:
         initials = "".join(w[0] for w in name.split()[:2]).upper()
         portrait = create_portrait_placeholder(portrait_w, portrait_h, accent_color, initials)
 
-    frames = []
-
-    for fi in range(total_frames):
-        frame = bg.copy()
+    def draw_frame(frame, tsec):
         draw = ImageDraw.Draw(frame)
-        tsec = fi / fps
 
         # Divider line (accent, center)
         div_t = clamp(tsec / 0.4)
@@ -94,8 +86,8 @@ def render(params, output_path):
             div_h = int(H * ease_out_cubic(div_t))
             div_y = (H - div_h) // 2
             draw.rounded_rectangle(
-                [(split_x - 2, div_y), (split_x + 2, div_y + div_h)],
-                radius=2, fill=(*accent_rgb, int(180 * ease_out_cubic(div_t)))
+                [(split_x - u(2), div_y), (split_x + u(2), div_y + div_h)],
+                radius=u(2), fill=(*accent_rgb, int(180 * ease_out_cubic(div_t)))
             )
 
         # Portrait slide in (0-0.5s)
@@ -103,16 +95,16 @@ def render(params, output_path):
         slide_ease = ease_out_cubic(slide_t)
 
         if portrait_side == "left":
-            p_target_x = 20
-            p_start_x = -portrait_w - 20
-            text_x = split_x + 50
+            p_target_x = u(20)
+            p_start_x = -portrait_w - u(20)
+            text_x = split_x + u(50)
         else:
-            p_target_x = split_x + 20
-            p_start_x = W + 20
-            text_x = 60
+            p_target_x = split_x + u(20)
+            p_start_x = W + u(20)
+            text_x = u(60)
 
         px = int(p_start_x + (p_target_x - p_start_x) * slide_ease)
-        py = 40
+        py = u(40)
 
         # Portrait with alpha
         p_alpha = int(255 * min(1.0, slide_t * 2))
@@ -127,18 +119,18 @@ def render(params, output_path):
             ba = int(200 * min(1.0, (slide_t - 0.2) * 2))
             # Rounded rectangle border around portrait
             draw.rounded_rectangle(
-                [(px - 3, py - 3), (px + portrait_w + 3, py + portrait_h + 3)],
-                radius=8, outline=(*accent_rgb, ba), width=4
+                [(px - u(3), py - u(3)), (px + portrait_w + u(3), py + portrait_h + u(3))],
+                radius=u(8), outline=(*accent_rgb, ba), width=u(4)
             )
 
         # Text side - name (0.3-0.7s)
         name_t = clamp((tsec - 0.3) / 0.4)
         if name_t > 0:
             na = int(255 * ease_out_cubic(name_t))
-            slide_y = int(20 * (1.0 - ease_out_cubic(name_t)))
+            slide_y = int(u(20) * (1.0 - ease_out_cubic(name_t)))
 
-            text_area_w = split_x - 100
-            name_y = H // 2 - 70 + slide_y
+            text_area_w = split_x - u(100)
+            name_y = H // 2 - u(70) + slide_y
 
             # Name
             nw, nh = get_text_size(draw, name, font_name)
@@ -148,8 +140,8 @@ def render(params, output_path):
             # Accent underline
             line_w = int(min(nw, text_area_w) * ease_out_cubic(name_t))
             draw.rounded_rectangle(
-                [(text_x, name_y + nh + 8), (text_x + line_w, name_y + nh + 13)],
-                radius=2, fill=(*accent_rgb, na)
+                [(text_x, name_y + nh + u(8)), (text_x + line_w, name_y + nh + u(13))],
+                radius=u(2), fill=(*accent_rgb, na)
             )
 
             # Title/role (0.5-0.9s)
@@ -157,7 +149,7 @@ def render(params, output_path):
                 tt = clamp((tsec - 0.5) / 0.4)
                 if tt > 0:
                     ta = int(200 * ease_out_cubic(tt))
-                    draw.text((text_x, name_y + nh + 28 + slide_y), title_text,
+                    draw.text((text_x, name_y + nh + u(28) + slide_y), title_text,
                               fill=(*sub_color[:3], ta), font=font_title)
 
             # Organization (0.7-1.1s)
@@ -166,7 +158,7 @@ def render(params, output_path):
                 if ot > 0:
                     oa = int(160 * ease_out_cubic(ot))
                     _, tth = get_text_size(draw, title_text, font_title) if title_text else (0, 0)
-                    org_y = name_y + nh + 28 + (tth + 10 if title_text else 0) + slide_y
+                    org_y = name_y + nh + u(28) + (tth + u(10) if title_text else 0) + slide_y
                     draw.text((text_x, org_y), organization,
                               fill=(*accent_rgb, oa), font=font_org)
 
@@ -176,12 +168,22 @@ def render(params, output_path):
             if src_t > 0:
                 sa = int(130 * ease_out_cubic(src_t))
                 ssw, ssh = get_text_size(draw, source, font_source)
-                draw.text((W - ssw - 30, H - 35), source, fill=(*sub_color[:3], sa), font=font_source)
+                draw.text((W - ssw - u(30), H - u(35)), source, fill=(*sub_color[:3], sa), font=font_source)
+
+    events = [event(0, "portrait_in"), event(0.3, "name_in"), event(0.5, "portrait_landed")]
+    if title_text:
+        events.append(event(0.5, "title_in"))
+    if organization:
+        events.append(event(0.7, "organization_in"))
+    if source:
+        events.append(event(1.2, "source_in"))
 
-        frames.append(frame)
+    return Scene(W, H, fps, duration, bg, plate, draw_frame, profile, theme=theme, events=events)
 
-    render_frames_to_video(frames, output_path, fps=fps)
+
+def render(params, output_path):
+    output_path = render_preset("person_splitscreen", build_scene, params, output_path)
     print(f"Rendered person_splitscreen to {output_path}")
 
 if __name__ == "__main__":
-    render(json.loads(sys.argv[1]), sys.argv[2])
+    render(*job_from_argv(sys.argv))
@@ -0,0 +1,223 @@
+"""Motion Graphics — Shared Asset Store
+
+A host-level store of decoded, cropped and resized source images
+(thumbnails, portraits, logos) in shared memory, so parallel renders (batch
+workers, the pipeline, a preview daemon) decode and resize an asset once and
+map the same pixels instead of each keeping a private copy.
+
+$MG_ASSET_STORE_MB enables it with a size bound (shared.batch sets it for
+its workers with --asset-store-mb). Entries are keyed by a hash of the file
+contents and the fitted size, so renaming or copying a file still hits and
+editing it does not. Images come back as read-only PIL views on the shared
+segment: no copy is made, and a caller that draws on one gets a private
+copy from Pillow. preload() puts a full-size decode in the store ahead of
+the renders (shared.prefetch) without holding it; open_image maps it
+instead of decoding when one is there.
+
+The index (under MG_CACHE_DIR, guarded by a file lock) records which live
+processes use each entry. When the store outgrows its bound, entries no
+live process uses are unlinked, least recently used first; entries in use
+stay until their users exit.
+
+Segment names start with a hash of the index path (mg-<store>-...), so
+stores of different cache dirs never share or unlink each other's segments.
+The first time a process opens the index it unlinks this store's segments
+the index doesn't list (left behind by a lost or deleted index).
+"""
+import os, json, time, atexit, fcntl, hashlib
+from contextlib import contextmanager
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from PIL import Image
+from shared import metrics
+from shared.grid_background import CACHE_DIR
+from shared.governor import _alive
+
+STORE_DIR = os.path.join(CACHE_DIR, "asset-store")
+INDEX = os.path.join(STORE_DIR, "index.json")
+SHM_DIR = "/dev/shm"
+PREFIX = f"mg-{hashlib.sha1(os.path.abspath(INDEX).encode('utf-8')).hexdigest()[:8]}-"
+
+_mapped = {}   # segment name -> SharedMemory, kept open while this process uses the image
+_hashes = {}   # (path, mtime_ns, size) -> content digest
+_swept = False
+
+
+def store_budget_mb():
+    """Size bound of the store from $MG_ASSET_STORE_MB, or None when it is off."""
+    value = os.environ.get("MG_ASSET_STORE_MB")
+    return float(value) if value and float(value) > 0 else None
+
+
+def _digest(path):
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    if key not in _hashes:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        _hashes[key] = h.hexdigest()
+    return _hashes[key]
+
+
+def _untrack(shm):
+    # Segments outlive the process that made or mapped them: the store unlinks them, not
+    # multiprocessing's resource tracker (which would at this process' exit)
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+def _sweep(index):
+    """Unlink this store's segments that the index doesn't list."""
+    try:
+        names = os.listdir(SHM_DIR)
+    except OSError:
+        return  # no /dev/shm to list (not Linux)
+    for name in names:
+        if name.startswith(PREFIX) and name not in index:
+            _unlink(name)
+            metrics.count("asset_store_orphans")
+
+
+@contextmanager
+def _locked_index():
+    global _swept
+    os.makedirs(STORE_DIR, exist_ok=True)
+    with open(os.path.join(STORE_DIR, "lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            with open(INDEX, encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        if not _swept:
+            _swept = True
+            _sweep(index)
+        yield index
+        tmp = f"{INDEX}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, INDEX)
+
+
+def _unlink(name):
+    try:
+        shm = SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()  # also drops the resource tracker's registration of this attach
+
+
+def _evict(index, budget_mb):
+    """Unlink unused entries, least recently used first, until the store fits its bound."""
+    for entry in index.values():
+        entry["users"] = [pid for pid in entry["users"] if _alive(pid)]
+    total = sum(e["bytes"] for e in index.values())
+    for name in sorted((n for n, e in index.items() if not e["users"]), key=lambda n: index[n]["used"]):
+        if total <= budget_mb * 1024 * 1024:
+            break
+        total -= index.pop(name)["bytes"]
+        _unlink(name)
+        metrics.count("asset_store_evictions")
+
+
+def _map(name, size):
+    shm = _mapped.get(name)
+    if shm is None:
+        shm = _mapped[name] = SharedMemory(name=name)
+        _untrack(shm)
+    return Image.frombuffer("RGBA", size, shm.buf[:size[0] * size[1] * 4], "raw", "RGBA", 0, 1)
+
+
+def _use(index, name):
+    entry = index[name]
+    if os.getpid() not in entry["users"]:
+        entry["users"].append(os.getpid())
+    entry["used"] = time.time()
+
+
+def _create(name, img):
+    w, h = img.size
+    try:
+        shm = SharedMemory(name=name, create=True, size=w * h * 4)
+    except FileExistsError:  # left behind by a lost index
+        _unlink(name)
+        shm = SharedMemory(name=name, create=True, size=w * h * 4)
+    _untrack(shm)
+    shm.buf[:w * h * 4] = img.tobytes()
+    return shm
+
+
+def stored_decode(path):
+    """The full-size decode of path when one was preloaded into the store, else None."""
+    name = f"{PREFIX}{_digest(path)[:16]}-full"
+    with _locked_index() as index:
+        entry = index.get(name)
+        if entry is None:
+            return None
+        try:
+            img = _map(name, tuple(entry["size"]))
+        except FileNotFoundError:
+            index.pop(name)
+            return None
+        _use(index, name)
+        metrics.count("asset_store_hits")
+        return img
+
+
+def preload(path, decode, budget_mb):
+    """Store decode(path) full-size for renders to come, without becoming a user; False when already stored."""
+    name = f"{PREFIX}{_digest(path)[:16]}-full"
+    with _locked_index() as index:
+        if name in index:
+            index[name]["used"] = time.time()
+            return False
+    img = decode(path)
+    with _locked_index() as index:
+        if name in index:
+            return False
+        _create(name, img).close()
+        index[name] = {"bytes": img.width * img.height * 4, "size": list(img.size), "users": [],
+                       "used": time.time()}
+        _evict(index, budget_mb)
+    return True
+
+
+def shared_image(path, size, crop, fit):
+    """The fitted image of path at size from the store; fit(path) makes it on a miss."""
+    w, h = size
+    name = f"{PREFIX}{_digest(path)[:16]}-{w}x{h}{'c' if crop else 's'}"
+    with _locked_index() as index:
+        if name in index:
+            try:
+                img = _map(name, size)
+                _use(index, name)
+                _evict(index, store_budget_mb() or 0)
+                metrics.count("asset_store_hits")
+                return img
+            except FileNotFoundError:
+                index.pop(name)  # unlinked behind the index's back (e.g. a reboot)
+    img = fit(path)  # decoded outside the lock, so other workers' hits don't wait on it
+    with _locked_index() as index:
+        if name not in index:
+            _mapped[name] = _create(name, img)
+            index[name] = {"bytes": w * h * 4, "users": [], "used": time.time()}
+            metrics.count("asset_store_misses")
+        _use(index, name)
+        _evict(index, store_budget_mb() or 0)
+        return _map(name, size)
+
+
+@atexit.register
+def _release():
+    """Stop counting as a user of the entries this process mapped, so they can be evicted."""
+    if not _mapped:
+        return
+    with _locked_index() as index:
+        for name in _mapped:
+            if name in index and os.getpid() in index[name]["users"]:
+                index[name]["users"].remove(os.getpid())
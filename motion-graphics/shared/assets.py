@@ -0,0 +1,98 @@
+"""Motion Graphics — Source Images
+
+open_image(path) decodes a source image (thumbnail, portrait, logo) to RGBA.
+Inside asset_scope() every path is decoded once and shared, so a
+multi-output render (shared.variants) that builds the same preset for
+several layouts crops and resizes from one decode per file. Outside a scope
+nothing is kept: a single render decodes each source once anyway, and
+holding the full-size decodes would only raise its peak memory.
+
+fit_image(path, w, h) is what presets load: the source cropped to the
+target aspect (centred) and resized. With $MG_ASSET_STORE_MB set it comes
+from the host's shared asset store (shared.asset_store), so parallel
+renders fit each source once, and open_image maps a decode the batch's
+prefetch (shared.prefetch) put there instead of decoding again.
+
+Paths may also be http(s) URLs: they are fetched into the download cache
+(shared.remote) and loaded from there. Presets check a path with
+asset_exists() before loading it.
+
+Callers must treat the returned image as read-only (crop/resize/copy).
+"""
+import os
+from contextlib import contextmanager
+from PIL import Image
+from shared import metrics
+from shared.asset_store import store_budget_mb, shared_image, stored_decode
+from shared.remote import is_url, local_path
+
+_scope = None
+
+
+def asset_exists(path):
+    """Whether path names a source image: an existing file or a URL (fetched when loaded)."""
+    return bool(path) and (is_url(path) or os.path.exists(path))
+
+
+def decode(path):
+    """path decoded to RGBA, or mapped from the asset store when it was preloaded there."""
+    if store_budget_mb():
+        img = stored_decode(path)
+        if img is not None:
+            return img
+    return Image.open(path).convert("RGBA")
+
+
+def open_image(path):
+    """Decoded RGBA image at path; shared between callers inside asset_scope()."""
+    path = local_path(path)
+    if _scope is None:
+        return decode(path)
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    img = _scope.get(key)
+    if img is None:
+        metrics.count("asset_decodes")
+        img = _scope[key] = decode(path)
+    else:
+        metrics.count("asset_reuses")
+    return img
+
+
+def _fit(path, w, h, crop):
+    img = open_image(path)
+    if crop:
+        iw, ih = img.size
+        ratio = w / h
+        if iw / ih > ratio:
+            nw = int(ih * ratio)
+            l = (iw - nw) // 2
+            img = img.crop((l, 0, l + nw, ih))
+        else:
+            nh = int(iw / ratio)
+            t = (ih - nh) // 2
+            img = img.crop((0, t, iw, t + nh))
+    return img.resize((w, h), Image.LANCZOS)
+
+
+def fit_image(path, w, h, crop=True):
+    """Source image at exactly w x h: centre-cropped to the aspect first, or stretched with crop=False."""
+    path = local_path(path)
+    if store_budget_mb():
+        return shared_image(path, (w, h), crop, lambda p: _fit(p, w, h, crop))
+    return _fit(path, w, h, crop)
+
+
+def in_scope():
+    """Whether decodes are being shared by an enclosing asset_scope()."""
+    return _scope is not None
+
+
+@contextmanager
+def asset_scope():
+    """Share decoded source images between everything built inside the block."""
+    global _scope
+    prev, _scope = _scope, {} if _scope is None else _scope
+    try:
+        yield
+    finally:
+        _scope = prev
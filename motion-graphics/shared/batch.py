@@ -0,0 +1,125 @@
+"""Motion Graphics — Batch Renderer
+
+Renders a list of jobs in parallel worker processes under the CPU governor
+(shared.governor): every job gets MG_JOBS so its x264 pool is sized to its
+share of the cores, and jobs start longest-first by the cost model's estimate
+(shared.cost) so the tail of the batch isn't one big listicle on one core.
+
+    python3 -m shared.batch jobs.jsonl [-j N] [--memory-budget-mb MB] [--asset-store-mb MB]
+                                       [--prefetch-threads N] [--summary out.json]
+
+jobs.jsonl has one {"preset": <registry id>, "params": {...}, "output": <path>}
+per line. -j defaults to one job per two cores (draw thread + encoder); with
+a memory budget, no more jobs than fit next to each other by their estimated
+peaks, and each job gets an equal slice as its memory budget (shared.budget).
+--asset-store-mb lets the workers share decoded source images through the
+host's asset store (shared.asset_store) instead of each fitting its own.
+Meanwhile the batch loads every job's source images on --prefetch-threads
+threads (shared.prefetch; 0 turns it off): into the store when there is
+one, otherwise ahead into the OS page cache.
+Run from the motion-graphics directory.
+"""
+import sys, os, json, time, subprocess, resource
+from concurrent.futures import ThreadPoolExecutor
+from shared.governor import host_cores
+from shared.cost import estimate, resolve_preset
+from shared.prefetch import prefetching, asset_paths, PREFETCH_THREADS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def default_jobs(cores=None):
+    return max(1, (cores or host_cores()) // 2)
+
+
+def plan_batch(jobs, parallel=None, memory_budget_mb=None):
+    """Estimate every job, order longest-first and pick the parallelism."""
+    planned = []
+    for job in jobs:
+        est = estimate(job["preset"], job.get("params", {}))
+        planned.append(dict(job, estimate=est))
+    planned.sort(key=lambda j: j["estimate"]["est_seconds"], reverse=True)
+    parallel = parallel or default_jobs()
+    if memory_budget_mb and planned:
+        peak = max(j["estimate"]["est_peak_mb"]["total"] for j in planned)
+        parallel = max(1, min(parallel, int(memory_budget_mb // peak)))
+    return planned, min(parallel, max(1, len(planned)))
+
+
+def _run_job(job, parallel, memory_budget_mb, log, asset_store_mb=None):
+    entry = resolve_preset(job["preset"])
+    env = dict(os.environ, MG_JOBS=str(parallel))
+    if memory_budget_mb:
+        env["MG_MEMORY_BUDGET_MB"] = str(round(memory_budget_mb / parallel))  # see shared.budget
+    if asset_store_mb:
+        env["MG_ASSET_STORE_MB"] = str(asset_store_mb)  # see shared.asset_store
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, os.path.join(ROOT, entry["script"]), json.dumps(job.get("params", {})),
+                           job["output"]], cwd=ROOT, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    record = None
+    for line in proc.stdout.splitlines():
+        if line.startswith("MG_METRICS "):
+            record = json.loads(line[len("MG_METRICS "):])
+    result = {"preset": job["preset"], "output": job["output"], "ok": proc.returncode == 0,
+              "wall_s": round(wall, 3), "est_seconds": job["estimate"]["est_seconds"], "metrics": record}
+    if proc.returncode != 0:
+        result["error"] = (proc.stderr or proc.stdout).strip()[-500:]
+    log(f"  {'ok  ' if result['ok'] else 'FAIL'} {job['preset']:20s} {wall:7.2f}s "
+        f"(est {job['estimate']['est_seconds']:.1f}s) → {job['output']}")
+    return result
+
+
+def run_batch(jobs, parallel=None, memory_budget_mb=None, log=print, asset_store_mb=None,
+              prefetch_threads=PREFETCH_THREADS):
+    planned, parallel = plan_batch(jobs, parallel, memory_budget_mb)
+    cores = host_cores()
+    log(f"Batch: {len(planned)} jobs, {parallel} at a time on {cores} cores")
+    paths = []
+    for job in planned:  # in start order, so the first jobs' assets are loaded first
+        asset_paths(job.get("params", {}), paths, ROOT)
+    usage0 = resource.getrusage(resource.RUSAGE_CHILDREN)
+    t0 = time.perf_counter()
+    with prefetching(paths, prefetch_threads, asset_store_mb) as prefetch, \
+            ThreadPoolExecutor(max_workers=parallel) as ex:
+        results = list(ex.map(lambda j: _run_job(j, parallel, memory_budget_mb, log, asset_store_mb), planned))
+    wall = time.perf_counter() - t0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (usage.ru_utime - usage0.ru_utime) + (usage.ru_stime - usage0.ru_stime)
+    frames = sum((r["metrics"] or {}).get("frames", 0) for r in results if r["ok"])
+    return {
+        "jobs": len(results),
+        "failed": sum(not r["ok"] for r in results),
+        "parallel": parallel,
+        "cores": cores,
+        "wall_s": round(wall, 3),
+        "job_wall_s": round(sum(r["wall_s"] for r in results), 3),
+        "frames_per_s": round(frames / wall, 2) if wall else None,
+        "cpu_s": round(cpu, 3),
+        "utilization": round(cpu / (wall * cores), 3) if wall else None,
+        "prefetch": prefetch,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Render motion graphics jobs in parallel under the CPU governor")
+    ap.add_argument("jobs", help="JSON lines file: {preset, params, output} per line")
+    ap.add_argument("-j", "--parallel", type=int, help="concurrent jobs (default: cores / 2)")
+    ap.add_argument("--memory-budget-mb", type=float, help="total memory for all concurrent jobs")
+    ap.add_argument("--asset-store-mb", type=float, help="share fitted source images between workers (store size)")
+    ap.add_argument("--prefetch-threads", type=int, default=PREFETCH_THREADS,
+                    help=f"threads loading the jobs' source images ahead (default: {PREFETCH_THREADS}, 0: off)")
+    ap.add_argument("--summary", help="write the batch summary JSON here")
+    args = ap.parse_args()
+    with open(args.jobs, encoding="utf-8") as f:
+        jobs = [json.loads(line) for line in f if line.strip()]
+    summary = run_batch(jobs, args.parallel, args.memory_budget_mb, asset_store_mb=args.asset_store_mb,
+                        prefetch_threads=args.prefetch_threads)
+    print(f"Done: {summary['jobs'] - summary['failed']}/{summary['jobs']} in {summary['wall_s']:.2f}s, "
+          f"{summary['frames_per_s']} frames/s, CPU utilization {summary['utilization']:.0%}")
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    sys.exit(1 if summary["failed"] else 0)
@@ -0,0 +1,195 @@
+"""Motion Graphics — Memory Budget
+
+With params["memory_budget_mb"] (or $MG_MEMORY_BUDGET_MB) a render plans its
+buffers to fit: the frame pool and queue depth of the python backend, and how
+many full-frame item images (listicle zoom thumbnails) stay decoded at once.
+The plan starts from the cost model's memory estimate (shared.cost), so the
+interpreter and ffmpeg baselines are accounted for before any buffers.
+
+While encoding, the RSS of python + ffmpeg is sampled; above the budget the
+render sheds memory instead of failing (image caches drop to one entry, the
+frame pool retires buffers down to two) and records a pressure event. Peak
+usage against the budget ends up in the metrics record under "memory".
+
+ffmpeg is usually the larger half: when even the minimal buffers don't fit,
+x264 runs single-threaded with a short lookahead (LOWMEM_ENCODER), which
+roughly halves its footprint at the cost of speed and a few bits.
+
+Without a budget everything behaves as before: pool of 10, queues of 4 and
+every item image decoded up front.
+"""
+import os, gc, time
+from collections import OrderedDict
+from contextlib import contextmanager
+from shared.cost import estimate, frame_buffers_mb
+from shared.metrics import current_rss_mb
+
+DEFAULT_POOL = 10      # shared.render.FramePool default
+DEFAULT_QUEUE = 4
+MIN_POOL = 2           # the writer holds one frame while the next is drawn
+CHECK_EVERY = 15       # frames between RSS samples
+LOWMEM_ENCODER = {"threads": 1, "rc_lookahead": 5}
+LOWMEM_FFMPEG_SAVING = 0.4  # measured: 1080p x264 fast, 384 MB → 218 MB
+_current = None
+
+
+def memory_budget_mb(params):
+    value = params.get("memory_budget_mb") or os.environ.get("MG_MEMORY_BUDGET_MB")
+    return float(value) if value else None
+
+
+class LazyImages:
+    """Per-item images built on first use and kept in an LRU of `capacity` (None: keep all).
+
+    Indexable like the list it replaces; evicted images are rebuilt by the
+    loader, which must be deterministic so output does not depend on the budget.
+    """
+
+    def __init__(self, loader, n, capacity=None):
+        self.loader = loader
+        self.n = n
+        self.capacity = capacity
+        self._cache = OrderedDict()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        if i in self._cache:
+            self._cache.move_to_end(i)
+            self.hits += 1
+            return self._cache[i]
+        self.misses += 1
+        img = self.loader(i)
+        self._cache[i] = img
+        self._trim()
+        return img
+
+    def _trim(self):
+        while self.capacity is not None and len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+
+    def shrink(self, capacity):
+        self.capacity = max(1, capacity)
+        self._trim()
+
+
+def item_images(loader, n):
+    """Item images under the current budget: all decoded now without one, an LRU with one."""
+    if _current is None:
+        images = LazyImages(loader, n)
+        for i in range(n):
+            images[i]
+        return images
+    images = LazyImages(loader, n, _current.plan["image_cache"])
+    _current.caches.append(images)
+    return images
+
+
+class MemoryBudget:
+    def __init__(self, limit_mb, estimate):
+        """estimate: shared.cost.estimate() for the job (size, backend, items, memory model)."""
+        self.limit_mb = limit_mb
+        self.estimate = estimate
+        self.caches = []
+        self.pool = None
+        self.events = []
+        self.peak_mb = 0.0
+        self._frames_seen = 0
+        self._t0 = time.perf_counter()
+        self.plan = self._plan()
+
+    def _plan(self):
+        e = self.estimate
+        frame_mb = e["width"] * e["height"] * 4 / 1e6
+        mem = e["est_peak_mb"]
+        # Everything the estimate counts except the frame-sized buffers planned here
+        fixed = mem["total"] - frame_buffers_mb(e)
+        items = max(1, e["items"])
+        encoder = {}
+        if self.limit_mb - fixed < (4 + min(2, items) + 1) * frame_mb:
+            encoder = dict(LOWMEM_ENCODER)
+            fixed -= mem["ffmpeg"] * LOWMEM_FFMPEG_SAVING
+        room = self.limit_mb - fixed - frame_mb  # the background frame is always there
+
+        # Minimum that still renders, then grow by usefulness: pool to 4, item images, pool to 10
+        pool, images = MIN_POOL, min(2, items)
+        room -= (pool + images) * frame_mb
+        for want_pool, want_images in ((4, images), (4, items), (DEFAULT_POOL, items)):
+            grow = (want_pool - pool) + (want_images - images)
+            if grow <= 0:
+                continue
+            if room >= grow * frame_mb:
+                room -= grow * frame_mb
+                pool, images = want_pool, want_images
+            else:
+                extra = int(max(0, room) // frame_mb)
+                add_pool = min(want_pool - pool, extra)
+                pool += add_pool
+                images += min(want_images - images, extra - add_pool)
+                room -= extra * frame_mb
+                break
+        return {
+            "pool_frames": pool,
+            "queue_depth": max(1, min(DEFAULT_QUEUE, pool - 1)),
+            "image_cache": images,
+            # Parallel workers of this job's size that fit side by side
+            "workers": max(1, int(self.limit_mb // max(1.0, mem["total"]))),
+            "encoder": encoder,
+            "fits": room >= 0,
+        }
+
+    def check(self, child_pid=None):
+        """Sample RSS every CHECK_EVERY calls; shed memory when above the budget."""
+        self._frames_seen += 1
+        if self._frames_seen % CHECK_EVERY:
+            return
+        rss = (current_rss_mb() or 0) + ((current_rss_mb(child_pid) or 0) if child_pid else 0)
+        self.peak_mb = max(self.peak_mb, rss)
+        if rss > self.limit_mb:
+            self.shed(rss)
+
+    def shed(self, rss):
+        freed = []
+        for cache in self.caches:
+            if cache.capacity is None or cache.capacity > 1:
+                cache.shrink(1)
+                freed.append("image_cache")
+        if self.pool is not None and self.pool.target > MIN_POOL:
+            self.pool.shrink(MIN_POOL)
+            freed.append("pool")
+        if freed:
+            gc.collect()
+            self.events.append({"t": round(time.perf_counter() - self._t0, 3), "rss_mb": round(rss, 1),
+                                "shed": sorted(set(freed))})
+
+    def report(self, peak_rss=None):
+        peak = max(self.peak_mb, peak_rss or 0)
+        return {
+            "budget_mb": self.limit_mb,
+            "estimated_mb": self.estimate["est_peak_mb"]["total"],
+            "peak_mb": round(peak, 1),
+            "within_budget": peak <= self.limit_mb,
+            "plan": self.plan,
+            "pressure_events": self.events,
+        }
+
+
+def plan_budget(preset, params):
+    """MemoryBudget for this job, or None when no budget is set."""
+    limit = memory_budget_mb(params)
+    if not limit:
+        return None
+    return MemoryBudget(limit, estimate(preset, params))
+
+
+@contextmanager
+def budget_scope(budget):
+    """Make `budget` current (for item_images) while the scene is built and encoded."""
+    global _current
+    prev, _current = _current, budget
+    try:
+        yield budget
+    finally:
+        _current = prev
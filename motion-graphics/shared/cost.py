@@ -0,0 +1,364 @@
+"""Motion Graphics — Render Cost Model
+
+Predicts render time and peak memory for a preset + params without
+rendering, so batch runners can pack jobs onto cores and the server can set
+per-segment timeouts.
+
+Time is linear per preset (and backend) in a few features:
+
+    frame_s = frame_mp·(frames × MP) + zoom_mp·(zoom frames × MP) + item_mp·(items × MP)
+    seconds = setup + frame_s·(draw_share + (1 − draw_share)·speed·cpus₀/cpus)
+              + asset_s_per_mb·(asset MB)
+
+with MP the output megapixels. draw_share is the part of frame_s spent
+drawing in python (one thread, whatever the host); the rest is ffmpeg,
+scaled by the encoder's speed relative to the calibration encoder
+(encoder_speed, e.g. ultrafast for draft) and by the calibration host's
+cores (cpus₀, machine.cpus) over the cores here (shared.governor.host_cores).
+Drawing and encoding are summed, not overlapped, which errs on the slow
+side. Coefficients come from cost_model.json,
+written by calibrate() from benchmark runs of benchmarks/fixtures.json
+(python3 -m shared.cost --calibrate; asset tokens become generated
+placeholder images). Memory is modelled from the buffers a
+render holds (frame pool, queues, per-item thumbnails) plus calibrated
+interpreter and encoder baselines.
+
+    python3 -m shared.cost listicle_scroll '{"items": [...]}'     # dry run
+    python3 -m shared.cost text/title_card.py /path/to/data.json
+"""
+import sys, os, json, time, platform, subprocess, tempfile
+from shared.profiles import load_registry, get_profile
+from shared.layout import get_layout
+from shared.remote import is_url, cached_path
+from shared.governor import host_cores
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(ROOT, "cost_model.json")
+
+# Presets that zoom an item to full screen and back (per item, zoom_duration each way)
+ZOOM_PRESETS = {"listicle_scroll", "listicle_goodbad", "listicle_grid"}
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp")
+FRAME_POOL_SIZE = 10  # shared.render.FramePool default
+# Presets rendered once per render profile to measure each encoder's speed
+ENCODER_CASE_PRESETS = ("title_card", "listicle_scroll")
+
+# Used until a calibration has been written (measured on a 4-core dev box; no draw_share,
+# so nothing is scaled for the encoder or the host)
+DEFAULT_MODEL = {
+    "machine": {"cpus": 4},
+    "time": {"default": {"setup": 0.25, "frame_mp": 0.012, "zoom_mp": 0.02, "item_mp": 0.05}},
+    "encoder_speed": {},
+    "asset_s_per_mb": 0.05,
+    "memory": {
+        "python": {"python_base_mb": 45.0, "ffmpeg_base_mb": 35.0, "ffmpeg_mb_per_mp": 260.0},
+        "filtergraph": {"python_base_mb": 45.0, "ffmpeg_base_mb": 40.0, "ffmpeg_mb_per_mp": 155.0},
+    },
+}
+_model = None
+
+
+def load_model():
+    global _model
+    if _model is None:
+        _model = DEFAULT_MODEL
+        if os.path.exists(MODEL_PATH):
+            with open(MODEL_PATH, encoding="utf-8") as f:
+                _model = json.load(f)
+    return _model
+
+
+def resolve_preset(name):
+    """Registry id, or a script path like "text/title_card.py" → registry entry."""
+    for p in load_registry()["presets"]:
+        if name in (p["id"], p["script"]) or name.endswith("/" + p["script"]):
+            return p
+    raise ValueError(f"Unknown preset: {name}")
+
+
+def _count_items(value):
+    if isinstance(value, list):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_count_items(v) for v in value.values())
+    return 0
+
+
+def _asset_bytes(value):
+    if isinstance(value, str):
+        if is_url(value):
+            value = cached_path(value) or ""  # sized by its cached copy; nothing is fetched
+        if value.lower().endswith(IMAGE_EXTS) and os.path.isfile(value):
+            return os.path.getsize(value)
+        return 0
+    if isinstance(value, list):
+        return sum(_asset_bytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_asset_bytes(v) for v in value.values())
+    return 0
+
+
+def features(preset, params):
+    """What drives cost, derived from params and registry defaults only (nothing is rendered)."""
+    entry = resolve_preset(preset)
+    defaults = {k: v["default"] for k, v in entry["params"].items() if isinstance(v, dict) and "default" in v}
+    duration = float(params.get("duration", defaults.get("duration", 4.0)))
+    profile = get_profile(params)
+    L = get_layout(params, profile)
+    fps = profile["fps"]
+    frames = round(duration * fps)
+    items = sum(_count_items(v) for v in params.values())
+    zoom_frames = 0
+    if entry["id"] in ZOOM_PRESETS:
+        n = max(1, _count_items(params.get("items", [])) or
+                len(params.get("good", [])) + len(params.get("bad", [])))
+        zoom_frames = min(frames, round(n * 2 * params.get("zoom_duration", 0.5) * fps))
+    backend = params.get("backend") if params.get("backend") in entry.get("backends", []) else "python"
+    return {
+        "preset": entry["id"], "backend": backend, "width": L.W, "height": L.H, "fps": fps,
+        "duration": duration, "frames": frames, "mp": L.W * L.H / 1e6, "items": items,
+        "zoom_frames": zoom_frames, "asset_mb": _asset_bytes(params) / 1e6,
+        "profile": profile["name"], "encoder": encoder_key(profile),
+        "foreground_only": bool(params.get("foreground_only")),
+    }
+
+
+def encoder_key(profile):
+    """What sets the encoder's speed: the codec, and the x264 preset (a conform spec overrides the profile's)."""
+    codec = profile.get("codec", "libx264")
+    return f"{codec}:{profile.get('preset', 'fast')}" if codec == "libx264" else codec
+
+
+def _time_terms(f):
+    return [1.0, f["frames"] * f["mp"], f["zoom_frames"] * f["mp"], f["items"] * f["mp"]]
+
+
+def _model_key(f):
+    return f"{f['preset']}:{f['backend']}" if f["backend"] != "python" else f["preset"]
+
+
+def frame_buffers_mb(f):
+    """Frame-sized buffers the python backend holds at once (the filtergraph backend only builds sprites)."""
+    if f["backend"] != "python":
+        return 0.0
+    frame_mb = f["width"] * f["height"] * 4 / 1e6
+    # Frame pool + background (+ grid copy) + converted frames in flight
+    buffers = (FRAME_POOL_SIZE + 3) * frame_mb
+    if f["preset"] in ZOOM_PRESETS:
+        buffers += f["items"] * frame_mb * 1.2  # a full-frame thumbnail per item, plus strip copies
+    return buffers
+
+
+def estimate_memory_mb(f, model=None):
+    memory = (model or load_model())["memory"]
+    mem = memory.get(f["backend"], memory["python"])
+    python_mb = mem["python_base_mb"] + frame_buffers_mb(f) + f["asset_mb"] * 4  # decoded images ≈ 4× file size
+    ffmpeg_mb = mem["ffmpeg_base_mb"] + mem["ffmpeg_mb_per_mp"] * f["mp"]
+    return {"python": round(python_mb, 1), "ffmpeg": round(ffmpeg_mb, 1), "total": round(python_mb + ffmpeg_mb, 1)}
+
+
+def _frame_seconds(coef, f):
+    return sum(c * x for c, x in zip((coef["frame_mp"], coef["zoom_mp"], coef["item_mp"]), _time_terms(f)[1:]))
+
+
+def _encode_scale(model, coef, encoder, cores):
+    """Multiplier on frame_s for this encoder and host (1.0 for the calibration encoder and host)."""
+    draw = coef.get("draw_share", 1.0)
+    speed = model.get("encoder_speed", {}).get(encoder, 1.0)
+    cpus = model.get("machine", {}).get("cpus") or cores
+    return draw + (1 - draw) * speed * cpus / cores
+
+
+def estimate(preset, params):
+    """Dry run: predicted seconds, peak memory and a suggested timeout for one render."""
+    model = load_model()
+    f = features(preset, params)
+    coef = model["time"].get(_model_key(f)) or model["time"].get(f["preset"]) or model["time"]["default"]
+    seconds = coef["setup"] + _frame_seconds(coef, f) * _encode_scale(model, coef, f["encoder"], host_cores())
+    seconds += model["asset_s_per_mb"] * f["asset_mb"]
+    return {
+        **f,
+        "est_seconds": round(seconds, 2),
+        "est_peak_mb": estimate_memory_mb(f, model),
+        # Generous margin for loaded machines; never below the old flat 60 s
+        "timeout_s": int(max(60, seconds * 4 + 30)),
+        "calibrated": _model_key(f) in model["time"] or f["preset"] in model["time"],
+    }
+
+
+# ── Calibration ──
+
+def measure(preset, params):
+    """Render once in this process; returns wall and python drawing seconds and peak RSS of python and ffmpeg."""
+    import resource
+    from shared.preview import preset_module
+    module = preset_module(resolve_preset(preset)["id"])
+    with tempfile.TemporaryDirectory(prefix="mg-cost-") as tmp:
+        metrics_path = os.path.join(tmp, "metrics.json")
+        t0 = time.perf_counter()
+        module.render(dict(params, metrics_path=metrics_path), os.path.join(tmp, "out.mp4"))
+        seconds = time.perf_counter() - t0
+        with open(metrics_path, encoding="utf-8") as f:
+            draw_s = json.load(f).get("spans_s", {}).get("draw", 0.0)
+    return {
+        "seconds": seconds,
+        "draw_s": draw_s,
+        "python_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "ffmpeg_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+
+def _scale_lists(value, k):
+    if isinstance(value, list):
+        return [value[i % len(value)] for i in range(max(1, round(len(value) * k)))] if value else value
+    if isinstance(value, dict):
+        return {key: _scale_lists(v, k) for key, v in value.items()}
+    return value
+
+
+def calibration_cases(fixtures):
+    for preset, base in fixtures.items():
+        entry = resolve_preset(preset)
+        backends = entry.get("backends", ["python"])
+        scales = (1.0, 2.5) if _count_items(base) else (1.0,)
+        for backend in backends:
+            for duration in (2.0, 5.0):
+                for width, height in ((960, 540), (1920, 1080)):
+                    for k in scales:
+                        params = dict(_scale_lists(base, k), duration=duration, width=width, height=height)
+                        if backend != "python":
+                            params["backend"] = backend
+                        yield preset, params
+
+
+def encoder_cases(fixtures):
+    """A few renders per non-default profile, for encoder_speed (the other cases use the default profile)."""
+    registry = load_registry()
+    default = registry.get("default_profile", "final")
+    for name in registry.get("profiles", {}):
+        if name == default:
+            continue
+        for preset in ENCODER_CASE_PRESETS:
+            if preset in fixtures:
+                yield preset, dict(fixtures[preset], duration=5.0, width=1920, height=1080, profile=name)
+
+
+def _same_column(rows, i, j):
+    return all(abs(r[i] - r[j]) <= 1e-9 * max(1.0, abs(r[j])) for r in rows)
+
+
+def _solve(rows, ys, ridge=1e-6):
+    # Non-negative least squares: a term that fits negative is dropped and the rest refitted,
+    # rather than clamped to zero. A term that repeats an earlier one in every row (zoom frames
+    # equal all frames when every fixture zooms throughout, as in listicle_grid) cannot be told
+    # apart from it and only splits its weight, so it is left out up front.
+    k = len(rows[0])
+    active = [i for i in range(k) if not any(_same_column(rows, i, j) for j in range(i))]
+    while True:
+        c = _lstsq([[r[i] for i in active] for r in rows], ys, ridge)
+        if min(c, default=0.0) >= 0:
+            out = [0.0] * k
+            for i, x in zip(active, c):
+                out[i] = x
+            return out
+        del active[c.index(min(c))]
+
+
+def _lstsq(rows, ys, ridge):
+    # Least squares via normal equations (tiny systems, no numpy dependency)
+    k = len(rows[0]) if rows else 0
+    a = [[sum(r[i] * r[j] for r in rows) + (ridge if i == j else 0) for j in range(k)] for i in range(k)]
+    b = [sum(r[i] * y for r, y in zip(rows, ys)) for i in range(k)]
+    for col in range(k):
+        piv = max(range(col, k), key=lambda r: abs(a[r][col]))
+        a[col], a[piv], b[col], b[piv] = a[piv], a[col], b[piv], b[col]
+        for r in range(k):
+            if r != col and a[col][col]:
+                f = a[r][col] / a[col][col]
+                a[r] = [x - f * y for x, y in zip(a[r], a[col])]
+                b[r] -= f * b[col]
+    return [b[i] / a[i][i] if a[i][i] else 0.0 for i in range(k)]
+
+
+def _measure_cases(cases, log):
+    for preset, params in cases:
+        out = subprocess.run([sys.executable, "-m", "shared.cost", "--measure", preset, json.dumps(params)],
+                             cwd=ROOT, capture_output=True, text=True)
+        if out.returncode != 0:
+            log(f"  skip {preset}: {out.stderr.strip()[-200:]}")
+            continue
+        yield features(preset, params), json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def calibrate(model_path=MODEL_PATH, log=print):
+    """Run every fixture case in a fresh process, fit coefficients and write cost_model.json."""
+    from benchmarks.fixtures import load_fixtures
+    samples, mem_py, mem_ff, encoder_runs = {}, {}, {}, []
+    with tempfile.TemporaryDirectory(prefix="mg-cost-") as asset_dir:
+        fixtures = load_fixtures(asset_dir)
+        for f, m in _measure_cases(calibration_cases(fixtures), log):
+            samples.setdefault(_model_key(f), []).append((f, m))
+            # Python baseline = what the measured peak has beyond the modelled buffers
+            mem_py.setdefault(f["backend"], []).append(m["python_mb"] - frame_buffers_mb(f) - f["asset_mb"] * 4)
+            mem_ff.setdefault(f["backend"], []).append((f["mp"], m["ffmpeg_mb"]))
+            log(f"  {_model_key(f):28s} {f['width']}x{f['height']} {f['frames']:4d}f "
+                f"{f['items']:2d} items  {m['seconds']:6.2f}s  py {m['python_mb']:.0f}MB  ffmpeg {m['ffmpeg_mb']:.0f}MB")
+        for f, m in _measure_cases(encoder_cases(fixtures), log):
+            encoder_runs.append((f, m))
+            log(f"  {f['preset']:28s} {f['profile']:12s} {f['encoder']:18s} {f['width']}x{f['height']} "
+                f"{f['frames']:4d}f  {m['seconds']:6.2f}s")
+
+    # Usable cores, as the estimate divides by them (shared.governor.host_cores)
+    model = {"machine": {"node": platform.node(), "cpus": host_cores(), "python": platform.python_version()},
+             "calibrated_at": time.strftime("%Y-%m-%d"), "time": {},
+             "asset_s_per_mb": DEFAULT_MODEL["asset_s_per_mb"]}
+    for key, rows in samples.items():
+        c = _solve([_time_terms(f) for f, _ in rows], [m["seconds"] for _, m in rows])
+        # Python's share of the per-frame time; on the calibration host drawing and ffmpeg add up
+        draw = sum(min(1.0, m["draw_s"] / m["seconds"]) for _, m in rows) / len(rows)
+        model["time"][key] = {"setup": round(c[0], 4), "frame_mp": round(c[1], 5),
+                              "zoom_mp": round(c[2], 5), "item_mp": round(c[3], 5), "draw_share": round(draw, 3)}
+    model["time"]["default"] = max(model["time"].values(), key=lambda c: c["frame_mp"],
+                                   default=DEFAULT_MODEL["time"]["default"])
+
+    # Encoder speed: how much of the modelled ffmpeg time the other profiles' encoders take
+    default_encoder = encoder_key(get_profile({}))
+    speeds = {default_encoder: [1.0]}
+    for f, m in encoder_runs:
+        coef = model["time"].get(_model_key(f))
+        frame_s = _frame_seconds(coef, f) if coef else 0.0
+        if frame_s <= 0 or coef["draw_share"] >= 1:
+            continue
+        ratio = (m["seconds"] - coef["setup"]) / frame_s
+        speeds.setdefault(f["encoder"], []).append((ratio - coef["draw_share"]) / (1 - coef["draw_share"]))
+    model["encoder"] = default_encoder
+    model["encoder_speed"] = {k: round(max(0.05, sum(v) / len(v)), 3) for k, v in speeds.items()}
+    model["memory"] = dict(DEFAULT_MODEL["memory"])
+    for backend, peaks in mem_ff.items():
+        # Upper envelope: fit, then lift the intercept so no measured run lies above the line
+        base, per_mp = _solve([[1.0, mp] for mp, _ in peaks], [mb for _, mb in peaks])
+        base += max(mb - (base + per_mp * mp) for mp, mb in peaks)
+        model["memory"][backend] = {"python_base_mb": round(max(mem_py[backend]), 1),
+                                    "ffmpeg_base_mb": round(base, 1), "ffmpeg_mb_per_mp": round(per_mp, 1)}
+    with open(model_path, "w", encoding="utf-8") as f:
+        json.dump(model, f, indent=2)
+        f.write("\n")
+    global _model
+    _model = model
+    return model
+
+
+def _load_params(arg):
+    # Inline JSON, or a path to a JSON data file (as written by the pipeline)
+    if arg.lstrip().startswith("{"):
+        return json.loads(arg)
+    with open(arg, encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--calibrate"]:
+        calibrate()
+    elif sys.argv[1:2] == ["--measure"]:
+        print(json.dumps(measure(sys.argv[2], json.loads(sys.argv[3]))))
+    else:
+        print(json.dumps(estimate(sys.argv[1], _load_params(sys.argv[2] if len(sys.argv) > 2 else "{}"))))
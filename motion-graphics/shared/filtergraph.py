@@ -0,0 +1,198 @@
+"""Motion Graphics — Filtergraph Compiler
+
+Presets whose animation is just static sprites that move, fade or grow along
+closed-form easing curves can skip the Python frame loop entirely: every sprite
+is drawn once (at its resting position, on a full-size transparent layer) and
+the motion becomes ffmpeg overlay/crop/scale expressions, encoded in a single
+ffmpeg run. Nothing is evaluated per pixel: opacity is a per-frame
+colorchannelmixer factor (sent with sendcmd) and reveals are an animated crop
+of a transparently padded sprite.
+
+Expressions are templates with a `{t}` placeholder for the time variable.
+"""
+import subprocess, os, tempfile, shutil, math, re
+from PIL import Image, ImageDraw
+from shared.render import still_loop_filter
+from shared.profiles import get_profile, output_path_for, split_outputs
+from shared import metrics
+
+
+# ── Expression helpers (mirror shared.render easing) ──
+
+def progress(start, dur):
+    return f"clip(({{t}}-{start})/{dur},0,1)"
+
+def ease_out_cubic_expr(p):
+    return f"(1-pow(1-{p},3))"
+
+def ease_in_out_cubic_expr(p):
+    return f"if(lt({p},0.5),4*pow({p},3),1-pow(-2*{p}+2,3)/2)"
+
+
+_EXPR_FUNCS = {
+    "clip": lambda x, lo, hi: min(max(x, lo), hi), "pow": pow, "abs": abs, "sin": math.sin,
+    "floor": math.floor, "mod": lambda x, y: x - y * math.floor(x / y), "max": max, "min": min,
+    "lt": lambda a, b: float(a < b), "lte": lambda a, b: float(a <= b), "gt": lambda a, b: float(a > b),
+    "gte": lambda a, b: float(a >= b), "eq": lambda a, b: float(a == b),
+    "between": lambda x, lo, hi: float(lo <= x <= hi), "if_": lambda c, a, b=0: a if c else b,
+}
+
+
+def _evaluate(expr, t):
+    """Value of an expression template at time t, as ffmpeg would evaluate it (helpers above only)."""
+    expr = re.sub(r"\bif\(", "if_(", expr.format(t=f"({t!r})"))
+    return eval(expr, {"__builtins__": {}}, _EXPR_FUNCS)
+
+
+def sprite_layer(width, height):
+    """Transparent full-frame layer to draw one sprite on, at its resting position."""
+    layer = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    return layer, ImageDraw.Draw(layer)
+
+
+def make_sprite(layer, dx="0", dy="0", alpha=None, reveal=None, reveal_from="left",
+                reveal_x=None, scale=None, enable=None):
+    """Crop a drawn layer to its content and attach motion expressions.
+
+    dx/dy: offset from the resting position. alpha: opacity multiplier 0..1.
+    reveal: visible fraction 0..1 of the width, growing from the left or the
+    center (a crop reveal). reveal_x: instead of reveal, the layer x up to
+    which a left reveal shows the sprite, in pixels. scale: size multiplier
+    around the sprite center. enable: expression gating the overlay. Returns
+    None for an empty layer.
+    """
+    bbox = layer.getbbox()
+    if not bbox:
+        return None
+    return {
+        "image": layer.crop(bbox), "x": bbox[0], "y": bbox[1],
+        "dx": dx, "dy": dy, "alpha": alpha, "reveal": reveal,
+        "reveal_from": reveal_from, "reveal_x": reveal_x, "scale": scale, "enable": enable,
+    }
+
+
+def _alpha_filter(sprite, index, fps, total_frames, tmp_dir):
+    """colorchannelmixer scaling the sprite alpha, driven per frame by a sendcmd script.
+
+    The factor is evaluated here once per frame, and the mixer is only enabled
+    on frames where it is below 1. Returns None when the sprite is always opaque.
+    """
+    values = [round(min(max(_evaluate(sprite["alpha"], n / fps), 0.0), 1.0), 4) for n in range(total_frames)]
+    if all(v == 1 for v in values):
+        return None
+    target = f"colorchannelmixer@a{index}"
+    mixer = f"{target}=aa={values[0]}:enable={int(values[0] < 1)}"
+    if len(set(values)) == 1:
+        return mixer
+    commands = []
+    for n in range(1, total_frames):
+        # Half a frame early, so the command lands on frame n whatever the float rounding
+        at = f"{(n - 0.5) / fps:.6f}"
+        if values[n] != values[n - 1]:
+            commands.append(f"{at} {target} aa {values[n]};")
+        if (values[n] < 1) != (values[n - 1] < 1):
+            commands.append(f"{at} {target} enable {int(values[n] < 1)};")
+    script = os.path.join(tmp_dir, f"alpha_{index}.cmd")
+    with open(script, "w") as f:
+        f.write("\n".join(commands) + "\n")
+    return f"sendcmd=f='{script}',{mixer}"
+
+
+def _sprite_chain(sprite, index, fps, total_frames, tmp_dir):
+    """Filter chain for one sprite input; returns (chain, x offset expression for the overlay).
+
+    A reveal pads the sprite with its own width of transparency (once, before
+    the loop) and crops a sprite-wide window out of it per frame, so the cut
+    edge moves while the overlay offset keeps the content in place.
+    """
+    w, h = sprite["image"].size
+    chain = [f"[{index + 1}:v]format=gbrap"]
+    loop, crops, x_offset = still_loop_filter(fps), [], "0"
+    if sprite["reveal_x"] is not None or sprite["reveal"]:
+        if sprite["reveal_x"] is not None:
+            shown = f"clip(floor({sprite['reveal_x']})-{sprite['x']},0,{w})"
+            center = False
+        else:
+            shown = f"clip(floor({w}*({sprite['reveal']})),0,{w})"
+            center = sprite["reveal_from"] == "center"
+        chain.append(f"pad=w={2 * w}:h={h}:x={w}:y=0:color=black@0")
+        if center:
+            # Cut the right edge, then (after padding the other side) the left one
+            cut = f"floor(({w}-{shown})/2)"
+            crops = [f"crop=w={w}:h={h}:x='{w}-{cut}'", f"pad=w={2 * w}:h={h}:x=0:y=0:color=black@0",
+                     f"crop=w={w}:h={h}:x='2*{cut}'"]
+            x_offset = cut
+        else:
+            crops = [f"crop=w={w}:h={h}:x='{shown}'"]
+            x_offset = f"{shown}-{w}"
+    chain += [loop, *crops]
+    if sprite["alpha"]:
+        alpha = _alpha_filter(sprite, index, fps, total_frames, tmp_dir)
+        if alpha:
+            chain.append(alpha)
+    if sprite["scale"]:
+        s = sprite["scale"]
+        chain.append(f"scale=w='max(2,{w}*{s})':h='max(2,{h}*{s})':eval=frame")
+    return ",".join(chain).format(t="t"), x_offset.format(t="t")
+
+
+def render_filtergraph(sprites, output_path, width, height, fps, duration, background=None,
+                       profile=None, rescales=()):
+    """Encode sprites over the background plate (or black) in one ffmpeg invocation.
+
+    `rescales` adds scaled copies as extra outputs (see shared.profiles.split_outputs).
+    """
+    profile = profile or get_profile({})
+    output_path = output_path_for(profile, output_path)
+    sprites = [s for s in sprites if s]
+    total_frames = round(duration * fps)
+    os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else ".", exist_ok=True)
+
+    tmp_dir = tempfile.mkdtemp(prefix="mg-fg-")
+    try:
+        # Sprites are blended in RGB, as Image.alpha_composite does (see shared.render._encode_cmd),
+        # and the result is converted to the output pixel format once, after the last overlay
+        if background:
+            inputs = ["-i", background]
+            graph = [f"[0:v]format=gbrp,{still_loop_filter(fps)}[base0]"]
+        else:
+            inputs = ["-f", "lavfi", "-i", f"color=c=black:s={width}x{height}:r={fps}"]
+            graph = ["[0:v]format=gbrp[base0]"]
+
+        for i, sprite in enumerate(sprites):
+            png = os.path.join(tmp_dir, f"sprite_{i}.png")
+            with metrics.span("sprite_png"):
+                sprite["image"].save(png, "PNG")
+            metrics.count("bytes_temp_files", os.path.getsize(png))
+            inputs += ["-i", png]
+            chain, x_offset = _sprite_chain(sprite, i, fps, total_frames, tmp_dir)
+            graph.append(f"{chain}[s{i}]")
+
+            if sprite["scale"]:
+                # Scaled sprites stay centered on their resting center
+                cx = sprite["x"] + sprite["image"].size[0] / 2
+                cy = sprite["y"] + sprite["image"].size[1] / 2
+                x = f"{cx}-w/2+({sprite['dx']})+({x_offset})*w/{sprite['image'].size[0]}"
+                y = f"{cy}-h/2+({sprite['dy']})"
+            else:
+                x = f"{sprite['x']}+({sprite['dx']})+({x_offset})"
+                y = f"{sprite['y']}+({sprite['dy']})"
+            opts = f"x='{x.format(t='t')}':y='{y.format(t='t')}':eval=frame:format=rgb"
+            if sprite["enable"]:
+                opts += f":enable='{sprite['enable'].format(t='t')}'"
+            graph.append(f"[base{i}][s{i}]overlay={opts}[base{i + 1}]")
+
+        graph.append(f"[base{len(sprites)}]format={profile.get('pix_fmt', 'yuv420p')}[v]")
+        tail, outputs = split_outputs("v", profile, output_path, rescales, total_frames / fps,
+                                      per_output=["-frames:v", str(total_frames), "-r", str(fps)])
+        cmd = ["ffmpeg", "-y", *inputs, "-filter_complex", ";".join(graph) + tail, *outputs]
+        metrics.count("sprites", len(sprites))
+        metrics.progress(0, total_frames, phase="encode")
+        with metrics.span("ffmpeg"):
+            result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"FFmpeg failed: {result.stderr.decode()[-500:]}")
+        metrics.progress(total_frames, total_frames, phase="encode")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return output_path
@@ -1,6 +1,7 @@
 """Motion Graphics — Font Management"""
 import os
 from PIL import ImageFont
+from shared import metrics
 
 FONT_SEARCH_PATHS = ["/usr/share/fonts/truetype/", "/usr/share/fonts/", "/usr/local/share/fonts/"]
 FONT_MAP = {
@@ -23,7 +24,14 @@ def _find(name):
 
 def get_font(name, size):
     key = f"{name}_{size}"
-    if key in _cache: return _cache[key]
+    if key in _cache:
+        metrics.count("font_cache_hits")
+        return _cache[key]
+    metrics.count("font_cache_misses")
+    with metrics.span("fonts"):
+        return _load(name, size, key)
+
+def _load(name, size, key):
     path = _find(name)
     if path:
         try:
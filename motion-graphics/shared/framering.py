@@ -0,0 +1,154 @@
+"""Motion Graphics — Shared Frame Ring
+
+Draws one scene in several worker processes, so a render isn't held to the
+one core the GIL gives its drawing thread. Frames are never pickled: a
+FrameRing is a set of RGBA slots in one shared-memory segment, workers draw
+straight into a slot and only (frame number, slot) pairs travel through the
+queues. The ring has FramePool's interface, so render_frames_to_video hands
+a finished slot to ffmpeg's stdin as a memoryview and releases it after
+writing; an exhausted ring throttles the workers to the encoder's pace.
+
+Workers are forked from the render process after the scene is built and
+inherit it as is (fonts, layout, fitted thumbnails); frames don't depend on
+each other (see shared.scene), so any worker can draw any frame. The ring
+yields them back in order.
+
+The number of workers comes from the CPU governor's "draw_workers"
+(params["draw_workers"] or $MG_DRAW_WORKERS, capped to the job's share of the
+cores less one for the encoder). Needs the fork start method (Linux).
+"""
+import queue, traceback
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from PIL import Image
+from shared import metrics
+from shared.render import take_free
+
+
+def _draw_worker(ring, scene, tasks, done):
+    try:
+        for fi, slot in iter(tasks.get, None):
+            frame = ring.image(slot)
+            frame.paste(scene.background, (0, 0))
+            scene.draw(frame, fi / scene.fps)
+            done.put((fi, slot))
+    except BaseException:
+        done.put((None, traceback.format_exc()))
+
+
+class FrameRing:
+    """RGBA frame slots in shared memory, drawn by forked workers (FramePool interface)."""
+
+    def __init__(self, width, height, size=10):
+        self.size = (width, height)
+        self.target = size
+        self.slot_bytes = width * height * 4
+        self._shm = SharedMemory(create=True, size=self.slot_bytes * size)
+        self._images, self._slots = [], {}
+        for slot in range(size):
+            im = Image.frombuffer("RGBA", self.size, self._view(slot), "raw", "RGBA", 0, 1)
+            im.readonly = 0  # write through to the shared slot instead of copy-on-write
+            self._images.append(im)
+            self._slots[id(im)] = slot
+        self._free = queue.Queue()
+        for slot in range(size):
+            self._free.put(slot)
+        self._live = size
+        self.stop = None  # set by render_frames_to_video, as for a FramePool
+        self._procs = []
+        self._tasks = None
+
+    def _view(self, slot):
+        return self._shm.buf[slot * self.slot_bytes:(slot + 1) * self.slot_bytes]
+
+    def image(self, slot):
+        return self._images[slot]
+
+    def acquire(self, background):
+        frame = self._images[take_free(self._free, self.stop)]
+        frame.paste(background, (0, 0))
+        return frame
+
+    def owns(self, frame):
+        return id(frame) in self._slots
+
+    def view(self, frame):
+        return self._view(self._slots[id(frame)])
+
+    def release(self, frame):
+        if self._live > self.target:
+            self._live -= 1  # retired (see shrink)
+            return
+        self._free.put(self._slots[id(frame)])
+
+    def shrink(self, size):
+        """Keep at most `size` slots in flight (the segment itself stays mapped)."""
+        self.target = max(2, size)
+
+    def draw(self, scene, workers, start=0, end=None):
+        """Fork `workers` drawing processes now; returns a generator of frames start..end in order.
+
+        Forking happens here rather than on the first frame, before the
+        encoder's threads exist.
+        """
+        end = scene.total_frames if end is None else end
+        ctx = multiprocessing.get_context("fork")
+        tasks, done = ctx.SimpleQueue(), ctx.Queue()
+        self._tasks = tasks
+        self._procs = [ctx.Process(target=_draw_worker, args=(self, scene, tasks, done), daemon=True)
+                       for _ in range(workers)]
+        for p in self._procs:
+            p.start()
+        metrics.count("draw_workers", workers)
+
+        def frames():
+            sent = shown = start
+            ready = {}
+            while shown < end:
+                # Hand out frames while slots are free; wait for one only when nothing is in flight
+                while sent < end:
+                    try:
+                        slot = take_free(self._free, self.stop) if sent == shown else self._free.get_nowait()
+                    except queue.Empty:
+                        break
+                    tasks.put((sent, slot))
+                    sent += 1
+                while shown not in ready:
+                    fi, slot = self._done(done)
+                    ready[fi] = slot
+                yield self._images[ready.pop(shown)]
+                shown += 1
+        return frames()
+
+    def _done(self, done):
+        while True:
+            try:
+                fi, slot = done.get(timeout=1.0)
+            except queue.Empty:
+                if not all(p.is_alive() for p in self._procs):
+                    raise RuntimeError("Draw worker exited unexpectedly")
+                continue
+            if fi is None:
+                raise RuntimeError(f"Draw worker failed:\n{slot}")
+            return fi, slot
+
+    def close(self):
+        for _ in self._procs:
+            self._tasks.put(None)
+        for p in self._procs:
+            p.join(timeout=2)
+            if p.is_alive():
+                p.terminate()
+        self._procs = []
+        self._images, self._slots = [], {}
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # a frame view is still referenced; the mapping goes with it
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,142 @@
+"""Motion Graphics — CPU Governor
+
+Splits the host's cores between the renders running at the same time, so N
+parallel jobs don't each start an x264 pool sized to every core and fight
+over them. Each render registers itself in a shared job directory (under
+MG_CACHE_DIR), so independent processes — batch workers, the pipeline, a
+preview daemon — see each other.
+
+Per job: one core for the python side (drawing holds the GIL, so a render
+draws on one thread), the rest of its share for x264 (-threads plus
+lookahead threads via -x264-params). params["threads"] or $MG_THREADS pins
+the encoder thread count; $MG_JOBS tells a job how many siblings a batch
+runner will start, in case they haven't registered yet.
+params["draw_workers"] or $MG_DRAW_WORKERS asks for that many drawing
+processes instead (shared.framering); they get at most the share less one
+core, which stays with the encoder.
+
+After the render, CPU time against the cores it was given is reported as
+"cpu" in the metrics record (utilization near 1.0 = the share was used).
+"""
+import os, json, time, uuid, resource
+from contextlib import contextmanager
+from shared.grid_background import CACHE_DIR
+
+JOBS_DIR = os.path.join(CACHE_DIR, "jobs")
+PYTHON_THREADS = 1
+
+
+def host_cores():
+    """Usable cores: CPU affinity, capped by a cgroup v2 CPU quota when one is set."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cores = min(cores, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cores
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def active_jobs():
+    """Live registered renders (stale entries of dead processes are removed).
+
+    Entries are named <pid>-<token>.json, one per render, so a process
+    rendering several jobs at once (preview server, an encoder session next
+    to a render, threaded batch callers) counts once per render.
+    """
+    jobs = []
+    if not os.path.isdir(JOBS_DIR):
+        return jobs
+    alive = {}
+    for name in os.listdir(JOBS_DIR):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(JOBS_DIR, name)
+        try:
+            pid = int(name.split(".")[0].split("-")[0])
+            if pid not in alive:
+                alive[pid] = _alive(pid)
+            if not alive[pid]:
+                os.unlink(path)
+                continue
+            with open(path, encoding="utf-8") as f:
+                jobs.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return jobs
+
+
+def allocate(params, cores=None, jobs=None):
+    """Thread plan for one render given the host and the number of concurrent jobs (this one included)."""
+    cores = cores or host_cores()
+    if jobs is None:
+        jobs = max(len(active_jobs()) + 1, int(os.environ.get("MG_JOBS", 1)))
+    share = max(1, cores // jobs)
+    pinned = params.get("threads") or os.environ.get("MG_THREADS")
+    wanted = int(params.get("draw_workers") or os.environ.get("MG_DRAW_WORKERS") or PYTHON_THREADS)
+    draw = max(1, min(wanted, share - 1)) if share > 1 else PYTHON_THREADS
+    encoder = int(pinned) if pinned else max(1, share - draw)
+    return {
+        "cores": cores,
+        "jobs": jobs,
+        "share": share,
+        "draw_workers": draw,
+        "encoder_threads": encoder,
+        "pinned": bool(pinned),
+        # x264 adds lookahead threads on top of -threads unless told otherwise
+        "x264_params": f"lookahead-threads={max(1, encoder // 4)}",
+    }
+
+
+def apply(profile, plan):
+    """Profile with the plan's encoder threading (see shared.profiles.encoder_args).
+
+    A job alone on the host keeps x264's own threading (and byte-identical
+    output); the plan only applies once cores are shared, threads are pinned
+    or drawing takes more than one core.
+    """
+    if plan["jobs"] <= 1 and not plan["pinned"] and plan["draw_workers"] <= PYTHON_THREADS:
+        return profile
+    return dict(profile, threads=plan["encoder_threads"], x264_params=plan["x264_params"])
+
+
+def _cpu_seconds():
+    me = resource.getrusage(resource.RUSAGE_SELF)
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return me.ru_utime + me.ru_stime + kids.ru_utime + kids.ru_stime
+
+
+@contextmanager
+def governed(preset, params):
+    """Register this render for its duration; yields the thread plan, filled with usage afterwards."""
+    plan = allocate(params)
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    path = os.path.join(JOBS_DIR, f"{os.getpid()}-{uuid.uuid4().hex}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"pid": os.getpid(), "preset": preset, "threads": plan["share"], "started": time.time()}, f)
+    cpu0, wall0 = _cpu_seconds(), time.perf_counter()
+    try:
+        yield plan
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        cpu, wall = _cpu_seconds() - cpu0, time.perf_counter() - wall0
+        plan["cpu_s"] = round(cpu, 3)
+        plan["utilization"] = round(cpu / (wall * plan["share"]), 3) if wall > 0 else None
@@ -1,6 +1,11 @@
 """Motion Graphics — Grid Background v2 — More visible grid lines"""
+import os, subprocess, tempfile, hashlib, json
 from PIL import Image, ImageDraw
 from shared.colors import hex_to_rgb, hex_to_rgba
+from shared.layout import layout_scale
+from shared import metrics
+
+CACHE_DIR = os.environ.get("MG_CACHE_DIR", os.path.join(tempfile.gettempdir(), "motion-graphics-cache"))
 
 def create_grid_background(width=1920, height=1080, theme=None):
     if theme is None:
@@ -19,16 +24,18 @@ def create_grid_background(width=1920, height=1080, theme=None):
     opacity_sub = int(theme.get("grid_opacity", 0.3) * 255 * 0.8)
     grid_sub = (*grid_rgb, min(255, opacity_sub))
     
-    spacing = 40
+    # Spacing in layout units so the grid looks the same at every resolution
+    scale = layout_scale(width, height)
+    spacing = max(4, round(40 * scale))
     
-    # Sub grid (every 40px, thin)
+    # Sub grid (every 40 units, thin)
     for x in range(0, width, spacing):
         draw.line([(x, 0), (x, height)], fill=grid_sub, width=1)
     for y in range(0, height, spacing):
         draw.line([(0, y), (width, y)], fill=grid_sub, width=1)
     
-    # Main grid (every 200px, thicker and brighter)
-    big_spacing = 200
+    # Main grid (every 200 units, thicker and brighter)
+    big_spacing = spacing * 5
     bright_rgb = tuple(min(255, c + 30) for c in grid_rgb)
     grid_bright = (*bright_rgb, min(255, opacity_main + 40))
     for x in range(0, width, big_spacing):
@@ -40,3 +47,58 @@ def create_grid_background(width=1920, height=1080, theme=None):
 
 def create_transparent_background(width=1920, height=1080):
     return Image.new("RGBA", (width, height), (0, 0, 0, 0))
+
+def get_background_plate(width=1920, height=1080, theme=None):
+    """Encode the grid for this theme + resolution once (lossless, single frame) and return the cached clip."""
+    if theme is None:
+        from shared.colors import DEFAULT_THEME
+        theme = DEFAULT_THEME
+    look = {k: theme.get(k) for k in ("background", "grid_color", "grid_opacity")}
+    key = hashlib.sha1(json.dumps([width, height, look], sort_keys=True).encode()).hexdigest()[:16]
+    plate_dir = os.path.join(CACHE_DIR, "plates")
+    plate_path = os.path.join(plate_dir, f"grid_{width}x{height}_{key}.mkv")
+    if os.path.exists(plate_path):
+        metrics.count("plate_cache_hits")
+        return plate_path
+    metrics.count("plate_cache_misses")
+    with metrics.span("plate_encode"):
+        _encode_plate(width, height, theme, plate_dir, plate_path)
+    return plate_path
+
+def _encode_plate(width, height, theme, plate_dir, plate_path):
+    os.makedirs(plate_dir, exist_ok=True)
+    png = tempfile.NamedTemporaryFile(suffix=".png", dir=plate_dir, delete=False)
+    tmp_clip = plate_path + f".{os.getpid()}.tmp.mkv"
+    try:
+        # Flatten over black exactly like render_frames_to_video does for full frames
+        grid = create_grid_background(width, height, theme)
+        flat = Image.new("RGB", grid.size, (0, 0, 0))
+        flat.paste(grid, mask=grid.split()[3])
+        flat.save(png, "PNG")
+        png.close()
+        cmd = ["ffmpeg", "-y", "-i", png.name, "-frames:v", "1",
+               "-c:v", "ffv1", "-pix_fmt", "gbrp", tmp_clip]
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"FFmpeg plate encode failed: {result.stderr.decode()[:500]}")
+        os.replace(tmp_clip, plate_path)  # atomic, parallel renders may race on the same plate
+    finally:
+        os.unlink(png.name)
+        if os.path.exists(tmp_clip): os.unlink(tmp_clip)
+
+def create_frame_background(width, height, theme, params, plate_safe=False):
+    """Returns (bg, plate). Frames are drawn on bg; with params["foreground_only"] and a
+    plate_safe preset, bg is transparent and the grid comes from the pre-encoded plate,
+    overlaid by ffmpeg. Otherwise frames are drawn on the grid as usual.
+
+    foreground_only must not change pixels, so only presets that draw nothing
+    semi-transparent may pass plate_safe: ImageDraw replaces RGBA pixels rather than
+    blending (a translucent fill on the grid is flattened over black), and a masked
+    paste mixes the alpha channel too, so fades would come out differently over the
+    plate. The foreground still goes to ffmpeg as full frames; what the mode saves is
+    drawing the grid, not per-frame pixels.
+    """
+    if params.get("foreground_only") and plate_safe:
+        return create_transparent_background(width, height), get_background_plate(width, height, theme)
+    with metrics.span("background"):
+        return create_grid_background(width, height, theme), None
@@ -0,0 +1,201 @@
+"""Motion Graphics — Incremental Re-Render
+
+params["incremental"] (true, or {"chunk_seconds": 2}) keeps the video as
+separately encoded chunks in <name>.chunks/ next to the output and joins
+them into the output with `ffmpeg -f concat -c copy`. The next render to the
+same output diffs its params against the previous run's (manifest.json in
+that directory), takes the time the change shows from the preset's
+Scene.regions and redraws only the chunks overlapping it; every other chunk
+is reused as it is. Frames are drawn from absolute time (see shared.scene),
+so any range can be redrawn on its own.
+
+Each run of neighbouring dirty chunks is drawn by one encoder and cut into
+chunk files by the segment muxer at forced keyframes, so every chunk starts
+on a keyframe (with conform: a whole number of its fixed GOPs). Files given
+by path (thumbnails, portraits, logos) count as changed when they change on
+disk, files by URL when the download cache fetched a new copy (shared.remote). Everything is redrawn when a changed param lies outside every region,
+or the size, frame rate, duration or encoder settings differ from the
+previous run, or there is none.
+
+Chunks are always drawn by the python backend and written as mp4; the
+silent audio track of a conform spec is added once at the join, and
+params["progressive"] does not apply.
+"""
+import os, json, math, time, subprocess
+from shared import metrics
+from shared.profiles import output_path_for, silence_args
+from shared.render import render_frames_to_video, FramePool
+from shared.budget import DEFAULT_POOL, DEFAULT_QUEUE
+from shared.remote import is_url, cached_path
+
+CHUNK_SECONDS = 2
+MANIFEST = "manifest.json"
+# Params that never change a pixel of the video
+NON_VISUAL_KEYS = {"output_path", "incremental", "backend", "foreground_only", "progress", "metrics_path",
+                   "profiler", "memory_budget_mb", "threads", "sidecar", "progressive"}
+# What chunks encoded in different runs must share to be joined with -c copy
+CHUNK_ENCODER_KEYS = ("codec", "preset", "crf", "pix_fmt")
+
+
+def chunk_frames(scene, params):
+    """Frames per chunk: chunk_seconds, rounded to whole GOPs when the render is conformed."""
+    option = params.get("incremental")
+    seconds = option.get("chunk_seconds", CHUNK_SECONDS) if isinstance(option, dict) else CHUNK_SECONDS
+    frames = max(1, round(seconds * scene.fps))
+    conform = scene.profile.get("conform")
+    if conform:
+        frames = max(1, round(frames / conform["gop"])) * conform["gop"]
+    return frames
+
+
+def _snapshot(value):
+    """Params as compared between runs: existing files by path are stamped with their mtime and size."""
+    if isinstance(value, dict):
+        return {k: _snapshot(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_snapshot(v) for v in value]
+    if is_url(value) and cached_path(value):
+        st = os.stat(cached_path(value))  # a copy is replaced (new mtime) on every 200
+        return {"url": value, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+    if isinstance(value, str) and value and os.path.isfile(value):
+        st = os.stat(value)
+        return {"file": value, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+    return value
+
+
+def changed_paths(old, new, path=()):
+    """Paths (tuples of keys and indexes) where new differs from old; a resized list changes as a whole."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        out = []
+        for key in list(old) + [k for k in new if k not in old]:
+            if key not in old or key not in new:
+                out.append(path + (key,))
+            else:
+                out += changed_paths(old[key], new[key], path + (key,))
+        return out
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        return [p for i, (a, b) in enumerate(zip(old, new)) for p in changed_paths(a, b, path + (i,))]
+    return [] if old == new else [path]
+
+
+def affected_frames(paths, regions, fps, total):
+    """Frame ranges [start, end) the changed paths show in, or None when one lies outside every region."""
+    ranges = []
+    for path in paths:
+        hits = [(t0, t1) for region, t0, t1 in regions if tuple(path[:len(region)]) == tuple(region)]
+        if not hits:
+            return None
+        ranges += [(max(0, math.floor(t0 * fps)), min(total, math.ceil(t1 * fps))) for t0, t1 in hits]
+    return ranges
+
+
+def _runs(chunks):
+    """Sorted chunk indexes as (first, end) runs of neighbours."""
+    runs = []
+    for c in chunks:
+        if runs and runs[-1][1] == c:
+            runs[-1][1] = c + 1
+        else:
+            runs.append([c, c + 1])
+    return runs
+
+
+def _load_manifest(chunk_dir):
+    try:
+        with open(os.path.join(chunk_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _draw_range(scene, pool, start, end):
+    acquire = draw = 0.0
+    try:
+        for fi in range(start, end):
+            t0 = time.perf_counter()
+            frame = pool.acquire(scene.background)
+            t1 = time.perf_counter()
+            scene.draw(frame, fi / scene.fps)
+            acquire += t1 - t0
+            draw += time.perf_counter() - t1
+            yield frame
+    finally:
+        metrics.add_time("acquire", acquire)
+        metrics.add_time("draw", draw)
+
+
+def _join(files, list_path, output_path, profile, duration):
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.writelines(f"file '{os.path.basename(path)}'\n" for path in files)
+    cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_path, "-map", "0:v", "-c:v", "copy"]
+    conform = profile.get("conform")
+    if conform:
+        cmd += ["-video_track_timescale", str(conform["timescale"])]
+        if conform.get("audio"):
+            cmd += silence_args(conform["audio"], duration)
+    cmd += ["-movflags", "+faststart", output_path]
+    with metrics.span("join"):
+        result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg join failed: {result.stderr.decode()[-500:]}")
+
+
+def render_incremental(preset, scene, params, output_path, budget=None):
+    """Render the scene as chunks, redrawing only those the change since the last run touches; returns the path.
+
+    `params` are the job's params as requested, before build_scene filled in anything.
+    """
+    profile = {k: v for k, v in scene.profile.items() if k != "progressive"}
+    if profile.get("container", "mp4") != "mp4":
+        raise ValueError(f"incremental renders need an mp4 profile, {profile['name']} writes {profile['container']}")
+    output_path = output_path_for(profile, output_path)
+    chunk_dir = os.path.splitext(output_path)[0] + ".chunks"
+    os.makedirs(chunk_dir, exist_ok=True)
+
+    total, fps, cf = scene.total_frames, scene.fps, chunk_frames(scene, params)
+    n = math.ceil(total / cf)
+    files = [os.path.join(chunk_dir, f"chunk-{c:05d}.mp4") for c in range(n)]
+    conform = profile.get("conform")
+    # Normalised through JSON so it compares equal to what the manifest read back
+    state = json.loads(json.dumps({
+        "preset": preset, "width": scene.width, "height": scene.height, "fps": fps, "frames": total,
+        "chunk_frames": cf, "encoder": {k: profile.get(k) for k in CHUNK_ENCODER_KEYS},
+        "conform": dict(conform, audio=False) if conform else None,
+    }))
+    snapshot = json.loads(json.dumps(_snapshot({k: v for k, v in params.items() if k not in NON_VISUAL_KEYS})))
+    regions = [[list(path), t0, t1] for path, t0, t1 in scene.regions]
+
+    previous = _load_manifest(chunk_dir)
+    dirty = set(range(n))
+    if previous and previous.get("state") == state:
+        ranges = affected_frames(changed_paths(previous["params"], snapshot), previous["regions"] + regions, fps, total)
+        if ranges is not None:
+            dirty = {c for c in range(n) for start, end in ranges if start < (c + 1) * cf and end > c * cf}
+    dirty |= {c for c in range(n) if not os.path.exists(files[c])}
+    if os.path.exists(os.path.join(chunk_dir, MANIFEST)):
+        os.remove(os.path.join(chunk_dir, MANIFEST))  # until the chunks match these params again
+
+    plan = budget.plan if budget else {"pool_frames": DEFAULT_POOL, "queue_depth": DEFAULT_QUEUE}
+    chunk_profile = dict(profile, conform=dict(conform, audio=False)) if conform else profile
+    for first, end in _runs(sorted(dirty)):
+        start, stop = first * cf, min(total, end * cf)
+        boundaries = [c * cf - start for c in range(first + 1, end)]
+        pool = FramePool(scene.width, scene.height, size=plan["pool_frames"])
+        if budget:
+            budget.pool = pool
+        render_frames_to_video(_draw_range(scene, pool, start, stop), os.path.join(chunk_dir, "chunk-%05d.mp4"),
+                               fps=fps, duration=(stop - start) / fps, background=scene.plate,
+                               queue_depth=plan["queue_depth"], pool=pool, budget=budget,
+                               profile=dict(chunk_profile, keyframes=boundaries, segment_frames=boundaries,
+                                            segment_start=first))
+    for name in os.listdir(chunk_dir):
+        if name.startswith("chunk-") and os.path.join(chunk_dir, name) not in files:
+            os.remove(os.path.join(chunk_dir, name))
+
+    _join(files, os.path.join(chunk_dir, "chunks.txt"), output_path, profile, total / fps)
+    with open(os.path.join(chunk_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({"state": state, "params": snapshot, "regions": regions, "chunks": n}, f, indent=2)
+        f.write("\n")
+    metrics.count("chunks_drawn", len(dirty))
+    metrics.count("chunks_reused", n - len(dirty))
+    return output_path
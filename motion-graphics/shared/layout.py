@@ -0,0 +1,51 @@
+"""Motion Graphics — Layout Units
+
+Presets are designed on a 1920x1080 reference canvas. Layout maps those
+reference pixels onto the requested output size (params["width"] /
+params["height"], times the render profile's scale), so geometry and font
+sizes follow the resolution instead of being re-scaled by ffmpeg afterwards.
+
+One unit is min(W, H)/1080 output pixels, so type and strokes keep the same
+size relative to the short side: a 1080x1920 short gets the same text size
+as 1080p, a 720p draft two thirds of it. Positions stay anchored to W and H
+(centers, edges, fractions) so the content spreads over the whole frame on
+any aspect ratio instead of sitting in a letterbox; fixed widths in presets
+are kept under 1080 units for that reason.
+"""
+
+REF_W, REF_H = 1920, 1080
+
+
+def layout_scale(width, height):
+    return min(width, height) / REF_H
+
+
+class Layout:
+    def __init__(self, width, height):
+        self.W, self.H = width, height
+        self.scale = layout_scale(width, height)
+        self.portrait = height > width
+
+    def u(self, px):
+        """Reference pixels → output pixels (int). Non-zero sizes never collapse to 0."""
+        v = int(round(px * self.scale))
+        if v == 0 and px:
+            return 1 if px > 0 else -1
+        return v
+
+    def uf(self, px):
+        """Unrounded variant, for sub-pixel motion and ffmpeg expressions."""
+        return px * self.scale
+
+
+def get_layout(params, profile=None):
+    """Output canvas for a job: requested size (default 1920x1080) times the profile scale, even-sized for yuv420."""
+    conform = (profile or {}).get("conform")
+    if conform:
+        return Layout(conform["width"], conform["height"])
+    width = int(params.get("width") or REF_W)
+    height = int(params.get("height") or REF_H)
+    s = (profile or {}).get("scale", 1.0)
+    width = max(2, int(round(width * s / 2)) * 2)
+    height = max(2, int(round(height * s / 2)) * 2)
+    return Layout(width, height)
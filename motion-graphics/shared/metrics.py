@@ -0,0 +1,229 @@
+"""Motion Graphics — Render Metrics
+
+Timing spans and counters for one render. shared.scene.render_preset opens
+a RenderMetrics for the job and makes it current; shared code records into
+it through the module-level helpers (span, count, progress), which do nothing
+when no render is active (previews, cost estimates).
+
+On completion the record is printed as one JSON line prefixed with
+"MG_METRICS " and, with params["metrics_path"] or $MG_METRICS_PATH, written
+to that file. Progress is streamed as JSON lines to params["progress"] or
+$MG_PROGRESS ("-" for stderr, otherwise a file path), at most every
+PROGRESS_INTERVAL seconds.
+
+"peak_rss_mb" is this render's own peak: resident memory of the process and
+of its live children (ffmpeg, draw workers) is sampled from /proc every
+RSS_SAMPLE_INTERVAL seconds while the render runs, so a worker that renders
+many jobs (batch, preview server, encoder session) doesn't report an earlier
+job's high-water mark. Without /proc it falls back to getrusage's
+process-lifetime peaks.
+"""
+import sys, os, json, time, resource, functools, threading
+from contextlib import contextmanager
+
+PROGRESS_INTERVAL = 0.5
+RSS_SAMPLE_INTERVAL = 0.1
+_PAGE_MB = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024) if hasattr(os, "sysconf") else 4096 / (1024 * 1024)
+_current = None
+
+
+def current_rss_mb(pid=None):
+    """Resident memory of a process right now (Linux /proc), or None where unavailable."""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_MB
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _children():
+    """Pids of this process' live children, or None without /proc/<pid>/task/<tid>/children."""
+    pids = []
+    try:
+        for tid in os.listdir("/proc/self/task"):
+            try:
+                with open(f"/proc/self/task/{tid}/children") as f:
+                    pids += f.read().split()
+            except FileNotFoundError:
+                continue  # thread exited meanwhile
+    except OSError:
+        return None
+    return pids
+
+
+def _lifetime_peak_mb():
+    return {
+        "python": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+
+class _RssSampler:
+    """Peak RSS of this process and of its live children (summed), sampled on a thread."""
+
+    def __init__(self):
+        self.python = self.children = 0.0
+        self.available = current_rss_mb() is not None and _children() is not None
+        self._stop = threading.Event()
+        self._thread = None
+        if self.available:
+            self.sample()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="rss-sampler")
+            self._thread.start()
+
+    def sample(self):
+        self.python = max(self.python, current_rss_mb() or 0.0)
+        self.children = max(self.children, sum(current_rss_mb(pid) or 0.0 for pid in _children() or ()))
+
+    def _run(self):
+        while not self._stop.wait(RSS_SAMPLE_INTERVAL):
+            self.sample()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.sample()
+
+    def peak_mb(self):
+        if not self.available:
+            return _lifetime_peak_mb()
+        return {"python": round(self.python, 1), "children": round(self.children, 1)}
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process and its children during the current render, in MB.
+
+    Outside a render (or without /proc): the process-lifetime peaks from getrusage.
+    """
+    if _current is not None:
+        return _current.rss.peak_mb()
+    return _lifetime_peak_mb()
+
+
+class RenderMetrics:
+    def __init__(self, preset, params=None):
+        params = params or {}
+        self.preset = preset
+        self.spans = {}
+        self.counters = {}
+        self.info = {}
+        self._t0 = time.perf_counter()
+        self._last_progress = 0.0
+        target = params.get("progress") or os.environ.get("MG_PROGRESS")
+        self._progress = None
+        self._owns_progress = False
+        if target == "-":
+            self._progress = sys.stderr
+        elif target:
+            self._progress = open(target, "a", encoding="utf-8")
+            self._owns_progress = True
+        self.metrics_path = params.get("metrics_path") or os.environ.get("MG_METRICS_PATH")
+        self.rss = _RssSampler()
+
+    @contextmanager
+    def span(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - t0)
+
+    def add_time(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def emit(self, event, force=False, **fields):
+        if self._progress is None:
+            return
+        now = time.perf_counter() - self._t0
+        if not force and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        line = {"event": event, "preset": self.preset, "elapsed": round(now, 3), **fields}
+        self._progress.write(json.dumps(line) + "\n")
+        self._progress.flush()
+
+    def record(self):
+        return {
+            "preset": self.preset,
+            **self.info,
+            "wall_s": round(time.perf_counter() - self._t0, 4),
+            "spans_s": {k: round(v, 4) for k, v in self.spans.items()},
+            "counters": dict(self.counters),
+            "peak_rss_mb": self.rss.peak_mb(),
+        }
+
+    def close(self, ok=True, error=None):
+        self.rss.stop()
+        rec = dict(self.record(), ok=ok)
+        if error:
+            rec["error"] = error
+        self.emit("done", force=True, ok=ok)
+        if self._owns_progress:
+            self._progress.close()
+        if self.metrics_path:
+            with open(self.metrics_path, "w", encoding="utf-8") as f:
+                json.dump(rec, f, indent=2)
+        print("MG_METRICS " + json.dumps(rec))
+        return rec
+
+
+def current():
+    return _current
+
+
+@contextmanager
+def render_metrics(preset, params=None):
+    """Make a RenderMetrics current for the duration of one render."""
+    global _current
+    prev, _current = _current, RenderMetrics(preset, params)
+    m = _current
+    try:
+        yield m
+    except BaseException as e:
+        m.close(ok=False, error=str(e))
+        raise
+    else:
+        m.close()
+    finally:
+        _current = prev
+
+
+@contextmanager
+def span(name):
+    if _current is None:
+        yield
+    else:
+        with _current.span(name):
+            yield
+
+
+def count(name, n=1):
+    if _current is not None:
+        _current.count(name, n)
+
+
+def timed(name):
+    """Decorator: time every call of the function under span `name`."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def add_time(name, seconds):
+    if _current is not None:
+        _current.add_time(name, seconds)
+
+
+def progress(frame, total=None, phase="frames"):
+    if _current is not None:
+        total = total or _current.info.get("frames")
+        _current.emit("progress", force=bool(total) and frame >= total, phase=phase, frame=frame, total=total)
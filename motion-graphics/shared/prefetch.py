@@ -0,0 +1,100 @@
+"""Motion Graphics — Asset Prefetch
+
+Loads the source images of a list of jobs (thumbnails, portraits, logos) on a
+thread pool while the jobs render, so a render doesn't wait on opening its
+files one by one, often from a network-mounted project folder. Pillow
+releases the GIL while decoding, so the pool overlaps with drawing too.
+
+    with prefetching(paths) as stats:
+        ...  # render
+
+Each path goes to the asset cache the renders will read:
+  - with the host's asset store (shared.asset_store, the batch's
+    --asset-store-mb) the full-size decode is preloaded there, where every
+    worker's open_image maps it;
+  - inside asset_scope() (one process rendering several jobs, e.g. an
+    encoder session) it is decoded into the scope;
+  - otherwise the file is only read ahead, into the OS page cache.
+URLs are downloaded into the download cache first (shared.remote), over
+its pooled connections.
+
+Paths are taken in job order, so the first jobs' assets come first. A path
+that fails to load is left to the render that needs it.
+"""
+import os, time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from shared import assets
+from shared.asset_store import preload
+from shared.remote import is_url, local_path
+
+ASSET_KEYS = ("thumbnail_path", "portrait_path", "logo_path")
+PREFETCH_THREADS = 4
+
+
+def asset_paths(params, out=None, base=""):
+    """Existing files and URLs named by the asset keys anywhere in params, in order, each once.
+
+    Relative paths are taken from `base` (the directory the jobs run in).
+    """
+    out = [] if out is None else out
+    if isinstance(params, dict):
+        for key, value in params.items():
+            if key in ASSET_KEYS and isinstance(value, str) and value:
+                path = value if is_url(value) else os.path.join(base, value)
+                if path not in out and (is_url(path) or os.path.isfile(path)):
+                    out.append(path)
+            else:
+                asset_paths(value, out, base)
+    elif isinstance(params, list):
+        for value in params:
+            asset_paths(value, out, base)
+    return out
+
+
+def _read_ahead(path):
+    with open(path, "rb") as f:
+        while f.read(1 << 20):
+            pass
+
+
+def _load(path, store_mb):
+    path = local_path(path)
+    if store_mb:
+        return preload(path, assets.decode, store_mb)
+    if assets.in_scope():
+        assets.open_image(path)
+    else:
+        _read_ahead(path)
+    return True
+
+
+@contextmanager
+def prefetching(paths, threads=PREFETCH_THREADS, store_mb=None):
+    """Load paths on `threads` threads for the duration of the block; yields stats, filled in afterwards.
+
+    `store_mb` is the asset store's bound (None: the store is off). Loads
+    not started when the block ends are cancelled.
+    """
+    stats = {"assets": len(paths), "loaded": 0, "cached": 0, "failed": 0}
+    if not paths or threads <= 0:
+        yield stats
+        return
+    t0 = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="prefetch")
+    futures = [pool.submit(_load, path, store_mb) for path in paths]
+    finished = []
+    for future in futures:
+        future.add_done_callback(lambda f: f.cancelled() or finished.append(time.perf_counter()))
+    try:
+        yield stats
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        for future in futures:
+            if future.cancelled():
+                continue
+            if future.exception() is not None:
+                stats["failed"] += 1
+            else:
+                stats["loaded" if future.result() else "cached"] += 1
+        stats["wall_s"] = round(max(finished, default=t0) - t0, 3)
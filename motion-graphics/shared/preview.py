@@ -0,0 +1,208 @@
+"""Motion Graphics — Previews
+
+Renders one frame at time t, or a contact sheet of N evenly spaced frames, as
+PNG or WebP straight from a preset's Scene — no ffmpeg, no encode. Built
+scenes are cached per (preset, params), so a warm worker answers scrubbing
+requests with a single draw.
+
+Animated previews (WebP or GIF) draw the same scene natively at a small size
+and low frame rate (default 480 wide, 12 fps); runs of identical frames are
+merged into one longer frame.
+
+    python3 -m shared.preview title_card '{"title": "Hi"}' --t 1.2 -o still.png
+    python3 -m shared.preview title_card '{"title": "Hi"}' --sheet 8 -o sheet.webp
+    python3 -m shared.preview title_card '{"title": "Hi"}' --animate -o preview.webp
+    python3 -m shared.preview --serve    # JSON lines on stdin → JSON lines on stdout
+
+Run from the motion-graphics directory.
+"""
+import sys, os, io, json, time, base64, importlib
+from collections import OrderedDict
+from PIL import Image, ImageDraw
+from shared.profiles import load_registry
+from shared.fonts import get_font, get_text_size
+
+SCENE_CACHE_SIZE = 8
+_scenes = OrderedDict()
+
+
+def preset_module(preset):
+    """Registry id (e.g. "title_card") → imported preset module."""
+    for p in load_registry()["presets"]:
+        if p["id"] == preset:
+            script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), p["script"])
+            if not os.path.exists(script):
+                raise ValueError(f"Preset {preset} is registered but not implemented ({p['script']})")
+            return importlib.import_module(p["script"][:-3].replace("/", "."))
+    raise ValueError(f"Unknown preset: {preset}")
+
+
+def get_scene(preset, params):
+    # Previews are single images, so the grid is always drawn into the frame
+    params = dict(params, foreground_only=False)
+    key = (preset, json.dumps(params, sort_keys=True))
+    if key in _scenes:
+        _scenes.move_to_end(key)
+        return _scenes[key]
+    scene = preset_module(preset).build_scene(params)
+    _scenes[key] = scene
+    while len(_scenes) > SCENE_CACHE_SIZE:
+        _scenes.popitem(last=False)
+    return scene
+
+
+def _flatten(frame):
+    # Same as the encoders: composite over black
+    flat = Image.new("RGB", frame.size, (0, 0, 0))
+    flat.paste(frame, mask=frame.split()[3])
+    return flat
+
+
+def encode_image(img, fmt="png"):
+    buf = io.BytesIO()
+    if fmt == "webp":
+        img.save(buf, "WEBP", quality=85, method=0)
+    elif fmt == "png":
+        img.save(buf, "PNG", compress_level=1)
+    else:
+        raise ValueError(f"Unsupported preview format: {fmt}")
+    return buf.getvalue()
+
+
+def render_still(preset, params, t, fmt="png"):
+    scene = get_scene(preset, params)
+    t = min(max(0.0, t), scene.duration)
+    return encode_image(_flatten(scene.frame_at(t)), fmt)
+
+
+def contact_sheet_times(duration, n):
+    """Evenly spaced sample times, centered in n equal slices of the clip."""
+    return [duration * (i + 0.5) / n for i in range(n)]
+
+
+def render_contact_sheet(preset, params, n=8, cols=4, thumb_width=480, fmt="png"):
+    scene = get_scene(preset, params)
+    n = max(1, int(n))
+    cols = max(1, min(cols, n))
+    rows = (n + cols - 1) // cols
+    tw = thumb_width
+    th = max(1, round(tw * scene.height / scene.width))
+    gap, label_h = 8, 22
+    sheet = Image.new("RGB", (cols * tw + (cols + 1) * gap, rows * (th + label_h) + (rows + 1) * gap), (12, 12, 18))
+    draw = ImageDraw.Draw(sheet)
+    font = get_font("Arial", 14)
+    frame = scene.background.copy()
+    for i, t in enumerate(contact_sheet_times(scene.duration, n)):
+        frame.paste(scene.background, (0, 0))
+        scene.draw(frame, t)
+        thumb = _flatten(frame).resize((tw, th), Image.BILINEAR)
+        x = gap + (i % cols) * (tw + gap)
+        y = gap + (i // cols) * (th + label_h + gap)
+        sheet.paste(thumb, (x, y))
+        label = f"{t:.2f}s"
+        lw, lh = get_text_size(draw, label, font)
+        draw.text((x + (tw - lw) // 2, y + th + (label_h - lh) // 2), label, fill=(170, 170, 180), font=font)
+    return encode_image(sheet, fmt)
+
+
+def animation_params(params, width=480, fps=12):
+    """Params for a reduced preview: same aspect as the requested output, given width and fps."""
+    src_w = int(params.get("width") or 1920)
+    src_h = int(params.get("height") or 1080)
+    height = max(2, round(width * src_h / src_w / 2) * 2)
+    params = {k: v for k, v in params.items() if k != "profile"}  # size is set here, not by a profile scale
+    return dict(params, width=width, height=height, fps=fps)
+
+
+def render_animation(preset, params, width=480, fps=12, fmt="webp", quality=70):
+    scene = get_scene(preset, animation_params(params, width, fps))
+    frame = scene.background.copy()
+    frames, durations = [], []
+    prev = None
+    for fi in range(scene.total_frames):
+        frame.paste(scene.background, (0, 0))
+        scene.draw(frame, fi / scene.fps)
+        flat = _flatten(frame)
+        data = flat.tobytes()
+        # Milliseconds accumulate from frame boundaries so rounding never drifts the total
+        end_ms = round((fi + 1) * 1000 / scene.fps)
+        if data == prev:
+            durations[-1] = end_ms - sum(durations[:-1])
+            continue
+        prev = data
+        frames.append(flat)
+        durations.append(end_ms - sum(durations))
+    if not frames:
+        raise ValueError("No frames")
+
+    buf = io.BytesIO()
+    if fmt == "webp":
+        frames[0].save(buf, "WEBP", save_all=True, append_images=frames[1:], duration=durations,
+                       loop=0, quality=quality, method=4)
+    elif fmt == "gif":
+        pal = [f.quantize(colors=128, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE) for f in frames]
+        pal[0].save(buf, "GIF", save_all=True, append_images=pal[1:], duration=durations, loop=0,
+                    optimize=True, disposal=1)
+    else:
+        raise ValueError(f"Unsupported animation format: {fmt}")
+    return buf.getvalue()
+
+
+def handle(request):
+    """One preview request (dict) → response dict. Writes to request["output"] or returns base64 data."""
+    t0 = time.perf_counter()
+    fmt = request.get("format") or os.path.splitext(request.get("output", ""))[1].lstrip(".").lower() or "png"
+    if request.get("animate"):
+        data = render_animation(request["preset"], request.get("params", {}), width=request.get("width", 480),
+                                fps=request.get("fps", 12), fmt=fmt)
+    elif request.get("sheet"):
+        data = render_contact_sheet(request["preset"], request.get("params", {}), n=request["sheet"],
+                                    cols=request.get("cols", 4), thumb_width=request.get("thumb_width", 480), fmt=fmt)
+    else:
+        data = render_still(request["preset"], request.get("params", {}), float(request.get("t", 0)), fmt=fmt)
+    response = {"ok": True, "format": fmt, "bytes": len(data)}
+    if request.get("output"):
+        with open(request["output"], "wb") as f:
+            f.write(data)
+        response["output"] = request["output"]
+    else:
+        response["data"] = base64.b64encode(data).decode()
+    response["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return response
+
+
+def serve(stdin=sys.stdin, stdout=sys.stdout):
+    """Warm worker: one JSON request per line in, one JSON response per line out."""
+    for line in stdin:
+        if not line.strip():
+            continue
+        try:
+            response = handle(json.loads(line))
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Render still previews of a motion graphics preset")
+    ap.add_argument("preset", nargs="?")
+    ap.add_argument("params", nargs="?", default="{}")
+    ap.add_argument("--t", type=float, default=0.0, help="time of the still, in seconds")
+    ap.add_argument("--sheet", type=int, default=0, help="contact sheet with N frames instead of one still")
+    ap.add_argument("--cols", type=int, default=4)
+    ap.add_argument("--animate", action="store_true", help="animated WebP/GIF preview instead of a still")
+    ap.add_argument("--width", type=int, default=480, help="animated preview width")
+    ap.add_argument("--fps", type=int, default=12, help="animated preview frame rate")
+    ap.add_argument("-o", "--output", required=False)
+    ap.add_argument("--serve", action="store_true", help="JSON-lines worker on stdin/stdout")
+    args = ap.parse_args()
+    if args.serve:
+        serve()
+    else:
+        if not args.preset or not args.output:
+            ap.error("preset and -o are required")
+        print(json.dumps(handle({"preset": args.preset, "params": json.loads(args.params), "t": args.t,
+                                 "sheet": args.sheet, "cols": args.cols, "animate": args.animate,
+                                 "width": args.width, "fps": args.fps, "output": args.output})))
@@ -0,0 +1,218 @@
+"""Motion Graphics — Render Profiler
+
+Opt-in profiling of one render, enabled with params["profiler"] or
+$MG_PROFILER: "sample" (stack sampler), "cprofile", or any other truthy value
+for both. Files land next to the output, tagged with the preset id and a hash
+of the params so profiles from different runs of the same job line up:
+
+    mg-001.title_card-3f2a9c1b7e.collapsed   # flamegraph.pl / speedscope input
+    mg-001.title_card-3f2a9c1b7e.pstats      # python3 -m pstats <file>
+
+The sampler walks every thread's stack each $MG_PROFILER_INTERVAL ms
+(default 5), so the draw and convert stages show up beside the main thread;
+frames are labelled "function (file:line)" like py-spy. cProfile covers every
+thread started during the render: on Python 3.12+ one profiler does (it is
+built on sys.monitoring, which sees all threads and allows only one active
+profiler), before that each new thread gets its own and the stats are merged.
+A thread whose profiler can't start runs unprofiled.
+"""
+import sys, os, json, hashlib, threading, cProfile, pstats
+from collections import Counter
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROCESS_WIDE_CPROFILE = sys.version_info >= (3, 12)
+DEFAULT_INTERVAL_MS = 5.0
+# Keys that change how a job is observed, not what it renders
+UNTRACKED_PARAMS = {"profiler", "progress", "metrics_path"}
+
+
+def profiler_mode(params):
+    value = params.get("profiler") or os.environ.get("MG_PROFILER") or ""
+    value = str(value).strip().lower()
+    if value in ("", "0", "false", "off", "no"):
+        return set()
+    if value in ("sample", "cprofile"):
+        return {value}
+    return {"sample", "cprofile"}
+
+
+def params_hash(params):
+    tracked = {k: v for k, v in params.items() if k not in UNTRACKED_PARAMS}
+    return hashlib.sha1(json.dumps(tracked, sort_keys=True, default=str).encode()).hexdigest()[:10]
+
+
+def profile_base(output_path, preset, params):
+    stem = os.path.splitext(output_path)[0]
+    return f"{stem}.{preset}-{params_hash(params)}"
+
+
+_paths = {}
+
+
+def _label(code, lineno):
+    path = _paths.get(code.co_filename)
+    if path is None:
+        path = code.co_filename
+        if path.startswith(ROOT):
+            path = os.path.relpath(path, ROOT)
+        _paths[code.co_filename] = path
+    return f"{code.co_name} ({path}:{lineno})"
+
+
+class StackSampler:
+    """Periodically records the stacks of all other threads as collapsed stacks."""
+
+    def __init__(self, interval_ms=DEFAULT_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="mg-sampler", daemon=True)
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_label(frame.f_code, frame.f_lineno))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in sorted(self.stacks.items()):
+                f.write(f"{stack} {n}\n")
+
+
+class ThreadedProfile:
+    """cProfile in the calling thread and in every thread started while active."""
+
+    def __init__(self):
+        self.profiles = []
+        self._lock = threading.Lock()
+
+    def _new(self):
+        prof = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(prof)
+        return prof
+
+    def _thread_hook(self, *_):
+        # First profile event of a new thread: hand the thread over to its own cProfile
+        try:
+            self._new().enable()
+        except Exception:
+            sys.setprofile(None)  # never let profiling take a render thread down
+
+    def start(self):
+        if not PROCESS_WIDE_CPROFILE:
+            threading.setprofile(self._thread_hook)
+        self._main = self._new()
+        self._main.enable()
+
+    def stop(self):
+        self._main.disable()
+        if not PROCESS_WIDE_CPROFILE:
+            threading.setprofile(None)
+
+    def write(self, path):
+        stats = None
+        for prof in self.profiles:
+            prof.create_stats()
+            if not prof.stats:
+                continue
+            if stats is None:
+                stats = pstats.Stats(prof)
+            else:
+                stats.add(prof)
+        if stats is not None:
+            stats.dump_stats(path)
+
+
+class RenderProfile:
+    def __init__(self, preset, params, output_path, modes):
+        self.preset = preset
+        self.params = params
+        self.output_path = output_path  # updated once the real path (container) is known
+        self.sampler = StackSampler(float(os.environ.get("MG_PROFILER_INTERVAL", DEFAULT_INTERVAL_MS))) \
+            if "sample" in modes else None
+        self.cprofile = ThreadedProfile() if "cprofile" in modes else None
+        self.files = []
+
+    def start(self):
+        # Sampler first, so its own thread is not picked up by cProfile's thread hook
+        if self.sampler: self.sampler.start()
+        if self.cprofile: self.cprofile.start()
+
+    def stop(self):
+        if self.sampler: self.sampler.stop()
+        if self.cprofile: self.cprofile.stop()
+        base = profile_base(self.output_path, self.preset, self.params)
+        os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+        if self.sampler:
+            self.sampler.write(base + ".collapsed")
+            self.files.append(base + ".collapsed")
+        if self.cprofile:
+            self.cprofile.write(base + ".pstats")
+            self.files.append(base + ".pstats")
+        print(f"Profile: {', '.join(self.files)}")
+
+
+@contextmanager
+def maybe_profile(preset, params, output_path):
+    """Profile the enclosed render when enabled; yields the RenderProfile or None."""
+    modes = profiler_mode(params)
+    if not modes:
+        yield None
+        return
+    prof = RenderProfile(preset, params, output_path, modes)
+    prof.start()
+    try:
+        yield prof
+    finally:
+        prof.stop()
+
+
+if __name__ == "__main__":
+    # Regression run: a short render under cProfile must finish and profile its draw thread
+    #   python3 -m shared.profiler --check
+    import tempfile
+    if sys.argv[1:2] != ["--check"]:
+        sys.exit("usage: python3 -m shared.profiler --check")
+    from benchmarks.fixtures import load_fixtures
+    from shared.preview import preset_module
+    with tempfile.TemporaryDirectory(prefix="mg-profile-check-") as tmp:
+        params = dict(load_fixtures(tmp)["title_card"], duration=1, width=640, height=360, profiler="cprofile")
+        errors = []
+
+        def render():
+            try:
+                preset_module("title_card").render(params, os.path.join(tmp, "check.mp4"))
+            except BaseException as e:
+                errors.append(e)
+        worker = threading.Thread(target=render, daemon=True)
+        worker.start()
+        worker.join(timeout=60)
+        if worker.is_alive():
+            sys.exit("FAIL: render under cProfile did not finish in 60 s")
+        if errors:
+            sys.exit(f"FAIL: render under cProfile raised {errors[0]!r}")
+        found = [f for f in os.listdir(tmp) if f.endswith(".pstats")]
+        functions = {key[2] for key in pstats.Stats(os.path.join(tmp, found[0])).stats} if found else set()
+        if "_draw_stage" not in functions:
+            sys.exit("FAIL: the draw thread is missing from the profile")
+    print(f"OK: cProfile render on Python {sys.version.split()[0]}")
@@ -0,0 +1,241 @@
+"""Motion Graphics — Render Profiles
+
+Named quality tiers (draft / review / final / intermediate) defined in
+registry.json under "profiles". A job picks one with params["profile"];
+without it the registry's "default_profile" applies. A profile sets the
+frame rate, a resolution scale (applied by shared.layout) and the encoder
+settings. params["fps"] overrides the profile's frame rate; presets time all
+animation in seconds, so any rate (24, 25, 60, or 10 for a cheap preview)
+renders natively.
+
+params["conform"] makes a render match an assembly spec exactly (resolution,
+frame rate, mp4 timescale, pix_fmt, H.264 profile/level, closed fixed-length
+GOPs, optionally a silent audio track), so the editor can join it to other
+segments encoded to the same spec with `ffmpeg -f concat -c copy`. The spec
+overrides the profile's frame rate, scale and encoder; see conform_spec().
+
+params["progressive"] writes the video so it can be played while it renders:
+"fmp4" as a fragmented mp4 (a fragment per keyframe and at least one a
+second, -frag_duration, whatever the GOP), "hls" as an event playlist
+<name>.m3u8 with one-second fMP4 segments next to it. HLS segments can only
+start on a keyframe, so with a conform spec the GOP is capped to a second
+unless the spec sets "gop" itself (then segments are one GOP long). Both
+replace +faststart, which can only move the index once the file is done.
+"""
+import os, json
+
+CONFORM_DEFAULTS = {
+    "width": 1920,
+    "height": 1080,
+    "fps": 30,
+    "timescale": 90000,
+    "pix_fmt": "yuv420p",
+    "preset": "fast",
+    "crf": 18,
+    "profile": "high",
+    "level": "4.1",
+    "gop": None,          # frames; default two seconds
+    # SPS/PPS fields x264 would otherwise derive from the preset (the values of "fast"), pinned so
+    # they cannot drift with the preset or a job's own x264_params; chroma_qp_index_offset still
+    # follows the preset (psy-rd needs subme >= 6), which is why the preset is part of the spec too
+    "x264_params": "ref=2:bframes=3:b-pyramid=normal:weightp=1:weightb=1:cabac=1:8x8dct=1",
+    "audio": False,       # True or {"sample_rate", "channels", "bitrate"} adds a silent AAC track
+}
+CONFORM_AUDIO = {"sample_rate": 48000, "channels": 2, "bitrate": "128k"}
+FRAGMENTED_MOVFLAGS = "+frag_keyframe+empty_moov+default_base_moof"
+PROGRESSIVE_MODES = ("fmp4", "hls")
+PROGRESSIVE_FRAGMENT_S = 1
+REGISTRY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "registry.json")
+_registry = None
+
+
+def load_registry():
+    global _registry
+    if _registry is None:
+        with open(REGISTRY_PATH, encoding="utf-8") as f:
+            _registry = json.load(f)
+    return _registry
+
+
+def get_profile(params):
+    registry = load_registry()
+    name = params.get("profile") or registry.get("default_profile", "final")
+    profiles = registry.get("profiles", {})
+    if name not in profiles:
+        raise ValueError(f"Unknown render profile: {name} (known: {', '.join(profiles)})")
+    profile = {"name": name, **profiles[name]}
+    if params.get("fps"):
+        fps = float(params["fps"])
+        if not 1 <= fps <= 120:
+            raise ValueError(f"fps out of range (1-120): {params['fps']}")
+        profile["fps"] = int(fps) if fps.is_integer() else fps
+    if params.get("conform"):
+        spec = conform_spec(params["conform"], params, profile["fps"])
+        profile.update(fps=spec["fps"], scale=1.0, codec="libx264", container="mp4", pix_fmt=spec["pix_fmt"],
+                       preset=spec["preset"], crf=spec["crf"], conform=spec)
+    if params.get("progressive"):
+        mode = params["progressive"]
+        if mode not in PROGRESSIVE_MODES:
+            raise ValueError(f"Unknown progressive mode: {mode} (known: {', '.join(PROGRESSIVE_MODES)})")
+        if profile.get("container", "mp4") != "mp4":
+            raise ValueError(f"progressive output needs an mp4 profile, {name} writes {profile['container']}")
+        profile["progressive"] = mode
+        spec = profile.get("conform")
+        own_gop = isinstance(params.get("conform"), dict) and params["conform"].get("gop")
+        if mode == "hls" and spec and not own_gop:
+            profile["conform"] = dict(spec, gop=min(spec["gop"], max(1, round(spec["fps"] * PROGRESSIVE_FRAGMENT_S))))
+    return profile
+
+
+def conform_spec(spec, params=None, fps=None):
+    """Complete a conform spec: unset fields fall back to the job's size and frame rate, then the defaults."""
+    params = params or {}
+    if not isinstance(spec, dict):
+        spec = {}
+    out = dict(CONFORM_DEFAULTS)
+    if params.get("width") and params.get("height"):
+        out.update(width=params["width"], height=params["height"])
+    if fps:
+        out["fps"] = fps
+    out.update({k: v for k, v in spec.items() if v is not None})
+    unknown = set(out) - set(CONFORM_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown conform field(s): {', '.join(sorted(unknown))}")
+    fps = float(out["fps"])
+    if not 1 <= fps <= 120:
+        raise ValueError(f"conform fps out of range (1-120): {out['fps']}")
+    out["fps"] = int(fps) if fps.is_integer() else fps
+    out["width"], out["height"] = int(out["width"]), int(out["height"])
+    if out["width"] % 2 or out["height"] % 2:
+        raise ValueError(f"conform size must be even for {out['pix_fmt']}: {out['width']}x{out['height']}")
+    out["gop"] = int(out["gop"] or round(out["fps"] * 2))
+    if out["audio"]:
+        out["audio"] = dict(CONFORM_AUDIO, **(out["audio"] if isinstance(out["audio"], dict) else {}))
+    return out
+
+
+def conform_args(spec, duration=None, audio_label="silence"):
+    """Output options that pin everything concat -c copy needs to match between segments.
+
+    The spec's x264_params are not here: encoder_args merges them with the
+    job's own, as ffmpeg keeps only one -x264-params.
+
+    The silent track is cut to `duration` seconds when given; -shortest alone
+    lets it run past the video by ffmpeg's interleaving buffer.
+    """
+    gop = str(spec["gop"])
+    args = ["-profile:v", spec["profile"], "-level:v", str(spec["level"]),
+            "-g", gop, "-keyint_min", gop, "-sc_threshold", "0", "-flags", "+cgop",
+            "-r", str(spec["fps"]), "-fps_mode", "cfr", "-video_track_timescale", str(spec["timescale"])]
+    if spec.get("audio"):
+        args += silence_args(spec["audio"], duration, audio_label)
+    return args
+
+
+def silence_args(audio, duration=None, audio_label="silence"):
+    """Silent AAC track of a conform spec ({"sample_rate", "channels", "bitrate"}), cut to duration."""
+    layout = {1: "mono", 2: "stereo"}.get(int(audio["channels"]), f"{int(audio['channels'])}c")
+    silence = f"anullsrc=r={audio['sample_rate']}:cl={layout}"
+    if duration:
+        silence += f",atrim=end_sample={round(duration * audio['sample_rate'])}"
+    return ["-filter_complex", f"{silence}[{audio_label}]", "-map", f"[{audio_label}]",
+            "-c:a", "aac", "-b:a", str(audio["bitrate"]), "-ar", str(audio["sample_rate"]), "-shortest"]
+
+
+def output_path_for(profile, output_path):
+    """Swap the extension when the profile's container differs (e.g. .mkv for lossless intermediates)."""
+    container = profile.get("container", "mp4")
+    root, ext = os.path.splitext(output_path)
+    if profile.get("progressive") == "hls":
+        return f"{root}.m3u8"
+    return output_path if ext.lstrip(".").lower() == container else f"{root}.{container}"
+
+
+def overlay_format(profile):
+    return "yuv444" if profile.get("pix_fmt", "yuv420p").startswith("yuv444") else "yuv420"
+
+
+def encoder_args(profile, output_path, duration=None, audio_label="silence"):
+    codec = profile.get("codec", "libx264")
+    if codec == "libx264":
+        args = ["-c:v", "libx264", "-preset", profile.get("preset", "fast"),
+                "-crf", str(profile.get("crf", 18))]
+    elif codec == "ffv1":
+        args = ["-c:v", "ffv1", "-level", "3", "-slices", "4"]
+    elif codec == "utvideo":
+        args = ["-c:v", "utvideo"]
+    else:
+        raise ValueError(f"Unsupported codec in profile {profile['name']}: {codec}")
+    # Optional per-job overrides (memory budget, CPU governor); not set in registry profiles
+    if profile.get("threads"):
+        args += ["-threads", str(profile["threads"])]
+    if codec == "libx264" and profile.get("rc_lookahead") is not None:
+        args += ["-rc-lookahead", str(profile["rc_lookahead"])]
+    # ffmpeg keeps only the last -x264-params, so the conform pins are merged in, after (over) the job's
+    x264_params = [profile.get("x264_params"), (profile.get("conform") or {}).get("x264_params")]
+    if codec == "libx264" and any(x264_params):
+        args += ["-x264-params", ":".join(p for p in x264_params if p)]
+    args += ["-pix_fmt", profile.get("pix_fmt", "yuv420p")]
+    if profile.get("conform"):
+        args += conform_args(profile["conform"], duration, audio_label)
+    # Encoder sessions (shared.session) and chunked renders (shared.incremental): keyframes at
+    # segment starts, optionally one fMP4 file per segment
+    keyframes = [f"eq(n,{n})" for n in profile.get("keyframes") or ()]
+    # Progressive output fragments at keyframes; conform already fixes the GOP, otherwise one a second
+    progressive = profile.get("progressive")
+    if progressive and not profile.get("conform"):
+        keyframes.append(f"gte(t,n_forced*{PROGRESSIVE_FRAGMENT_S})")
+    if keyframes:
+        args += ["-force_key_frames", "expr:" + "+".join(keyframes)]
+    if profile.get("segment_frames") is not None:
+        args += ["-f", "segment", "-segment_format", "mp4",
+                 "-segment_format_options", f"movflags={FRAGMENTED_MOVFLAGS}", "-reset_timestamps", "1"]
+        if profile["segment_frames"]:
+            args += ["-segment_frames", ",".join(map(str, profile["segment_frames"]))]
+        if profile.get("segment_start"):
+            args += ["-segment_start_number", str(profile["segment_start"])]
+        return args
+    if progressive == "fmp4":
+        return args + ["-movflags", FRAGMENTED_MOVFLAGS, "-frag_duration", str(PROGRESSIVE_FRAGMENT_S * 1000000)]
+    if progressive == "hls":
+        root = os.path.splitext(output_path)[0]
+        return args + ["-f", "hls", "-hls_time", str(PROGRESSIVE_FRAGMENT_S), "-hls_playlist_type", "event",
+                       "-hls_segment_type", "fmp4", "-hls_flags", "independent_segments",
+                       "-hls_fmp4_init_filename", f"{os.path.basename(root)}-init.mp4",
+                       "-hls_segment_filename", f"{root}-%03d.m4s"]
+    if output_path.lower().endswith((".mp4", ".mov")):
+        args += ["-movflags", "+faststart"]
+    return args
+
+
+
+def split_outputs(label, profile, output_path, rescales=(), duration=None, per_output=()):
+    """Filtergraph tail and output options: stream [label] to output_path, plus pure rescales of it.
+
+    rescales: (width, height, profile, path) per extra output; the stream is
+    split once and scaled per output, so those files cost an encode each but
+    no extra drawing. per_output: options repeated for every output (e.g.
+    -frames:v). Returns (graph tail to append to the filtergraph, output args).
+    """
+    if not rescales:
+        return "", ["-map", f"[{label}]", *per_output, *encoder_args(profile, output_path, duration), output_path]
+    branches = "".join(f"[{label}{i}]" for i in range(len(rescales) + 1))
+    graph = [f"[{label}]split={len(rescales) + 1}{branches}"]
+    args = ["-map", f"[{label}0]", *per_output, *encoder_args(profile, output_path, duration), output_path]
+    for i, (width, height, rescale_profile, path) in enumerate(rescales, 1):
+        graph.append(f"[{label}{i}]scale={width}:{height}:flags=lanczos[{label}{i}s]")
+        args += ["-map", f"[{label}{i}s]", *per_output,
+                 *encoder_args(rescale_profile, path, duration, audio_label=f"silence{i}"), path]
+    return ";" + ";".join(graph), args
+
+
+if __name__ == "__main__":
+    # Completed spec and encoder options for encoders outside this package (final assembly):
+    #   python3 -m shared.profiles --conform-args '{"width": 1080, "height": 1920, "fps": 30}'
+    import sys
+    if sys.argv[1:2] != ["--conform-args"]:
+        sys.exit("usage: python3 -m shared.profiles --conform-args '<spec json>'")
+    spec = conform_spec(json.loads(sys.argv[2]) if len(sys.argv) > 2 else {})
+    profile = {"name": "conform", "codec": "libx264", "preset": spec["preset"], "crf": spec["crf"],
+               "pix_fmt": spec["pix_fmt"], "conform": spec}
+    print(json.dumps({"spec": spec, "args": encoder_args(profile, "out.mp4")}))
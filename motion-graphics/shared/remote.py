@@ -0,0 +1,244 @@
+"""Motion Graphics — Remote Assets
+
+Lets a source image (thumbnail_path, portrait_path, logo_path) be an http(s)
+URL, e.g. straight from asset search or the media library. fetch(url)
+returns a local copy from an on-disk cache (under MG_CACHE_DIR/http), so
+everything downstream (shared.assets, the asset store, incremental renders)
+keeps working on files.
+
+Every process revalidates a URL once, with a conditional request
+(If-None-Match / If-Modified-Since): a 304 reuses the cached copy, a 200
+replaces it. Copies are keyed by the URL and the response's ETag. When the
+server can't be reached, a cached copy is used as it is. The cache is
+bounded by $MG_HTTP_CACHE_MB; the least recently used copies go first.
+
+Requests go through one pool of keep-alive connections per host, shared by
+threads, so the batch's prefetch (shared.prefetch) downloads a job's URLs
+concurrently without a new connection (and TLS handshake) per asset.
+"""
+import os, json, time, fcntl, hashlib, threading, http.client, ssl
+from urllib.parse import urlsplit, urljoin
+from shared import metrics
+from shared.grid_background import CACHE_DIR
+
+HTTP_DIR = os.path.join(CACHE_DIR, "http")
+DEFAULT_CACHE_MB = 512
+POOL_SIZE = 8          # idle connections kept per host
+TIMEOUT = 30
+MAX_REDIRECTS = 5
+REDIRECTS = (301, 302, 303, 307, 308)
+
+
+def is_url(path):
+    return isinstance(path, str) and path.lower().startswith(("http://", "https://"))
+
+
+def cache_budget_mb():
+    """Size bound of the download cache from $MG_HTTP_CACHE_MB."""
+    return float(os.environ.get("MG_HTTP_CACHE_MB") or DEFAULT_CACHE_MB)
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections per (scheme, host), shared between threads."""
+
+    def __init__(self, size=POOL_SIZE, timeout=TIMEOUT):
+        self.size, self.timeout = size, timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, scheme, netloc):
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout, context=ssl.create_default_context())
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    def _checkout(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            return idle.pop() if idle else None
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def get(self, url, headers=None):
+        """GET url (one hop, no redirects); returns (status, headers, body)."""
+        parts = urlsplit(url)
+        key = (parts.scheme.lower(), parts.netloc)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        conn = self._checkout(key)
+        reused = conn is not None
+        while True:
+            if conn is None:
+                conn = self._connect(*key)
+            try:
+                conn.request("GET", target, headers=dict(headers or {}, **{"Accept-Encoding": "identity"}))
+                resp = conn.getresponse()
+                body = resp.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                conn = None
+                if not reused:
+                    raise
+                reused = False  # the server closed an idle connection; retry once on a fresh one
+                continue
+            except Exception:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            metrics.count("http_requests")
+            return resp.status, resp.headers, body
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle = {}
+
+
+_pool = ConnectionPool()
+_fresh = {}    # url -> local copy, revalidated by this process
+_locks = {}    # url -> lock, so threads fetching one URL make one request
+_locks_guard = threading.Lock()
+
+
+def _key(url):
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _meta_path(url):
+    return os.path.join(HTTP_DIR, _key(url) + ".json")
+
+
+def _load_meta(url):
+    try:
+        with open(_meta_path(url), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if os.path.exists(os.path.join(HTTP_DIR, meta["file"])) else None
+
+
+def _write_meta(url, meta):
+    tmp = f"{_meta_path(url)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, _meta_path(url))
+
+
+def _store(url, headers, body):
+    """Write a 200 response's body to the cache; returns its meta entry."""
+    etag = headers.get("ETag")
+    ext = os.path.splitext(urlsplit(url).path)[1][:8]
+    name = f"{_key(url)}-{hashlib.sha1((etag or '').encode('utf-8')).hexdigest()[:12]}{ext}"
+    tmp = os.path.join(HTTP_DIR, f"{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, os.path.join(HTTP_DIR, name))
+    return {"url": url, "file": name, "etag": etag, "last_modified": headers.get("Last-Modified"),
+            "bytes": len(body), "used": time.time()}
+
+
+def _evict(keep):
+    """Remove the least recently used copies until the cache fits its bound."""
+    with open(os.path.join(HTTP_DIR, "lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        entries = []
+        for name in os.listdir(HTTP_DIR):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(HTTP_DIR, name), encoding="utf-8") as f:
+                        entries.append((name, json.load(f)))
+                except (OSError, ValueError):
+                    continue
+        total = sum(meta["bytes"] for _, meta in entries)
+        bound = cache_budget_mb() * 1024 * 1024
+        live = {meta["file"] for _, meta in entries}
+        for name in os.listdir(HTTP_DIR):  # copies replaced by a newer ETag (not one still being recorded)
+            path = os.path.join(HTTP_DIR, name)
+            if not name.endswith((".json", ".tmp")) and name != "lock" and name not in live:
+                try:
+                    if time.time() - os.path.getmtime(path) > 60:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
+        for name, meta in sorted(entries, key=lambda e: e[1]["used"]):
+            if total <= bound:
+                break
+            if meta["url"] == keep:
+                continue
+            for path in (os.path.join(HTTP_DIR, meta["file"]), os.path.join(HTTP_DIR, name)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= meta["bytes"]
+            metrics.count("http_cache_evictions")
+
+
+def _revalidate(url, meta):
+    headers = {}
+    if meta and meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta and meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    target = url
+    for _ in range(MAX_REDIRECTS + 1):
+        status, resp_headers, body = _pool.get(target, headers)
+        if status in REDIRECTS and resp_headers.get("Location"):
+            target = urljoin(target, resp_headers["Location"])
+            continue
+        break
+    if status == 304 and meta:
+        metrics.count("http_cache_hits")
+        return dict(meta, used=time.time())
+    if status != 200:
+        raise OSError(f"GET {url}: HTTP {status}")
+    metrics.count("http_downloads")
+    metrics.count("http_bytes", len(body))
+    return _store(url, resp_headers, body)
+
+
+def fetch(url):
+    """Local copy of url, revalidated once per process; a cached copy is used when the server can't be reached."""
+    with _locks_guard:
+        lock = _locks.setdefault(url, threading.Lock())
+    with lock:
+        if url in _fresh and os.path.exists(_fresh[url]):
+            return _fresh[url]
+        os.makedirs(HTTP_DIR, exist_ok=True)
+        meta = _load_meta(url)
+        try:
+            new = _revalidate(url, meta)
+        except (OSError, http.client.HTTPException):
+            if not meta:
+                raise
+            metrics.count("http_cache_stale")
+            new = dict(meta, used=time.time())
+        _write_meta(url, new)
+        if new["file"] != (meta or {}).get("file"):
+            _evict(url)
+        _fresh[url] = os.path.join(HTTP_DIR, new["file"])
+        return _fresh[url]
+
+
+def cached_path(url):
+    """The cached copy of url without any request (None when there is none)."""
+    if url in _fresh:
+        return _fresh[url]
+    meta = _load_meta(url)
+    return os.path.join(HTTP_DIR, meta["file"]) if meta else None
+
+
+def local_path(path):
+    """path itself, or the local copy of it when it is a URL."""
+    return fetch(path) if is_url(path) else path
@@ -1,41 +1,283 @@
-"""Motion Graphics — Render Utility v3 (file-based, avoids pipe issues)"""
-import subprocess, os, tempfile
+"""Motion Graphics — Render Utility v4 (staged draw → flatten → write, streamed to ffmpeg stdin)"""
+import subprocess, os, tempfile, threading, queue, time
 from PIL import Image
+from shared.profiles import get_profile, output_path_for, overlay_format, split_outputs
+from shared import metrics
 
-def render_frames_to_video(frames, output_path, fps=30, duration=None):
-    if not frames: raise ValueError("No frames")
-    width, height = frames[0].size
-    if duration:
-        needed = int(duration * fps)
-        if len(frames) < needed:
-            frames = frames + [frames[-1]] * (needed - len(frames))
-        elif len(frames) > needed:
-            frames = frames[:needed]
-    os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else ".", exist_ok=True)
-    
-    # Write raw frames to temp file
-    tmp = tempfile.NamedTemporaryFile(suffix='.raw', delete=False)
+def still_loop_filter(fps):
+    """Filter that loops a single decoded still in memory, retimed to exact 1/fps ticks."""
+    return f"loop=loop=-1:size=1:start=0,settb=1/{fps},setpts=N"
+
+_DONE = object()
+
+
+class _StageError:
+    def __init__(self, exc):
+        self.exc = exc
+
+
+def _put(q, item, stop):
+    # Bounded put that gives up once the pipeline is stopping (back-pressure without deadlock)
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return _DONE
+
+
+def take_free(free, stop):
+    """Next free buffer of a pool, waiting while the encoder is behind; raises once its pipeline stopped."""
+    while True:
+        try:
+            return free.get(timeout=0.1)
+        except queue.Empty:
+            if stop is not None and stop.is_set():
+                raise RuntimeError("Encoder pipeline stopped")
+
+
+def _drain(q, pool):
+    """Return the pooled frames still queued between stages to the pool."""
+    while True:
+        try:
+            item = q.get_nowait()
+        except queue.Empty:
+            return
+        frame = item[2] if isinstance(item, tuple) else item
+        if pool is not None and isinstance(frame, Image.Image) and pool.owns(frame):
+            pool.release(frame)
+
+
+def _draw_stage(frames, outbox, timings, stop):
+    busy = 0.0
+    try:
+        it = iter(frames)
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                frame = next(it)  # the preset's drawing code runs here
+            except StopIteration:
+                break
+            busy += time.perf_counter() - t0
+            if not _put(outbox, frame, stop): return
+        _put(outbox, _DONE, stop)
+    except BaseException as e:
+        _put(outbox, _StageError(e), stop)
+    finally:
+        timings["draw"] = busy
+
+
+def _convert_stage(inbox, outbox, pool, timings, stop):
+    busy = 0.0
     try:
-        for frame in frames:
-            rgb = Image.new("RGB", frame.size, (0, 0, 0))
-            if frame.mode == "RGBA":
-                rgb.paste(frame, mask=frame.split()[3])
+        while True:
+            frame = _get(inbox, stop)
+            if frame is _DONE or isinstance(frame, _StageError):
+                _put(outbox, frame, stop)
+                return
+            t0 = time.perf_counter()
+            pooled = pool is not None and pool.owns(frame)
+            if pooled:
+                data = pool.view(frame)  # zero-copy: ffmpeg reads the pooled buffer itself
             else:
-                rgb = frame.convert("RGB")
-            tmp.write(rgb.tobytes())
-        tmp.close()
-        
-        cmd = ["ffmpeg", "-y", "-f", "rawvideo", "-vcodec", "rawvideo",
-               "-s", f"{width}x{height}", "-pix_fmt", "rgb24", "-r", str(fps),
-               "-i", tmp.name, "-c:v", "libx264", "-pix_fmt", "yuv420p",
-               "-preset", "fast", "-crf", "18", "-movflags", "+faststart", output_path]
-        result = subprocess.run(cmd, capture_output=True)
-        if result.returncode != 0:
-            raise RuntimeError(f"FFmpeg failed: {result.stderr.decode()[:500]}")
+                data = (frame if frame.mode == "RGBA" else frame.convert("RGBA")).tobytes()
+            busy += time.perf_counter() - t0
+            if not _put(outbox, (frame.size, data, frame if pooled else None), stop): return
+    except BaseException as e:
+        _put(outbox, _StageError(e), stop)
     finally:
-        os.unlink(tmp.name)
+        timings["convert"] = busy
+
+
+class FramePool:
+    """Preallocated RGBA frame buffers, reused across frames.
+
+    acquire() resets a free buffer to the background and returns a PIL image
+    that draws straight into it; render_frames_to_video hands the same buffer
+    to ffmpeg as a memoryview and releases it after writing. An empty pool
+    blocks acquire(), which throttles drawing to the encoder's pace; once the
+    render's pipeline stops (`stop`, set by render_frames_to_video) it raises
+    instead of waiting for buffers that will never come back.
+    """
+
+    def __init__(self, width, height, size=10):
+        self.size = (width, height)
+        self.target = size
+        self.stop = None
+        self._free = queue.Queue()
+        self._buffers = {}
+        for _ in range(size):
+            buf = bytearray(width * height * 4)
+            im = Image.frombuffer("RGBA", self.size, buf, "raw", "RGBA", 0, 1)
+            im.readonly = 0  # write through to buf instead of copy-on-write
+            self._buffers[id(im)] = buf
+            self._free.put(im)
+
+    def acquire(self, background):
+        frame = take_free(self._free, self.stop)
+        frame.paste(background, (0, 0))
+        return frame
+
+    def owns(self, frame):
+        return id(frame) in self._buffers
+
+    def view(self, frame):
+        return memoryview(self._buffers[id(frame)])
+
+    def release(self, frame):
+        if len(self._buffers) > self.target:
+            del self._buffers[id(frame)]  # retired (see shrink)
+            return
+        self._free.put(frame)
+
+    def shrink(self, size):
+        """Retire buffers as they come back until only `size` remain."""
+        self.target = max(2, size)
+
+
+def render_frames_to_video(frames, output_path, fps=30, duration=None, background=None,
+                           queue_depth=4, timings=None, pool=None, profile=None, budget=None, rescales=()):
+    """Encode RGBA frames (a list or a generator) with the render profile's encoder.
+
+    Drawing (pulling from the generator), buffer conversion and writing to
+    ffmpeg's stdin run as separate threads joined by bounded queues, so Pillow
+    work that releases the GIL overlaps with encoding. Per-stage busy time is
+    stored in `timings` when a dict is passed; stage times, frame and byte
+    counts and progress also go to the current render's metrics (see
+    shared.metrics), nothing is printed.
+
+    Frames from `pool` (a FramePool) are written without copying and released
+    back to it. ffmpeg composites the RGBA frames over black, or over the
+    background plate (see grid_background.get_background_plate) when frames
+    carry only the foreground.
+
+    `profile` (see shared.profiles) picks codec, pixel format and container;
+    the default profile applies when omitted. Returns the written path, whose
+    extension follows the profile's container.
+
+    With a `budget` (shared.budget.MemoryBudget) the RSS of python + ffmpeg
+    is sampled while writing and the budget sheds memory when it is exceeded.
+
+    `rescales` adds outputs that are scaled copies of this one, encoded by
+    the same ffmpeg process (see shared.profiles.split_outputs).
+    """
+    profile = profile or get_profile({})
+    output_path = output_path_for(profile, output_path)
+    timings = {} if timings is None else timings
+    needed = round(duration * fps) if duration else None
+    os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else ".", exist_ok=True)
+
+    stop = threading.Event()
+    if pool is not None:
+        pool.stop = stop
+    drawn = queue.Queue(maxsize=queue_depth)
+    flat = queue.Queue(maxsize=queue_depth)
+    stages = [
+        threading.Thread(target=_draw_stage, args=(frames, drawn, timings, stop), daemon=True),
+        threading.Thread(target=_convert_stage, args=(drawn, flat, pool, timings, stop), daemon=True),
+    ]
+    wall0 = time.perf_counter()
+    for t in stages: t.start()
+
+    # ffmpeg's stderr goes to a file, so a chatty encoder can never stall the stdin pipe
+    errlog = tempfile.TemporaryFile()
+    proc = None
+    write_busy = 0.0
+    written = drawn_count = bytes_written = 0
+    last = held = None
+    try:
+        while needed is None or written < needed:
+            item = flat.get()
+            if item is _DONE: break
+            if isinstance(item, _StageError): raise item.exc
+            size, last, frame = item
+            if proc is None:
+                proc = subprocess.Popen(_encode_cmd(size, fps, background, output_path, profile,
+                                                    needed / fps if needed else None, rescales),
+                                        stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=errlog)
+            t0 = time.perf_counter()
+            proc.stdin.write(last)
+            write_busy += time.perf_counter() - t0
+            written += 1
+            drawn_count += 1
+            bytes_written += len(last)
+            metrics.progress(written, needed)
+            if budget is not None: budget.check(proc.pid)
+            # Keep the newest pooled frame until the next one is written (it may pad the tail)
+            if held is not None: pool.release(held)
+            held = frame
+        if proc is None: raise ValueError("No frames")
+        t0 = time.perf_counter()
+        while needed is not None and written < needed:
+            proc.stdin.write(last)  # hold the last frame up to the requested duration
+            written += 1
+            bytes_written += len(last)
+        t1 = time.perf_counter()
+        proc.stdin.close()
+        proc.wait()
+        write_busy += time.perf_counter() - t0
+        metrics.add_time("encoder_flush", time.perf_counter() - t1)  # ffmpeg finishing after the last frame
+    except BrokenPipeError:
+        proc.wait()  # ffmpeg exited before reading every frame; its error is raised below
+    finally:
+        stop.set()
+        if held is not None: pool.release(held)
+        for t in stages: t.join()
+        for q in (drawn, flat):
+            _drain(q, pool)
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+            proc.wait()
+    timings["write"] = write_busy
+    timings["wall"] = time.perf_counter() - wall0
+    for stage in ("draw", "convert", "write"):
+        metrics.add_time(f"stage_{stage}", timings.get(stage, 0.0))
+    metrics.count("frames_drawn", drawn_count)
+    metrics.count("frames_padded", written - drawn_count)  # last frame repeated up to the duration, not redrawn
+    metrics.count("bytes_to_encoder", bytes_written)
+    if proc.returncode != 0 or (needed is not None and written < needed):
+        errlog.seek(0)
+        raise RuntimeError(f"FFmpeg failed (exit {proc.returncode}, {written} frames written): "
+                           f"{errlog.read().decode(errors='replace')[-500:]}")
+    errlog.close()
     return output_path
 
+
+def _encode_cmd(size, fps, background, output_path, profile, duration=None, rescales=()):
+    width, height = size
+    ovf = overlay_format(profile)
+    if background:
+        # Plate is a single decoded frame, looped in memory and retimed to the foreground. The
+        # foreground's soft edges are blended in RGB, as Image.alpha_composite does; blending in
+        # yuv420 would subsample their chroma first. The plate is gbrp already.
+        base = ["-i", background]
+        base_chain = f"[0:v]format=gbrp,{still_loop_filter(fps)}[bg]"
+        blend = "rgb"
+    else:
+        # Same result as flattening onto black in Python, without touching the pixels there
+        base = ["-f", "lavfi", "-i", f"color=c=black:s={width}x{height}:r={fps}"]
+        base_chain = f"[0:v]format={ovf}p[bg]"
+        blend = ovf
+    raw_input = ["-f", "rawvideo", "-vcodec", "rawvideo", "-s", f"{width}x{height}",
+                 "-pix_fmt", "rgba", "-r", str(fps), "-i", "-"]
+    tail, outputs = split_outputs("v", profile, output_path, rescales, duration)
+    if profile.get("chapters"):
+        # ffmetadata file with the chapter list (shared.session), as input 2
+        raw_input += ["-f", "ffmetadata", "-i", profile["chapters"]]
+        outputs = ["-map_chapters", "2", *outputs]
+    return ["ffmpeg", "-y", *base, *raw_input, "-filter_complex",
+            f"{base_chain};[bg][1:v]overlay=shortest=1:format={blend}[v]{tail}", *outputs]
+
 def ease_out_cubic(t):
     return 1 - (1 - t) ** 3
 
@@ -0,0 +1,221 @@
+"""Motion Graphics — Scene
+
+A preset's build_scene(params) does all per-job setup (fonts, layout, pre-
+measured text, thumbnails) and returns a Scene whose draw(frame, tsec) paints
+one frame at an absolute time. Frames don't depend on each other, so the same
+code renders the full video, a single still or a contact sheet (see
+shared.preview).
+
+A preset's render(params, output_path) goes through render_preset, which
+times setup and encode, emits the job's metrics (see shared.metrics),
+writes the sidecar with timing and the preset's events (see shared.sidecar)
+and, when asked, profiles the render (see shared.profiler). With
+params["incremental"] the video is kept as chunks and a re-render only
+redraws what a param change touches (see shared.incremental). On the command
+line a preset takes inline JSON or a data file (job_from_argv). When the CPU
+governor gives a job more than one drawing core, frames are drawn by forked
+workers into shared memory (see shared.framering).
+"""
+import os, copy, json, time
+from shared import metrics
+from shared.profiler import maybe_profile
+from shared.budget import plan_budget, budget_scope, DEFAULT_POOL, DEFAULT_QUEUE
+from shared.governor import governed, apply as apply_threads
+from shared.render import render_frames_to_video, FramePool
+from shared.framering import FrameRing
+from shared.grid_background import get_background_plate
+from shared.filtergraph import render_filtergraph
+from shared.sidecar import write_sidecar
+from shared.assets import asset_scope
+from shared.variants import plan_outputs
+from shared.incremental import render_incremental
+
+
+class Scene:
+    def __init__(self, width, height, fps, duration, background, plate, draw, profile,
+                 theme=None, sprites=None, overlay=False, events=None, regions=None):
+        self.width, self.height = width, height
+        self.fps = fps
+        self.duration = duration
+        self.background = background  # RGBA image every frame starts from
+        self.plate = plate            # encoded grid clip when drawing foreground only
+        self.draw = draw              # draw(frame, tsec)
+        self.profile = profile
+        self.theme = theme
+        self.sprites = sprites        # optional: () -> sprite list for the filtergraph backend
+        self.overlay = overlay        # transparent output, no grid
+        self.events = events or []    # timed animation events for the sidecar (shared.sidecar.event)
+        self.regions = regions or []  # (param path, t0, t1): the only time a param change shows (shared.incremental)
+
+    @property
+    def total_frames(self):
+        return round(self.duration * self.fps)
+
+    def frame_at(self, tsec, frame=None):
+        """Draw the frame at tsec onto `frame` (reset to the background) or onto a fresh copy."""
+        if frame is None:
+            frame = self.background.copy()
+        self.draw(frame, tsec)
+        return frame
+
+
+def render_scene(scene, output_path, params, budget=None, rescales=(), draw_workers=1):
+    """Encode a scene with the backend requested in params; returns the written path.
+
+    A MemoryBudget (shared.budget) sizes the frame pool and queues of the
+    python backend and watches RSS while encoding. `rescales` are extra
+    outputs scaled from this one (shared.variants); more than one of
+    `draw_workers` draws the python backend's frames in that many processes.
+    """
+    W, H = scene.width, scene.height
+    if params.get("backend") == "filtergraph" and scene.sprites:
+        background = None if scene.overlay else get_background_plate(W, H, scene.theme)
+        with metrics.span("sprites"):
+            sprites = scene.sprites()
+        return render_filtergraph(sprites, output_path, W, H, scene.fps, scene.duration,
+                                  background=background, profile=scene.profile, rescales=rescales)
+
+    plan = budget.plan if budget else {"pool_frames": DEFAULT_POOL, "queue_depth": DEFAULT_QUEUE}
+    if draw_workers > 1:
+        # One slot per worker on top of the pool, so every worker has a frame to draw
+        with FrameRing(W, H, size=plan["pool_frames"] + draw_workers) as ring:
+            if budget:
+                budget.pool = ring
+            return render_frames_to_video(ring.draw(scene, draw_workers), output_path, fps=scene.fps,
+                                          duration=scene.duration, background=scene.plate,
+                                          queue_depth=plan["queue_depth"], pool=ring, profile=scene.profile,
+                                          budget=budget, rescales=rescales)
+
+    pool = FramePool(W, H, size=plan["pool_frames"])
+    if budget:
+        budget.pool = pool
+
+    def draw_frames():
+        acquire = draw = 0.0
+        try:
+            for fi in range(scene.total_frames):
+                t0 = time.perf_counter()
+                frame = pool.acquire(scene.background)  # waits while the encoder is behind
+                t1 = time.perf_counter()
+                scene.draw(frame, fi / scene.fps)
+                acquire += t1 - t0
+                draw += time.perf_counter() - t1
+                yield frame
+        finally:
+            metrics.add_time("acquire", acquire)
+            metrics.add_time("draw", draw)
+
+    return render_frames_to_video(draw_frames(), output_path, fps=scene.fps, duration=scene.duration,
+                                  background=scene.plate,
+                                  queue_depth=plan["queue_depth"], pool=pool, profile=scene.profile,
+                                  budget=budget, rescales=rescales)
+
+
+def _encoder_profile(profile, cpu, budget):
+    """Profile with the CPU governor's threading and the memory budget's encoder settings."""
+    profile = apply_threads(profile, cpu)
+    if budget and budget.plan["encoder"]:
+        profile = dict(profile, **budget.plan["encoder"])
+    return profile
+
+
+def _render_outputs(build_scene, params, output_path, cpu, budget):
+    """Every output of params["outputs"] (shared.variants).
+
+    Returns (scene, params, path) per output in the requested order, and the scenes that were drawn.
+    """
+    outputs = plan_outputs(params, output_path)
+    written, drawn = [None] * len(outputs), []
+    with asset_scope():
+        for i, lead in enumerate(outputs):
+            if lead["rescale_of"] is not None:
+                continue
+            copies = [j for j, o in enumerate(outputs) if o["rescale_of"] == i]
+            with metrics.span("setup"):
+                scene = build_scene(lead["params"])
+            scene.profile = _encoder_profile(scene.profile, cpu, budget)
+            drawn.append(scene)
+            rescales = [(outputs[j]["width"], outputs[j]["height"],
+                         _encoder_profile(outputs[j]["profile"], cpu, budget), outputs[j]["output"]) for j in copies]
+            with metrics.span("encode"):
+                written[i] = (scene, lead["params"], render_scene(scene, lead["output"], lead["params"],
+                                                                  budget, rescales, cpu["draw_workers"]))
+            for j, (width, height, profile, path) in zip(copies, rescales):
+                view = copy.copy(scene)
+                view.width, view.height, view.profile = width, height, profile
+                written[j] = (view, outputs[j]["params"], path)
+    metrics.count("outputs_drawn", len(drawn))
+    metrics.count("outputs_rescaled", len(outputs) - len(drawn))
+    return written, drawn
+
+
+def job_from_argv(argv):
+    """(params, output_path) of a preset's command line.
+
+    `script.py '<json>' out.mp4`, or `script.py data.json [out.mp4]` with a
+    JSON data file as the pipeline writes it; without an output argument the
+    data's "output_path" is used.
+    """
+    arg = argv[1]
+    if arg.lstrip().startswith("{"):
+        params = json.loads(arg)
+    else:
+        with open(arg, encoding="utf-8") as f:
+            params = json.load(f)
+    output_path = argv[2] if len(argv) > 2 else params.get("output_path")
+    if not output_path:
+        raise SystemExit(f"usage: {argv[0]} '<json>'|data.json [output_path]  (no output path given)")
+    return params, output_path
+
+
+def render_preset(preset, build_scene, params, output_path):
+    """Build and encode one preset job under a RenderMetrics record; returns the written path.
+
+    With params["outputs"] every listed output is rendered (shared.variants)
+    and the first one's path is returned.
+    """
+    budget = plan_budget(preset, params)
+    with metrics.render_metrics(preset, params) as m, budget_scope(budget), governed(preset, params) as cpu:
+        m.info["cpu"] = cpu  # usage is filled in when the job deregisters
+        with maybe_profile(preset, params, output_path) as prof:
+            if params.get("outputs"):
+                written, drawn = _render_outputs(build_scene, params, output_path, cpu, budget)
+                scene = written[0][0]
+                m.info.update(width=scene.width, height=scene.height, fps=scene.fps,
+                              frames=sum(s.total_frames for s in drawn),
+                              profile=scene.profile["name"], backend=params.get("backend", "python"))
+            else:
+                # Presets may fill in derived values (e.g. item timing); diff what the caller asked for
+                requested = copy.deepcopy(params) if params.get("incremental") else None
+                with metrics.span("setup"):
+                    scene = build_scene(params)
+                scene.profile = _encoder_profile(scene.profile, cpu, budget)
+                m.info.update(width=scene.width, height=scene.height, fps=scene.fps, frames=scene.total_frames,
+                              profile=scene.profile["name"], backend=params.get("backend", "python"))
+                with metrics.span("encode"):
+                    if requested is not None:
+                        path = render_incremental(preset, scene, requested, output_path, budget)
+                    else:
+                        path = render_scene(scene, output_path, params, budget, draw_workers=cpu["draw_workers"])
+                    written = [(scene, params, path)]
+            output_path = written[0][2]
+            if prof:
+                prof.output_path = output_path
+        if prof:
+            m.info["profile_files"] = prof.files
+        if budget:
+            rss = metrics.peak_rss_mb()
+            m.info["memory"] = budget.report(rss["python"] + rss["children"])
+            for cache in budget.caches:
+                m.count("image_cache_hits", cache.hits)
+                m.count("image_cache_misses", cache.misses)
+        m.info["output"] = output_path
+        for scene, job_params, path in written:
+            sidecar = write_sidecar(preset, scene, job_params, path)
+            if path == output_path and sidecar:
+                m.info["sidecar"] = sidecar
+            m.count("output_bytes", os.path.getsize(path))
+        if params.get("outputs"):
+            m.info["outputs"] = [{"output": path, "width": scene.width, "height": scene.height, "fps": scene.fps}
+                                 for scene, _, path in written]
+    return output_path
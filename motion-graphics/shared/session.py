@@ -0,0 +1,284 @@
+"""Motion Graphics — Encoder Session
+
+Consecutive graphics (the motion-graphic segments of one video, back to
+back) encoded by one ffmpeg process, instead of a process, a moov and a
+concat step per graphic:
+
+    with EncoderSession("out/graphics.mp4", {"width": 1920, "height": 1080, "fps": 30}) as session:
+        session.add("title_card", {"title": "Deel 1", "duration": 3})
+        session.add("map_zoom", {"location": "PARIJS"}, title="Parijs")
+
+mode "chapters" (default) writes one continuous mp4 with a chapter per
+graphic; mode "fmp4" writes one fragmented mp4 per graphic (<name>-000.mp4,
+<name>-001.mp4, ...), cut by the same encoder. Either way every graphic
+starts on a keyframe, so one can be cut back out with a stream copy.
+
+Session params (size, fps, profile, conform, threads) apply to every
+graphic; a graphic's own params set its content and duration.
+
+ffmpeg takes the keyframe positions (and chapters, or the files to cut)
+when it starts, so a session that streams needs its graphics' lengths up
+front: pass plan=[{"preset", "params", "title"}, ...], the graphics add()
+will get, in order. Their frame counts come from params and the registry's
+defaults (shared.cost.features), without building anything. The encoder
+then starts on the first add() and draws each graphic while the next one is
+built, dropping it once drawn, so a session holds at most two graphics
+whatever its length; add() raises when a graphic doesn't match the plan.
+Without a plan, graphics are built on add() and encoded in order when the
+session closes. The sidecar (<name>.meta.json, see shared.sidecar)
+lists the segments with their frame ranges, files and events on the
+session timeline.
+
+    python3 -m shared.session jobs.jsonl out.mp4 [--mode fmp4] [--params '{"width": 1080, "height": 1920}']
+
+jobs.jsonl has one {"preset": <registry id>, "params": {...}, "title": ...} per line.
+The jobs' source images are decoded once, on a prefetch pool while the
+graphics are built (shared.prefetch). Run from the motion-graphics directory.
+"""
+import os, json, queue, tempfile, threading
+from shared import metrics
+from shared.profiles import get_profile
+from shared.layout import get_layout
+from shared.render import render_frames_to_video, FramePool
+from shared.budget import DEFAULT_POOL, DEFAULT_QUEUE
+from shared.governor import governed, apply as apply_threads
+from shared.sidecar import build_sidecar, sidecar_path, ENCODER_KEYS
+from shared.preview import preset_module
+from shared.cost import resolve_preset, features
+from shared.assets import asset_scope
+from shared.prefetch import prefetching, asset_paths
+
+SESSION_KEYS = ("width", "height", "fps", "profile", "conform", "threads")
+MODES = ("chapters", "fmp4")
+
+
+def _ffmeta_escape(text):
+    for ch in ("\\", "=", ";", "#", "\n"):
+        text = text.replace(ch, "\\" + ch)
+    return text
+
+
+class EncoderSession:
+    def __init__(self, output_path, params=None, mode="chapters", plan=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown session mode: {mode} (known: {', '.join(MODES)})")
+        self.output_path = output_path
+        self.params = dict(params or {})
+        self.mode = mode
+        self.profile = get_profile(self.params)
+        L = get_layout(self.params, self.profile)
+        self.width, self.height, self.fps = L.W, L.H, self.profile["fps"]
+        self.segments = []
+        self.frames = 0
+        self.plan = None
+        if plan is not None:
+            self.plan, start = [], 0
+            for job in plan:
+                entry = resolve_preset(job["preset"])
+                frames = features(entry["id"], self._job(job.get("params", {})))["frames"]
+                self.plan.append(self._segment(len(self.plan), entry["id"], job.get("title"), start, frames))
+                start += frames
+        # planned: one scene waits while the encoder draws the previous one
+        self._scenes = queue.Queue(maxsize=1 if self.plan is not None else 0)
+        self._encoder = None
+        self._error = None
+        self._output = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.render()
+        else:
+            self._finish()
+
+    def _job(self, params):
+        job = dict(params, **{k: self.params[k] for k in SESSION_KEYS if k in self.params})
+        job["foreground_only"] = False  # the session streams whole frames, without a grid plate
+        return job
+
+    def _segment(self, index, preset, title, start, frames):
+        return {
+            "index": index,
+            "preset": preset,
+            "title": title or preset,
+            "start_frame": start,
+            "frames": frames,
+            "start": round(start / self.fps, 6),
+            "end": round((start + frames) / self.fps, 6),
+        }
+
+    def add(self, preset, params, title=None):
+        """Build the next graphic and queue it for the encoder; returns its segment entry
+        (frame range on the session timeline).
+
+        With a plan, the encoder starts on the first add() and draws each
+        graphic while the next one is built; add() waits while one is
+        already queued.
+        """
+        entry = resolve_preset(preset)
+        job = self._job(params)
+        scene = preset_module(entry["id"]).build_scene(job)
+        if (scene.width, scene.height, scene.fps) != (self.width, self.height, self.fps):
+            raise ValueError(f"{entry['id']} renders {scene.width}x{scene.height}@{scene.fps}, "
+                             f"session is {self.width}x{self.height}@{self.fps}")
+        start = self.frames
+        segment = self._segment(len(self.segments), entry["id"], title, start, scene.total_frames)
+        if self.plan is not None:
+            index = len(self.segments)
+            planned = self.plan[index] if index < len(self.plan) else None
+            if planned is None or (planned["preset"], planned["frames"]) != (entry["id"], scene.total_frames):
+                expected = f"{planned['preset']} ({planned['frames']} frames)" if planned else "no more graphics"
+                raise ValueError(f"Graphic {index} is {entry['id']} ({scene.total_frames} frames), "
+                                 f"the session's plan has {expected}")
+            segment["title"] = title or planned["title"]
+        own = build_sidecar(entry["id"], scene, job, self.output_path)
+        segment["events"] = [dict(e, t=round(e["t"] + start / self.fps, 4), frame=e["frame"] + start)
+                             for e in own["events"]]
+        self.frames += scene.total_frames
+        self.segments.append(segment)
+        if self.plan is not None and self._encoder is None:
+            self._start(self.plan)
+        self._put(scene)
+        return segment
+
+    def _put(self, item):
+        while True:
+            if self._encoder is not None and not self._encoder.is_alive():
+                raise RuntimeError("Encoder session stopped") from self._error
+            try:
+                self._scenes.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _chapters_file(self, tmp, segments):
+        path = os.path.join(tmp, "chapters.ffmeta")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(";FFMETADATA1\n")
+            for s in segments:
+                f.write(f"[CHAPTER]\nTIMEBASE=1/1000\nSTART={round(s['start'] * 1000)}\n"
+                        f"END={round(s['end'] * 1000)}\ntitle={_ffmeta_escape(s['title'])}\n")
+        return path
+
+    def _frames(self, pool):
+        while True:
+            scene = self._scenes.get()
+            if scene is None:
+                return
+            for fi in range(scene.total_frames):
+                frame = pool.acquire(scene.background)
+                scene.draw(frame, fi / self.fps)
+                yield frame
+            scene = None  # drawn: let its images go
+
+    def _start(self, segments):
+        self._encoder = threading.Thread(target=self._run, args=(segments,), name="session-encoder", daemon=True)
+        self._encoder.start()
+
+    def _run(self, segments):
+        try:
+            self._output = self._encode(segments)
+        except BaseException as e:
+            self._error = e
+
+    def _finish(self):
+        """Stop the encoder without waiting for graphics still to come (the output is incomplete)."""
+        if self._encoder is None:
+            return
+        while True:
+            try:
+                self._scenes.get_nowait()
+            except queue.Empty:
+                break
+        self._scenes.put(None)
+        self._encoder.join()
+
+    def _encode(self, segments):
+        """One ffmpeg for the whole session; keyframes and chapters (fmp4: files) follow `segments`."""
+        frames = sum(s["frames"] for s in segments)
+        boundaries = [s["start_frame"] for s in segments[1:]]
+        root, ext = os.path.splitext(self.output_path)
+        with metrics.render_metrics("session", self.params) as m, governed("session", self.params) as cpu, \
+                tempfile.TemporaryDirectory(prefix="mg-session-") as tmp:
+            profile = dict(apply_threads(self.profile, cpu), keyframes=boundaries)
+            if self.mode == "chapters":
+                profile["chapters"] = self._chapters_file(tmp, segments)
+                output = self.output_path
+            else:
+                profile["segment_frames"] = boundaries
+                output = f"{root}-%03d{ext or '.mp4'}"
+            m.info.update(cpu=cpu, width=self.width, height=self.height, fps=self.fps, frames=frames,
+                          profile=profile["name"], backend="python", mode=self.mode, segments=len(segments))
+            pool = FramePool(self.width, self.height, size=DEFAULT_POOL)
+            with metrics.span("encode"):
+                output = render_frames_to_video(self._frames(pool), output, fps=self.fps,
+                                                duration=frames / self.fps, queue_depth=DEFAULT_QUEUE,
+                                                pool=pool, profile=profile)
+            files = [output] if self.mode == "chapters" else \
+                [output.replace("%03d", f"{i:03d}") for i in range(len(segments))]
+            for s, path in zip(self.segments, files if self.mode == "fmp4" else files * len(segments)):
+                s["file"] = path
+            m.info["output"] = output
+            m.count("output_bytes", sum(os.path.getsize(f) for f in files))
+            self._write_sidecar(profile, output)
+        return output
+
+    def render(self):
+        """Finish the session: returns the output path (fmp4: the file pattern).
+
+        With a plan, waits for the encoder to draw the last graphic; without
+        one, the added graphics are encoded now.
+        """
+        if self._output is not None:
+            return self._output
+        if not self.segments:
+            self._finish()
+            raise ValueError("Encoder session has no graphics")
+        if self.plan is not None and len(self.segments) != len(self.plan):
+            self._finish()
+            raise ValueError(f"Encoder session got {len(self.segments)} of the {len(self.plan)} planned graphics")
+        if self._encoder is None:
+            self._start(self.segments)
+        self._put(None)
+        self._encoder.join()
+        if self._error is not None:
+            raise self._error
+        return self._output
+
+    def _write_sidecar(self, profile, output):
+        encoder = {k: profile[k] for k in ENCODER_KEYS if profile.get(k) is not None}
+        with open(sidecar_path(self.output_path), "w", encoding="utf-8") as f:
+            json.dump({
+                "mode": self.mode,
+                "output": output,
+                "width": self.width,
+                "height": self.height,
+                "fps": self.fps,
+                "frames": self.frames,
+                "duration": round(self.frames / self.fps, 6),
+                "encoder": encoder,
+                "segments": self.segments,
+            }, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Encode consecutive motion graphics in one ffmpeg session")
+    ap.add_argument("jobs", help="JSON lines file: {preset, params, title} per line")
+    ap.add_argument("output")
+    ap.add_argument("--mode", choices=MODES, default="chapters")
+    ap.add_argument("--params", default="{}", help="session params (width, height, fps, profile, conform, threads)")
+    args = ap.parse_args()
+    with open(args.jobs, encoding="utf-8") as f:
+        jobs = [json.loads(line) for line in f if line.strip()]
+    paths = []
+    for job in jobs:
+        asset_paths(job.get("params", {}), paths)
+    with EncoderSession(args.output, json.loads(args.params), args.mode, plan=jobs) as session:
+        with asset_scope(), prefetching(paths):
+            for job in jobs:
+                session.add(job["preset"], job.get("params", {}), job.get("title"))
+    print(f"Rendered {len(jobs)} graphics to {sidecar_path(args.output)}")
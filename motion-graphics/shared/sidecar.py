@@ -0,0 +1,87 @@
+"""Motion Graphics — Render Sidecar
+
+Every render writes <output>.meta.json next to the video, so sound effects
+and assembly can line up cues without probing or analysing the video:
+
+    {"preset", "output", "width", "height", "fps", "frames", "duration",
+     "encoder": {codec, preset, crf, pix_fmt, container, ..., "args": [...]},
+     "events": [{"t": 0.5, "frame": 15, "event": "pin_landed"}, ...]}
+
+"duration" is frames / fps, the exact length of the video stream. Events
+come from the preset (Scene.events): "t" is when the animation reaches that
+point, "frame" the first frame that shows it. Event names describe the
+moment: "<element>_in" when an element starts to appear, "<element>_landed"
+when its entrance settles, "typing_done", "item_fullscreen", ... Events at
+or past the end of the video are left out.
+
+params["sidecar"] = false skips the file.
+"""
+import os, json, math
+from shared.profiles import encoder_args
+
+ENCODER_KEYS = ("name", "codec", "preset", "crf", "pix_fmt", "container", "threads", "rc_lookahead", "x264_params")
+
+
+def event(t, name, **data):
+    """One timed event for Scene.events."""
+    return {"t": round(t, 4), "event": name, **data}
+
+
+def zoom_cycle_events(windows, zoom_dur, scroll_dur=0.0):
+    """Events of the listicle zoom cycle.
+
+    windows: (start, end, data) per item in display order. The first item
+    zooms in from its start, later ones are full screen when the previous
+    window ends; every item zooms out zoom_dur * 2 + scroll_dur before its
+    window ends (the last one zooms back in on itself).
+    """
+    events = []
+    for i, (start, end, data) in enumerate(windows):
+        events.append(event(start + zoom_dur if i == 0 else start, "item_fullscreen", **data))
+        events.append(event(end - zoom_dur * 2 - scroll_dur, "item_zoom_out", **data))
+    if windows:
+        events.append(event(windows[-1][1], "item_fullscreen", **windows[-1][2]))
+    return events
+
+
+def sidecar_path(output_path):
+    return os.path.splitext(output_path)[0] + ".meta.json"
+
+
+def build_sidecar(preset, scene, params, output_path):
+    frames = scene.total_frames
+    duration = frames / scene.fps
+    profile = scene.profile
+    encoder = {k: profile[k] for k in ENCODER_KEYS if profile.get(k) is not None}
+    conform = profile.get("conform")
+    if conform:
+        encoder["conform"] = conform
+    encoder["args"] = encoder_args(profile, output_path, duration)
+    events = []
+    for e in sorted(scene.events or (), key=lambda e: e["t"]):
+        if 0 <= e["t"] < duration:
+            events.append(dict(e, frame=min(frames - 1, math.ceil(e["t"] * scene.fps - 1e-6))))
+    return {
+        "preset": preset,
+        "output": output_path,
+        "width": scene.width,
+        "height": scene.height,
+        "fps": scene.fps,
+        "frames": frames,
+        "duration": round(duration, 6),
+        "backend": params.get("backend", "python"),
+        "audio": bool(conform and conform.get("audio")),
+        "encoder": encoder,
+        "events": events,
+    }
+
+
+def write_sidecar(preset, scene, params, output_path):
+    """Write the sidecar unless params["sidecar"] is false; returns its path or None."""
+    if params.get("sidecar", True) is False:
+        return None
+    path = sidecar_path(output_path)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(build_sidecar(preset, scene, params, output_path), f, indent=2)
+        f.write("\n")
+    return path
@@ -0,0 +1,64 @@
+"""Motion Graphics — Multi-Output Renders
+
+params["outputs"] renders several deliverables of one job in one run, e.g.
+the long-form cut, the short and a preview:
+
+    "outputs": [{"width": 1920, "height": 1080},
+                {"width": 1080, "height": 1920, "output": "short.mp4"},
+                {"width": 1280, "height": 720, "profile": "review"}]
+
+Each entry overrides params for that output (size, profile, fps, conform)
+and may name its file; without one the first output goes to the job's
+output path and the others to <name>.<W>x<H>.<ext>.
+
+Outputs with the same aspect ratio, frame rate and drawing params are pure
+rescales of the largest one: it is drawn once and ffmpeg splits and scales
+the stream into every file (shared.profiles.split_outputs). Other aspect
+ratios get their own layout, built from the same decoded source images
+(shared.assets) and drawn separately.
+"""
+import os
+from shared.profiles import get_profile, output_path_for, overlay_format
+from shared.layout import get_layout
+
+# What an output may change and still be a scaled copy of another
+RESCALE_KEYS = {"width", "height", "profile", "conform"}
+
+
+def _drawing_params(params):
+    return {k: v for k, v in params.items() if k not in RESCALE_KEYS}
+
+
+def _rescalable(lead, out):
+    """out can be scaled from lead: same aspect (within a pixel), fps, pixel format and drawing params."""
+    return (out["fps"] == lead["fps"]
+            and abs(lead["width"] * out["height"] - lead["height"] * out["width"]) <= max(lead["width"], lead["height"])
+            and overlay_format(lead["profile"]) == overlay_format(out["profile"])
+            and _drawing_params(lead["params"]) == _drawing_params(out["params"]))
+
+
+def plan_outputs(params, output_path):
+    """One entry per requested output, in order: params, profile, size, fps, path and
+    "rescale_of" (index of the output it is scaled from, or None when it is drawn)."""
+    base = {k: v for k, v in params.items() if k != "outputs"}
+    root, ext = os.path.splitext(output_path)
+    outputs = []
+    for i, variant in enumerate(params["outputs"]):
+        job = dict(base, **{k: v for k, v in variant.items() if k != "output"})
+        profile = get_profile(job)
+        L = get_layout(job, profile)
+        path = variant.get("output") or (output_path if i == 0 else f"{root}.{L.W}x{L.H}{ext}")
+        outputs.append({"params": job, "profile": profile, "width": L.W, "height": L.H, "fps": profile["fps"],
+                        "output": output_path_for(profile, path), "rescale_of": None})
+    paths = [o["output"] for o in outputs]
+    if len(set(paths)) != len(paths):
+        raise ValueError(f"Outputs write to the same file: {paths}")
+
+    drawn = []
+    for i in sorted(range(len(outputs)), key=lambda i: -outputs[i]["width"] * outputs[i]["height"]):
+        lead = next((j for j in drawn if _rescalable(outputs[j], outputs[i])), None)
+        if lead is None:
+            drawn.append(i)
+        else:
+            outputs[i]["rescale_of"] = lead
+    return outputs
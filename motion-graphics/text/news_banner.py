@@ -11,48 +11,96 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from PIL import Image, ImageDraw
 from shared.colors import get_theme, hex_to_rgba, hex_to_rgb
 from shared.fonts import get_font, get_text_size
-from shared.grid_background import create_grid_background
-from shared.render import render_frames_to_video, ease_out_cubic, ease_in_out_cubic, clamp
+from shared.profiles import get_profile
+from shared.layout import get_layout
+from shared.grid_background import create_frame_background
+from shared.scene import Scene, render_preset, job_from_argv
+from shared.sidecar import event
+from shared.render import ease_out_cubic, ease_in_out_cubic, clamp
+from shared.filtergraph import sprite_layer, make_sprite, progress, ease_out_cubic_expr, ease_in_out_cubic_expr
 
 
-def render(params, output_path):
+def build_scene(params):
     theme = get_theme(params)
     headline = params.get("headline", "BREAKING NEWS")
     text = params.get("text", "Major development in ongoing story")
     accent_color = params.get("accent_color", "#ff4444")
     duration = params.get("duration", 5.0)
     is_overlay = params.get("overlay", False)
-    fps = 30
-    W, H = 1920, 1080
+    profile = get_profile(params)
+    fps = profile["fps"]
+    L = get_layout(params, profile)
+    W, H, u = L.W, L.H, L.u
 
-    total_frames = int(duration * fps)
     accent_rgb = hex_to_rgb(accent_color)
 
-    font_headline = get_font(theme["font_title"], 24)
-    font_text = get_font(theme["font_body"], 32)
+    font_headline = get_font(theme["font_title"], u(24))
+    font_text = get_font(theme["font_body"], u(32))
 
     if is_overlay:
-        bg = Image.new("RGBA", (W, H), (0, 0, 0, 0))
+        bg, plate = Image.new("RGBA", (W, H), (0, 0, 0, 0)), None
     else:
-        bg = create_grid_background(W, H, theme)
+        bg, plate = create_frame_background(W, H, theme, params)
 
     text_color = hex_to_rgba(theme["primary_text"], 255)
 
     # Banner dimensions
-    banner_h = 80
-    banner_y = H - 140
-    headline_w = 220
+    banner_h = u(80)
+    banner_y = H - u(140)
+    headline_w = u(220)
 
     # Pre-measure text
     tmp = ImageDraw.Draw(bg)
     tw, th = get_text_size(tmp, text, font_text)
 
-    frames = []
-
-    for fi in range(total_frames):
-        frame = bg.copy()
+    def build_sprites():
+        # Whole banner is one sprite sliding on y; typing is a stepped crop reveal of the text sprite
+        banner_dy = (f"if(gte({{t}},{duration - 0.4}),"
+                     f"{u(200)}*{ease_in_out_cubic_expr(progress(duration - 0.4, 0.4))},"
+                     f"{u(200)}*(1-{ease_out_cubic_expr(progress(0, 0.4))}))")
+        sprites = []
+
+        layer, d = sprite_layer(W, H)
+        by = banner_y
+        d.rectangle([(0, by), (W, by + banner_h)], fill=(10, 10, 20, 220))
+        d.rectangle([(0, by), (u(6), by + banner_h)], fill=(*accent_rgb, 255))
+        d.rectangle([(u(10), by + u(5)), (u(10) + headline_w, by + banner_h - u(5))], fill=(*accent_rgb, 255))
+        hw, hh = get_text_size(d, headline, font_headline)
+        d.text((u(10) + (headline_w - hw) // 2, by + (banner_h - hh) // 2),
+               headline, fill=(255, 255, 255, 255), font=font_headline)
+        d.rectangle([(0, by + banner_h), (W, by + banner_h + u(3))], fill=(*accent_rgb, 180))
+        sprites.append(make_sprite(layer, dy=banner_dy))
+
+        # Characters shown = floor(len * progress), as in the frame loop. Each prefix is measured
+        # the way the frame loop measures it: the text is cut at the prefix's right ink edge, is
+        # centered on the prefix height and the cursor follows the prefix width, as steps over
+        # the character count.
+        if not text:
+            return sprites
+        chars = f"floor({len(text)}*{progress(0.4, 1.0)})"
+        tx = u(10) + headline_w + u(20)
+        layer, d = sprite_layer(W, H)
+        d.text((tx, by + (banner_h - th) // 2), text, fill=(*text_color[:3], 255), font=font_text)
+        edges = [tx + d.textbbox((0, 0), text[:i], font=font_text)[2] for i in range(1, len(text) + 1)]
+        sizes = [get_text_size(d, text[:i], font_text) for i in range(1, len(text) + 1)]
+        drops = [(banner_h - ph) // 2 - (banner_h - th) // 2 for _, ph in sizes]
+
+        def steps(values):
+            return "+".join([str(values[0])] + [f"{b - a}*gte({chars},{i})"
+                                               for i, (a, b) in enumerate(zip(values, values[1:]), 2) if b != a])
+
+        sprites.append(make_sprite(layer, dy=f"{banner_dy}+{steps(drops)}", reveal_x=steps(edges),
+                                   enable=f"gt({chars},0)"))
+
+        layer, d = sprite_layer(W, H)
+        d.rectangle([(tx + tw + u(2), by + u(20)), (tx + tw + u(5), by + banner_h - u(20))], fill=(*accent_rgb, 200))
+        blink = f"gt({chars},0)*(lt({chars},{len(text)})+eq(mod(floor({{t}}*3),2),0))"
+        sprites.append(make_sprite(layer, dx=f"{steps([pw for pw, _ in sizes])}-{tw}", dy=banner_dy, enable=blink))
+
+        return sprites
+
+    def draw_frame(frame, tsec):
         draw = ImageDraw.Draw(frame)
-        tsec = fi / fps
 
         # Slide in (0-0.4s), hold, slide out (last 0.4s)
         slide_in = clamp(tsec / 0.4)
@@ -60,16 +108,16 @@ def render(params, output_path):
 
         if slide_out > 0:
             slide = ease_in_out_cubic(slide_out)
-            banner_offset_y = int(200 * slide)
+            banner_offset_y = int(u(200) * slide)
         elif slide_in < 1.0:
             slide = ease_out_cubic(slide_in)
-            banner_offset_y = int(200 * (1.0 - slide))
+            banner_offset_y = int(u(200) * (1.0 - slide))
         else:
             banner_offset_y = 0
 
         by = banner_y + banner_offset_y
 
-        if by < H + 100:
+        if by < H + u(100):
             # Banner background (semi-transparent dark)
             draw.rectangle(
                 [(0, by), (W, by + banner_h)],
@@ -78,18 +126,18 @@ def render(params, output_path):
 
             # Accent stripe left edge
             draw.rectangle(
-                [(0, by), (6, by + banner_h)],
+                [(0, by), (u(6), by + banner_h)],
                 fill=(*accent_rgb, 255)
             )
 
             # Headline box (accent colored)
             draw.rectangle(
-                [(10, by + 5), (10 + headline_w, by + banner_h - 5)],
+                [(u(10), by + u(5)), (u(10) + headline_w, by + banner_h - u(5))],
                 fill=(*accent_rgb, 255)
             )
             hw, hh = get_text_size(draw, headline, font_headline)
             draw.text(
-                (10 + (headline_w - hw) // 2, by + (banner_h - hh) // 2),
+                (u(10) + (headline_w - hw) // 2, by + (banner_h - hh) // 2),
                 headline, fill=(255, 255, 255, 255), font=font_headline
             )
 
@@ -101,7 +149,7 @@ def render(params, output_path):
                 visible_text = text[:n_chars]
 
                 if visible_text:
-                    tx = 10 + headline_w + 20
+                    tx = u(10) + headline_w + u(20)
                     tw2, th2 = get_text_size(draw, visible_text, font_text)
                     draw.text(
                         (tx, by + (banner_h - th2) // 2),
@@ -110,22 +158,28 @@ def render(params, output_path):
 
                     # Cursor blink
                     if chars_progress < 1.0 or int(tsec * 3) % 2 == 0:
-                        cursor_x = tx + tw2 + 2
+                        cursor_x = tx + tw2 + u(2)
                         draw.rectangle(
-                            [(cursor_x, by + 20), (cursor_x + 3, by + banner_h - 20)],
+                            [(cursor_x, by + u(20)), (cursor_x + u(3), by + banner_h - u(20))],
                             fill=(*accent_rgb, 200)
                         )
 
             # Bottom accent line
             draw.rectangle(
-                [(0, by + banner_h), (W, by + banner_h + 3)],
+                [(0, by + banner_h), (W, by + banner_h + u(3))],
                 fill=(*accent_rgb, 180)
             )
 
-        frames.append(frame)
+    events = [event(0, "banner_in"), event(0.4, "banner_landed"), event(0.4, "typing_start"),
+              event(1.4, "typing_done"), event(duration - 0.4, "banner_out")]
+
+    return Scene(W, H, fps, duration, bg, plate, draw_frame, profile, theme=theme,
+                 sprites=build_sprites, overlay=is_overlay, events=events)
 
-    render_frames_to_video(frames, output_path, fps=fps)
+
+def render(params, output_path):
+    output_path = render_preset("news_banner", build_scene, params, output_path)
     print(f"Rendered news_banner to {output_path}")
 
 if __name__ == "__main__":
-    render(json.loads(sys.argv[1]), sys.argv[2])
+    render(*job_from_argv(sys.argv))
@@ -10,8 +10,12 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from PIL import Image, ImageDraw
 from shared.colors import get_theme, hex_to_rgba, hex_to_rgb
 from shared.fonts import get_font, get_text_size
-from shared.grid_background import create_grid_background
-from shared.render import render_frames_to_video, ease_out_cubic, clamp
+from shared.profiles import get_profile
+from shared.layout import get_layout
+from shared.grid_background import create_frame_background
+from shared.scene import Scene, render_preset, job_from_argv
+from shared.sidecar import event
+from shared.render import ease_out_cubic, clamp
 
 
 def wrap_text(draw, text, font, max_width):
@@ -31,41 +35,38 @@ def wrap_text(draw, text, font, max_width):
     return lines
 
 
-def render(params, output_path):
+def build_scene(params):
     theme = get_theme(params)
     quote = params.get("quote", "The only limit is your imagination.")
     attribution = params.get("attribution", "")
     accent_color = params.get("accent_color", "#ff4444")
     source = params.get("source", "")
     duration = params.get("duration", 5.0)
-    fps = 30
-    W, H = 1920, 1080
+    profile = get_profile(params)
+    fps = profile["fps"]
+    L = get_layout(params, profile)
+    W, H, u = L.W, L.H, L.u
 
-    total_frames = int(duration * fps)
     accent_rgb = hex_to_rgb(accent_color)
 
-    font_quote = get_font(theme["font_body"], 48)
-    font_mark = get_font(theme["font_title"], 180)
-    font_attr = get_font(theme["font_body"], 28)
-    font_source = get_font(theme["font_body"], 16)
+    font_quote = get_font(theme["font_body"], u(48))
+    font_mark = get_font(theme["font_title"], u(180))
+    font_attr = get_font(theme["font_body"], u(28))
+    font_source = get_font(theme["font_body"], u(16))
 
-    bg = create_grid_background(W, H, theme)
+    bg, plate = create_frame_background(W, H, theme, params)
     text_color = hex_to_rgba(theme["primary_text"], 255)
     sub_color = hex_to_rgba(theme["secondary_text"], 255)
 
     # Pre-wrap quote
     tmp = ImageDraw.Draw(bg)
-    max_text_w = W - 400  # margins for quote marks
+    max_text_w = W - u(400)  # margins for quote marks
     lines = wrap_text(tmp, quote, font_quote, max_text_w)
     line_h = get_text_size(tmp, "Ay", font_quote)[1]
-    total_text_h = len(lines) * (line_h + 8)
-
-    frames = []
+    total_text_h = len(lines) * (line_h + u(8))
 
-    for fi in range(total_frames):
-        frame = bg.copy()
+    def draw_frame(frame, tsec):
         draw = ImageDraw.Draw(frame)
-        tsec = fi / fps
 
         # Opening quote mark (0-0.4s)
         mark_t = clamp(tsec / 0.4)
@@ -74,8 +75,8 @@ def render(params, output_path):
             mark_scale = ease_out_cubic(mark_t)
             # Large decorative opening quote mark
             mw, mh = get_text_size(draw, "\u201C", font_mark)
-            mx = 120
-            my = H // 2 - total_text_h // 2 - mh // 2 - 20
+            mx = u(120)
+            my = H // 2 - total_text_h // 2 - mh // 2 - u(20)
             draw.text((mx, my), "\u201C", fill=(*accent_rgb, ma), font=font_mark)
 
         # Quote text (staggered per line, 0.2-1.0s)
@@ -85,9 +86,9 @@ def render(params, output_path):
             lt = clamp((tsec - line_start) / 0.5)
             if lt > 0:
                 la = int(255 * ease_out_cubic(lt))
-                slide = int(20 * (1.0 - ease_out_cubic(lt)))
+                slide = int(u(20) * (1.0 - ease_out_cubic(lt)))
                 lw, lh = get_text_size(draw, line, font_quote)
-                draw.text(((W - lw) // 2, base_y + i * (line_h + 8) + slide), line,
+                draw.text(((W - lw) // 2, base_y + i * (line_h + u(8)) + slide), line,
                           fill=(*text_color[:3], la), font=font_quote)
 
         # Closing quote mark
@@ -96,7 +97,7 @@ def render(params, output_path):
         if close_t > 0:
             ca = int(80 * ease_out_cubic(close_t))
             mw2, mh2 = get_text_size(draw, "\u201D", font_mark)
-            draw.text((W - 120 - mw2, base_y + total_text_h - mh2 // 2), "\u201D",
+            draw.text((W - u(120) - mw2, base_y + total_text_h - mh2 // 2), "\u201D",
                       fill=(*accent_rgb, ca), font=font_mark)
 
         # Accent divider line
@@ -104,12 +105,12 @@ def render(params, output_path):
         div_t = clamp((tsec - div_start) / 0.4)
         if div_t > 0:
             div_ease = ease_out_cubic(div_t)
-            div_w = int(80 * div_ease)
-            div_y = base_y + total_text_h + 25
+            div_w = int(u(80) * div_ease)
+            div_y = base_y + total_text_h + u(25)
             div_x = (W - div_w) // 2
             draw.rounded_rectangle(
-                [(div_x, div_y), (div_x + div_w, div_y + 3)],
-                radius=1, fill=(*accent_rgb, int(200 * div_ease))
+                [(div_x, div_y), (div_x + div_w, div_y + u(3))],
+                radius=u(1), fill=(*accent_rgb, int(200 * div_ease))
             )
 
         # Attribution
@@ -120,7 +121,7 @@ def render(params, output_path):
                 aa = int(180 * ease_out_cubic(attr_t))
                 attr_text = f"— {attribution}"
                 aw, ah = get_text_size(draw, attr_text, font_attr)
-                attr_y = base_y + total_text_h + 45
+                attr_y = base_y + total_text_h + u(45)
                 draw.text(((W - aw) // 2, attr_y), attr_text,
                           fill=(*sub_color[:3], aa), font=font_attr)
 
@@ -130,12 +131,23 @@ def render(params, output_path):
             if src_t > 0:
                 sa = int(130 * ease_out_cubic(src_t))
                 ssw, ssh = get_text_size(draw, source, font_source)
-                draw.text((W - ssw - 30, H - 35), source, fill=(*sub_color[:3], sa), font=font_source)
+                draw.text((W - ssw - u(30), H - u(35)), source, fill=(*sub_color[:3], sa), font=font_source)
+
+    close_start = 0.2 + len(lines) * 0.15
+    events = [event(0, "quote_mark_in")]
+    events += [event(0.2 + i * 0.15, "line_in", line=i) for i in range(len(lines))]
+    events.append(event(close_start + 0.4, "quote_done"))
+    if attribution:
+        events.append(event(close_start + 0.4, "attribution_in"))
+    if source:
+        events.append(event(1.5, "source_in"))
 
-        frames.append(frame)
+    return Scene(W, H, fps, duration, bg, plate, draw_frame, profile, theme=theme, events=events)
 
-    render_frames_to_video(frames, output_path, fps=fps)
+
+def render(params, output_path):
+    output_path = render_preset("quote_card", build_scene, params, output_path)
     print(f"Rendered quote_card to {output_path}")
 
 if __name__ == "__main__":
-    render(json.loads(sys.argv[1]), sys.argv[2])
+    render(*job_from_argv(sys.argv))
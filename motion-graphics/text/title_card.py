@@ -10,28 +10,34 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from PIL import Image, ImageDraw
 from shared.colors import get_theme, hex_to_rgba, hex_to_rgb
 from shared.fonts import get_font, get_text_size
-from shared.grid_background import create_grid_background
-from shared.render import render_frames_to_video, ease_out_cubic, ease_in_out_cubic, clamp
+from shared.profiles import get_profile
+from shared.layout import get_layout
+from shared.grid_background import create_frame_background
+from shared.scene import Scene, render_preset, job_from_argv
+from shared.sidecar import event
+from shared.render import ease_out_cubic, ease_in_out_cubic, clamp
+from shared.filtergraph import sprite_layer, make_sprite, progress, ease_out_cubic_expr
 
 
-def render(params, output_path):
+def build_scene(params):
     theme = get_theme(params)
     title = params.get("title", "TITLE")
     subtitle = params.get("subtitle", "")
     accent_color = params.get("accent_color", "#ff4444")
     source = params.get("source", "")
     duration = params.get("duration", 4.0)
-    fps = 30
-    W, H = 1920, 1080
+    profile = get_profile(params)
+    fps = profile["fps"]
+    L = get_layout(params, profile)
+    W, H, u = L.W, L.H, L.u
 
-    total_frames = int(duration * fps)
     accent_rgb = hex_to_rgb(accent_color)
 
-    font_title = get_font(theme["font_title"], 80)
-    font_sub = get_font(theme["font_body"], 36)
-    font_source = get_font(theme["font_body"], 16)
+    font_title = get_font(theme["font_title"], u(80))
+    font_sub = get_font(theme["font_body"], u(36))
+    font_source = get_font(theme["font_body"], u(16))
 
-    bg = create_grid_background(W, H, theme)
+    bg, plate = create_frame_background(W, H, theme, params)
     text_color = hex_to_rgba(theme["primary_text"], 255)
     sub_color = hex_to_rgba(theme["secondary_text"], 255)
 
@@ -48,15 +54,49 @@ def render(params, output_path):
         line_heights.append(lh)
         line_widths.append(lw)
 
-    total_text_h = sum(line_heights) + (len(lines) - 1) * 10
+    total_text_h = sum(line_heights) + (len(lines) - 1) * u(10)
     max_line_w = max(line_widths)
 
-    frames = []
+    def build_sprites():
+        # Sprites drawn at their resting position; slide/fade/grow become ffmpeg expressions
+        title_in = ease_out_cubic_expr(progress(0, 0.6))
+        slide = f"{u(30)}*(1-{title_in})"
+        base_y = H // 2 - total_text_h // 2 - u(20)
+        sprites = []
+
+        layer, d = sprite_layer(W, H)
+        y_cursor = base_y
+        for i, line in enumerate(lines):
+            d.text(((W - line_widths[i]) // 2, y_cursor), line, fill=text_color, font=font_title)
+            y_cursor += line_heights[i] + u(10)
+        sprites.append(make_sprite(layer, dy=slide, alpha=title_in))
+
+        # Underline and subtitle pick up the slide offset twice/three times, as in the frame loop
+        uy = y_cursor + u(5)
+        line_in = ease_out_cubic_expr(progress(0.3, 0.5))
+        layer, d = sprite_layer(W, H)
+        underline_w = int(max_line_w * 0.6)
+        d.rounded_rectangle([((W - underline_w) // 2, uy), ((W + underline_w) // 2, uy + u(5))],
+                            radius=u(2), fill=(*accent_rgb, 255))
+        sprites.append(make_sprite(layer, dy=f"2*{slide}", alpha=line_in,
+                                   reveal=line_in, reveal_from="center"))
+
+        if subtitle:
+            layer, d = sprite_layer(W, H)
+            sw, sh = get_text_size(d, subtitle, font_sub)
+            d.text(((W - sw) // 2, uy + u(25)), subtitle, fill=(*sub_color[:3], 200), font=font_sub)
+            sprites.append(make_sprite(layer, dy=f"3*{slide}",
+                                       alpha=ease_out_cubic_expr(progress(0.6, 0.4))))
+        if source:
+            layer, d = sprite_layer(W, H)
+            ssw, ssh = get_text_size(d, source, font_source)
+            d.text((W - ssw - u(30), H - u(35)), source, fill=(*sub_color[:3], 130), font=font_source)
+            sprites.append(make_sprite(layer, alpha=ease_out_cubic_expr(progress(1.0, 0.5))))
+
+        return sprites
 
-    for fi in range(total_frames):
-        frame = bg.copy()
+    def draw_frame(frame, tsec):
         draw = ImageDraw.Draw(frame)
-        tsec = fi / fps
 
         # Title fade in + slide up (0-0.6s)
         title_t = clamp(tsec / 0.6)
@@ -64,10 +104,10 @@ def render(params, output_path):
 
         if title_t > 0:
             ta = int(255 * title_ease)
-            slide = int(30 * (1.0 - title_ease))
+            slide = int(u(30) * (1.0 - title_ease))
 
             # Center vertically (slightly above middle)
-            base_y = H // 2 - total_text_h // 2 - 20 + slide
+            base_y = H // 2 - total_text_h // 2 - u(20) + slide
 
             y_cursor = base_y
             for i, line in enumerate(lines):
@@ -75,18 +115,18 @@ def render(params, output_path):
                 lh = line_heights[i]
                 draw.text(((W - lw) // 2, y_cursor), line,
                           fill=(*text_color[:3], ta), font=font_title)
-                y_cursor += lh + 10
+                y_cursor += lh + u(10)
 
             # Accent underline (draws after text, 0.3-0.8s)
             line_t = clamp((tsec - 0.3) / 0.5)
             if line_t > 0:
                 line_ease = ease_out_cubic(line_t)
                 underline_w = int(max_line_w * 0.6 * line_ease)
-                uy = y_cursor + 5 + slide
+                uy = y_cursor + u(5) + slide
                 ux = (W - underline_w) // 2
                 draw.rounded_rectangle(
-                    [(ux, uy), (ux + underline_w, uy + 5)],
-                    radius=2, fill=(*accent_rgb, int(255 * line_ease))
+                    [(ux, uy), (ux + underline_w, uy + u(5))],
+                    radius=u(2), fill=(*accent_rgb, int(255 * line_ease))
                 )
 
                 # Subtitle (0.6-1.0s)
@@ -95,7 +135,7 @@ def render(params, output_path):
                     if sub_t > 0:
                         sa = int(200 * ease_out_cubic(sub_t))
                         sw, sh = get_text_size(draw, subtitle, font_sub)
-                        draw.text(((W - sw) // 2, uy + 25 + slide), subtitle,
+                        draw.text(((W - sw) // 2, uy + u(25) + slide), subtitle,
                                   fill=(*sub_color[:3], sa), font=font_sub)
 
         # Source
@@ -104,12 +144,21 @@ def render(params, output_path):
             if src_t > 0:
                 sa = int(130 * ease_out_cubic(src_t))
                 ssw, ssh = get_text_size(draw, source, font_source)
-                draw.text((W - ssw - 30, H - 35), source, fill=(*sub_color[:3], sa), font=font_source)
+                draw.text((W - ssw - u(30), H - u(35)), source, fill=(*sub_color[:3], sa), font=font_source)
 
-        frames.append(frame)
+    events = [event(0, "title_in"), event(0.6, "title_landed"), event(0.8, "underline_done")]
+    if subtitle:
+        events.append(event(0.6, "subtitle_in"))
+    if source:
+        events.append(event(1.0, "source_in"))
 
-    render_frames_to_video(frames, output_path, fps=fps)
+    return Scene(W, H, fps, duration, bg, plate, draw_frame, profile, theme=theme, sprites=build_sprites,
+                 events=events)
+
+
+def render(params, output_path):
+    output_path = render_preset("title_card", build_scene, params, output_path)
     print(f"Rendered title_card to {output_path}")
 
 if __name__ == "__main__":
-    render(json.loads(sys.argv[1]), sys.argv[2])
+    render(*job_from_argv(sys.argv))
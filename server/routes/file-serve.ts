@@ -2,12 +2,15 @@
  * File Serve Route — serveert lokale bestanden (images, video, audio) via de API
  * 
  * GET /api/files/serve?path=/root/.openclaw/workspace/projects/xxx/assets/image.png
+ * GET /api/files/serve?path=.../mg-003.mp4&follow=1  — volgt een progressieve render (fragmented MP4)
+ * GET /api/files/live?projectId=xxx                  — motion graphics die nu gerenderd worden
  * 
  * Beveiligd: alleen bestanden in toegestane directories
  */
 import { Router, Request, Response } from 'express';
 import path from 'path';
 import fs from 'fs';
+import { listLiveRenders, isLiveRender } from '../services/live-renders.js';
 
 const router = Router();
 
@@ -35,8 +38,67 @@ const MIME_MAP: Record<string, string> = {
   '.ogg': 'audio/ogg',
   '.flac': 'audio/flac',
   '.m4a': 'audio/mp4',
+  '.m3u8': 'application/vnd.apple.mpegurl',
+  '.m4s': 'video/iso.segment',
 };
 
+// Progressieve renders: hoe vaak we op nieuwe bytes controleren
+const FOLLOW_POLL_MS = 250;
+
+// Stuur een groeiend bestand (chunked) door zolang de render in de live-render registry staat;
+// de browser speelt de fragmenten van een fragmented MP4 af zodra ze binnen zijn. Hoe lang het
+// eerste fragment op zich laat wachten (trage start, governor, grote batch) maakt niet uit
+function followFile(req: Request, res: Response, filePath: string, mimeType: string) {
+  res.writeHead(200, { 'Content-Type': mimeType, 'Cache-Control': 'no-store' });
+  let sent = 0;
+  let closed = false;
+  req.on('close', () => { closed = true; });
+
+  const tick = () => {
+    if (closed) return;
+    // Eerst de registry: een render die daarna nog bytes schreef is dan al volledig te zien
+    const live = isLiveRender(filePath);
+    let stat: fs.Stats;
+    try {
+      stat = fs.statSync(filePath);
+    } catch {
+      // Nog niet aangemaakt (de render is net gestart) of weer verwijderd
+      if (!live) return res.end();
+      return setTimeout(tick, FOLLOW_POLL_MS);
+    }
+    if (stat.size > sent) {
+      const stream = fs.createReadStream(filePath, { start: sent, end: stat.size - 1 });
+      sent = stat.size;
+      stream.on('end', () => setTimeout(tick, FOLLOW_POLL_MS));
+      stream.on('error', () => res.end());
+      stream.pipe(res, { end: false });
+      return;
+    }
+    if (!live) return res.end();
+    setTimeout(tick, FOLLOW_POLL_MS);
+  };
+  tick();
+}
+
+// HLS playlists verwijzen relatief naar hun segmenten; herschrijf die naar deze route
+function rewritePlaylist(playlist: string, dir: string, token: string | undefined): string {
+  const serveUrl = (name: string) => `/api/files/serve?path=${encodeURIComponent(path.join(dir, name))}`
+    + (token ? `&token=${encodeURIComponent(token)}` : '');
+  return playlist.split('\n').map(line => {
+    if (line.startsWith('#EXT-X-MAP:')) return line.replace(/URI="([^"]+)"/, (_m, uri) => `URI="${serveUrl(uri)}"`);
+    if (line && !line.startsWith('#')) return serveUrl(line.trim());
+    return line;
+  }).join('\n');
+}
+
+router.get('/live', (req: Request, res: Response) => {
+  const projectId = req.query.projectId as string;
+  if (!projectId) {
+    return res.status(400).json({ error: 'projectId query parameter is vereist' });
+  }
+  res.json({ renders: listLiveRenders(projectId) });
+});
+
 router.get('/serve', (req: Request, res: Response) => {
   try {
     const filePath = req.query.path as string;
@@ -53,6 +115,15 @@ router.get('/serve', (req: Request, res: Response) => {
       return res.status(403).json({ error: 'Toegang geweigerd tot dit pad' });
     }
 
+    // Bepaal MIME type
+    const ext = path.extname(normalizedPath).toLowerCase();
+    const mimeType = MIME_MAP[ext] || 'application/octet-stream';
+
+    // Progressieve render volgen; het bestand hoeft er nog niet te zijn
+    if (req.query.follow && mimeType.startsWith('video/')) {
+      return followFile(req, res, normalizedPath, mimeType);
+    }
+
     // Check of bestand bestaat
     if (!fs.existsSync(normalizedPath)) {
       return res.status(404).json({ error: 'Bestand niet gevonden' });
@@ -63,9 +134,12 @@ router.get('/serve', (req: Request, res: Response) => {
       return res.status(400).json({ error: 'Pad is geen bestand' });
     }
 
-    // Bepaal MIME type
-    const ext = path.extname(normalizedPath).toLowerCase();
-    const mimeType = MIME_MAP[ext] || 'application/octet-stream';
+    if (ext === '.m3u8') {
+      // Playlist groeit tijdens het renderen (EVENT playlist): nooit cachen
+      const playlist = fs.readFileSync(normalizedPath, 'utf-8');
+      res.writeHead(200, { 'Content-Type': mimeType, 'Cache-Control': 'no-store' });
+      return res.end(rewritePlaylist(playlist, path.dirname(normalizedPath), req.query.token as string | undefined));
+    }
 
     // Support range requests voor video/audio streaming
     const range = req.headers.range;
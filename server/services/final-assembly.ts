@@ -13,7 +13,9 @@
  * Assembly volgorde:
  * 1. Lees directors-cut.json als timeline
  * 2. Trim + schaal alle scene videos naar juiste formaat
- * 3. Concat alle segmenten
+ *    (allemaal naar één encoder-spec, zie conformSpec; motion graphics die al
+ *    volgens die spec gerenderd zijn worden alleen gekopieerd)
+ * 3. Concat alle segmenten (-c copy wanneer alles conform is)
  * 4. Genereer SRT uit timestamps.json
  * 5. Pas color grading toe (uit project config)
  * 6. Mix voiceover + SFX track + achtergrondmuziek
@@ -28,6 +30,21 @@ import fs from 'fs/promises';
 import path from 'path';
 
 const WORKSPACE_BASE = '/root/.openclaw/workspace/projects';
+const MOTION_GRAPHICS_DIR = '/root/video-producer-app/motion-graphics';
+
+// Encoder-spec waar alle segmenten aan voldoen (zie motion-graphics shared/profiles.py conform_spec)
+interface ConformSpec {
+  width: number;
+  height: number;
+  fps: number;
+  timescale: number;
+  pix_fmt: string;
+  preset: string;
+  profile: string;
+  level: string;
+  gop: number;
+  x264_params: string;
+}
 
 interface AssemblyResult {
   success: boolean;
@@ -69,7 +86,13 @@ export async function executeFinalAssembly(project: any, settings: any): Promise
   const isShort = project.output === 'youtube_short' || project.output === 'Shorts';
   const resolution = isShort ? '1080:1920' : '1920:1080';
   const resolutionXY = isShort ? '1080x1920' : '1920x1080';
-  const fps = 30;
+  const fps = Number(settings?.fps) || 30;
+  const [width, height] = resolution.split(':').map(Number);
+
+  // Eén spec voor alle segmenten: dan kan de concat zonder her-encoderen (-c copy)
+  const conform = conformSpec({ width, height, fps, audio: false });
+  const videoEncodeArgs = conform?.args ?? '-c:v libx264 -preset fast -pix_fmt yuv420p';
+  let segmentsCopied = 0;
 
   // ── 3. Trim + schaal alle segmenten ──
   const trimmedDir = path.join(editDir, 'trimmed');
@@ -91,40 +114,50 @@ export async function executeFinalAssembly(project: any, settings: any): Promise
     try {
       if (await fileExists(assetPath)) {
         const isImage = /\.(jpg|jpeg|png|webp)$/i.test(assetPath);
+        // Motion graphics worden al op de doel-fps gerenderd; alleen andere bronnen hersamplen
+        const isMotionGraphic = assetPath.includes(`${path.sep}motion-graphics${path.sep}`);
+        const fpsFilter = isMotionGraphic ? '' : `,fps=${fps}`;
 
-        if (isImage) {
+        if (isMotionGraphic && conform && await matchesSpec(assetPath, conform.spec, duration)) {
+          // Al conform gerenderd met de juiste duur → alleen kopiëren
+          execSync(
+            `ffmpeg -y -i "${assetPath}" -map 0:v -c copy "${trimmedPath}"`,
+            { stdio: 'pipe', timeout: 30_000 }
+          );
+          segmentsCopied++;
+        } else if (isImage) {
           // Image → video met Ken Burns zoom effect
           execSync(
             `ffmpeg -y -loop 1 -i "${assetPath}" -t ${duration} ` +
             `-vf "scale=${resolution}:force_original_aspect_ratio=decrease,pad=${resolution}:(ow-iw)/2:(oh-ih)/2,fps=${fps}" ` +
-            `-c:v libx264 -preset fast -pix_fmt yuv420p -shortest "${trimmedPath}"`,
+            `${videoEncodeArgs} -shortest "${trimmedPath}"`,
             { stdio: 'pipe', timeout: 30_000 }
           );
         } else {
           // Video → trim + schaal
           execSync(
             `ffmpeg -y -i "${assetPath}" -t ${duration} ` +
-            `-vf "scale=${resolution}:force_original_aspect_ratio=decrease,pad=${resolution}:(ow-iw)/2:(oh-ih)/2,fps=${fps}" ` +
-            `-c:v libx264 -preset fast -pix_fmt yuv420p -an "${trimmedPath}"`,
+            `-vf "scale=${resolution}:force_original_aspect_ratio=decrease,pad=${resolution}:(ow-iw)/2:(oh-ih)/2${fpsFilter}" ` +
+            `${videoEncodeArgs} -an "${trimmedPath}"`,
             { stdio: 'pipe', timeout: 60_000 }
           );
         }
         segmentsReady++;
       } else {
         warnings.push(`Segment ${segment.id}: asset niet gevonden (${segment.asset_path})`);
-        createBlackFrame(trimmedPath, duration, resolutionXY, fps);
+        createBlackFrame(trimmedPath, duration, resolutionXY, fps, conform?.args);
         segmentsReady++;
       }
     } catch (error: any) {
       warnings.push(`Segment ${segment.id}: trim mislukt — ${error.message?.slice(0, 100)}`);
       try {
-        createBlackFrame(trimmedPath, duration, resolutionXY, fps);
+        createBlackFrame(trimmedPath, duration, resolutionXY, fps, conform?.args);
         segmentsReady++;
       } catch {}
     }
   }
 
-  console.log(`[Assembly] ${segmentsReady}/${timeline.length} segmenten getrimd`);
+  console.log(`[Assembly] ${segmentsReady}/${timeline.length} segmenten getrimd (${segmentsCopied} motion graphics gekopieerd)`);
 
   if (segmentsReady === 0) {
     throw new Error('Geen bruikbare video segmenten — kan niet assembleren');
@@ -149,12 +182,14 @@ export async function executeFinalAssembly(project: any, settings: any): Promise
   await fs.writeFile(concatListPath, concatLines.join('\n'), 'utf-8');
 
   const concatVideoPath = path.join(editDir, 'concat-raw.mp4');
+  // Alle segmenten delen de conform spec → stream copy; zonder spec opnieuw encoderen
+  const concatCodecArgs = conform ? '-c copy' : '-c:v libx264 -preset fast -pix_fmt yuv420p';
   execSync(
-    `ffmpeg -y -f concat -safe 0 -i "${concatListPath}" -c:v libx264 -preset fast -pix_fmt yuv420p "${concatVideoPath}"`,
+    `ffmpeg -y -f concat -safe 0 -i "${concatListPath}" ${concatCodecArgs} "${concatVideoPath}"`,
     { stdio: 'pipe', timeout: 300_000 }
   );
 
-  console.log(`[Assembly] ${concatLines.length} segmenten samengevoegd`);
+  console.log(`[Assembly] ${concatLines.length} segmenten samengevoegd${conform ? ' (stream copy)' : ''}`);
 
   // ── 5. Genereer SRT uit timestamps.json (als subtitles gewenst) ──
   const wantSubtitles = project.subtitles !== false;
@@ -394,14 +429,95 @@ async function fileExists(filePath: string): Promise<boolean> {
   }
 }
 
-function createBlackFrame(outputPath: string, duration: number, resolution: string, fps: number): void {
+function createBlackFrame(
+  outputPath: string, duration: number, resolution: string, fps: number, encodeArgs?: string
+): void {
   execSync(
     `ffmpeg -y -f lavfi -i "color=c=black:s=${resolution}:d=${duration}:r=${fps}" ` +
-    `-c:v libx264 -preset ultrafast -pix_fmt yuv420p "${outputPath}"`,
+    `${encodeArgs ?? '-c:v libx264 -preset ultrafast -pix_fmt yuv420p'} "${outputPath}"`,
     { stdio: 'pipe', timeout: 10_000 }
   );
 }
 
+/**
+ * Vul de spec aan en haal de bijbehorende encoder opties op bij motion-graphics,
+ * zodat getrimde segmenten en motion graphics exact dezelfde H.264 instellingen delen.
+ * null → geen spec beschikbaar, assembly encodeert zoals voorheen.
+ */
+function conformSpec(request: Record<string, any>): { spec: ConformSpec; args: string } | null {
+  try {
+    const out = execSync(
+      `cd ${MOTION_GRAPHICS_DIR} && python3 -m shared.profiles --conform-args '${JSON.stringify(request)}'`,
+      { encoding: 'utf-8', timeout: 10_000 }
+    );
+    const { spec, args } = JSON.parse(out);
+    return { spec, args: args.join(' ') };
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Klopt een gerenderde motion graphic met de spec (en de segmentduur, op één frame na)?
+ * Leest de sidecar (<naam>.meta.json) van de render; zonder sidecar via ffprobe.
+ * Naast de gevraagde spec telt wat de encoder echt kreeg: codec, preset, profiel, level,
+ * pix_fmt en de vastgepinde x264 params bepalen SPS/PPS, en die moeten voor -c copy
+ * gelijk zijn. Klopt iets niet → false, dan wordt het segment opnieuw ge-encodeerd.
+ */
+async function matchesSpec(filePath: string, spec: ConformSpec, duration: number): Promise<boolean> {
+  const sidecarPath = filePath.replace(/\.[^.]+$/, '.meta.json');
+  if (await fileExists(sidecarPath)) {
+    try {
+      const meta = JSON.parse(await fs.readFile(sidecarPath, 'utf-8'));
+      const rendered = meta.encoder?.conform;
+      if (!rendered) return false;
+      const keys: Array<keyof ConformSpec> = [
+        'width', 'height', 'fps', 'timescale', 'pix_fmt', 'preset', 'profile', 'level', 'gop', 'x264_params',
+      ];
+      // Laatste waarde per optie telt, net als bij ffmpeg zelf
+      const args: string[] = (meta.encoder.args ?? []).map(String);
+      const arg = (flag: string) => {
+        const i = args.lastIndexOf(flag);
+        return i >= 0 ? args[i + 1] : undefined;
+      };
+      // De job mag eigen x264 params hebben, zolang de pins van de spec als laatste komen
+      const x264 = arg('-x264-params') ?? '';
+      return keys.every((k) => String(rendered[k]) === String(spec[k]))
+        && meta.encoder.codec === 'libx264'
+        && arg('-preset') === spec.preset
+        && arg('-profile:v') === spec.profile
+        && arg('-level:v') === String(spec.level)
+        && arg('-pix_fmt') === spec.pix_fmt
+        && (x264 === spec.x264_params || x264.endsWith(`:${spec.x264_params}`))
+        && Math.abs(meta.duration - duration) <= 1 / spec.fps;
+    } catch {
+      // onleesbare sidecar → probe
+    }
+  }
+  try {
+    const probe = JSON.parse(execSync(
+      `ffprobe -v quiet -select_streams v:0 ` +
+      `-show_entries stream=codec_name,width,height,r_frame_rate,time_base,pix_fmt,profile,level:format=duration ` +
+      `-of json "${filePath}"`,
+      { encoding: 'utf-8' }
+    ));
+    const stream = probe.streams?.[0];
+    if (!stream) return false;
+    const [num, den] = String(stream.r_frame_rate).split('/').map(Number);
+    return stream.codec_name === 'h264'
+      && stream.width === spec.width
+      && stream.height === spec.height
+      && Math.abs(num / (den || 1) - spec.fps) < 0.01
+      && stream.time_base === `1/${spec.timescale}`
+      && stream.pix_fmt === spec.pix_fmt
+      && String(stream.profile).toLowerCase() === spec.profile
+      && stream.level === Math.round(parseFloat(spec.level) * 10)
+      && Math.abs(parseFloat(probe.format?.duration) - duration) <= 1 / spec.fps;
+  } catch {
+    return false;
+  }
+}
+
 /**
  * Normaliseer color grade naam naar id
  * "Cinematic Dark" → "cinematic_dark", "Geen" → "none"
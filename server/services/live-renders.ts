@@ -0,0 +1,30 @@
+/**
+ * Live Renders — motion graphics die op dit moment progressief gerenderd worden
+ * (fragmented MP4 / HLS), zodat de PreviewTab ze via de file-serve route al kan
+ * afspelen terwijl de frames nog binnenkomen.
+ */
+
+export interface LiveRender {
+  projectId: string;
+  path: string;
+  label: string;
+  startedAt: string;
+}
+
+const liveRenders = new Map<string, LiveRender>();
+
+export function startLiveRender(projectId: string, filePath: string, label: string): void {
+  liveRenders.set(filePath, { projectId, path: filePath, label, startedAt: new Date().toISOString() });
+}
+
+export function endLiveRender(filePath: string): void {
+  liveRenders.delete(filePath);
+}
+
+export function isLiveRender(filePath: string): boolean {
+  return liveRenders.has(filePath);
+}
+
+export function listLiveRenders(projectId: string): LiveRender[] {
+  return [...liveRenders.values()].filter(r => r.projectId === projectId);
+}
@@ -32,6 +32,7 @@ import {
 // Script checker utility
 import { checkScript } from '../utils/script-checker.js';
 import { llmSimplePrompt, llmJsonPrompt, LLM_MODELS } from './llm.js';
+import { startLiveRender, endLiveRender } from './live-renders.js';
 import fs from 'fs/promises';
 import path from 'path';
 
@@ -1078,6 +1079,12 @@ async function executeStepMotionGraphicsFn(
 
   const resolution = config.resolution ?? '1920x1080';
   const [width, height] = resolution.split('x').map(Number);
+  // Zelfde fps als final assembly, zodat de clips daar niet opnieuw gesampled worden
+  const fps = Number(config.fps ?? settings?.fps) || 30;
+  // Progressief renderen (fragmented MP4) zodat de PreviewTab al kan afspelen tijdens de render.
+  // Alleen op verzoek: een fragmented MP4 heeft een lege moov en geen +faststart, en dit zijn de
+  // clips die final assembly oplevert
+  const progressive = config.progressive === true || config.livePreview === true ? 'fmp4' : undefined;
   let generated = 0;
 
   for (const seg of mgSegments) {
@@ -1087,7 +1094,8 @@ async function executeStepMotionGraphicsFn(
 
     try {
       // Roep Python motion graphics scripts aan
-      const { execSync } = await import('child_process');
+      const { execSync, exec } = await import('child_process');
+      const { promisify } = await import('util');
 
       // Bepaal welk Python script te gebruiken
       const scriptMap: Record<string, string> = {
@@ -1111,12 +1119,52 @@ async function executeStepMotionGraphicsFn(
         output_path: outPath,
         width,
         height,
+        fps,
+        // Exact volgens de assembly spec renderen, zodat final assembly de clip kan kopiëren
+        conform: { width, height, fps },
+        progressive,
         text: seg.visual_description || seg.text_preview || '',
       });
 
-      execSync(`cd /root/video-producer-app/motion-graphics && python3 ${fullScriptPath} "${dataPath}" 2>&1`, {
-        timeout: 60_000,
-      });
+      // Timeout op basis van de kostenschatting (dry run), anders vast 60s
+      let timeoutMs = 60_000;
+      try {
+        const estimate = JSON.parse(execSync(
+          `cd /root/video-producer-app/motion-graphics && python3 -m shared.cost ${pyScript} "${dataPath}"`,
+          { timeout: 10_000 },
+        ).toString());
+        timeoutMs = Math.max(timeoutMs, estimate.timeout_s * 1000);
+        await log(`Motion graphic ${mgType}: geschat ${estimate.est_seconds}s, ${estimate.est_peak_mb.total}MB`);
+      } catch {
+        // schatting is optioneel
+      }
+
+      // Async zodat de server tijdens de render de groeiende output kan serveren
+      await fs.rm(outPath, { force: true });
+      if (progressive) startLiveRender(project.id, outPath, `${mgType} · segment ${seg.segment_id}`);
+      let output: string;
+      try {
+        output = (await promisify(exec)(
+          `cd /root/video-producer-app/motion-graphics && python3 ${fullScriptPath} "${dataPath}" 2>&1`,
+          { timeout: timeoutMs, maxBuffer: 16 * 1024 * 1024 },
+        )).stdout;
+      } finally {
+        endLiveRender(outPath);
+      }
+
+      // Render metrics (één JSON regel met prefix MG_METRICS) per segment loggen
+      const metricsLine = output.split('\n').find((l) => l.startsWith('MG_METRICS '));
+      if (metricsLine) {
+        try {
+          const m = JSON.parse(metricsLine.slice('MG_METRICS '.length));
+          const spans = Object.entries(m.spans_s || {})
+            .map(([k, v]) => `${k} ${Number(v).toFixed(2)}s`).join(', ');
+          await log(`Motion graphic ${mgType} metrics: ${m.wall_s}s totaal (${spans}), `
+            + `${m.counters?.frames_drawn ?? 0} frames, piek ${m.peak_rss_mb?.python}MB python / ${m.peak_rss_mb?.children}MB ffmpeg`);
+        } catch {
+          // metrics zijn optioneel
+        }
+      }
 
       // Check of output bestaat
       try {
@@ -669,6 +669,26 @@ export function getFileUrl(sourceUrl: string, localPath?: string): string {
   return sourceUrl || '';
 }
 
+// Motion graphics die nu (progressief) gerenderd worden
+export interface LiveRender {
+  projectId: string;
+  path: string;
+  label: string;
+  startedAt: string;
+}
+
+export const files = {
+  async getLiveRenders(projectId: string): Promise<LiveRender[]> {
+    const res = await apiFetch(`/files/live?projectId=${encodeURIComponent(projectId)}`);
+    if (!res.ok) throw new Error('Kon live renders niet ophalen');
+    return (await res.json()).renders;
+  },
+  // Volgt het bestand terwijl het nog groeit, zodat de video al afspeelt tijdens de render
+  getLiveUrl(localPath: string): string {
+    return `${getFileUrl(localPath)}&follow=1`;
+  },
+};
+
 // ── Analytics API ──
 
 export const analytics = {
@@ -1,4 +1,4 @@
-import { useState } from 'react';
+import { useState, useEffect } from 'react';
 import { Project, Step } from '../types';
 import { useStore } from '../store';
 import * as api from '../api';
@@ -56,6 +56,28 @@ export default function PreviewTab({ project }: PreviewTabProps) {
   const [audioProgress, setAudioProgress] = useState(0);
   const [sceneViewMode, setSceneViewMode] = useState<'grid' | 'list'>('grid');
 
+  // Motion graphics die nu gerenderd worden (progressief, al afspeelbaar)
+  const [liveRenders, setLiveRenders] = useState<api.LiveRender[]>([]);
+
+  useEffect(() => {
+    if (project.status !== 'running') {
+      setLiveRenders([]);
+      return;
+    }
+    let cancelled = false;
+    const poll = async () => {
+      try {
+        const renders = await api.files.getLiveRenders(project.id);
+        if (!cancelled) setLiveRenders(renders);
+      } catch {
+        // live preview is optioneel
+      }
+    };
+    poll();
+    const interval = setInterval(poll, 2000);
+    return () => { cancelled = true; clearInterval(interval); };
+  }, [project.id, project.status]);
+
   const STEP_NAMES = buildStepNames(project.steps);
 
   const getStep = (stepNumber: number) => project.steps.find(s => s.id === stepNumber);
@@ -121,6 +143,29 @@ export default function PreviewTab({ project }: PreviewTabProps) {
         </div>
       )}
 
+      {/* Live renders: spelen af terwijl de frames nog binnenkomen */}
+      {liveRenders.length > 0 && (
+        <div className="space-y-3">
+          <h3 className="text-sm font-semibold text-brand-400">Wordt nu gerenderd ({liveRenders.length})</h3>
+          {liveRenders.map(render => (
+            <div key={render.path} className="rounded-xl border border-brand-500/20 bg-brand-500/[0.04] p-4">
+              <div className="flex items-center gap-2 mb-3">
+                <span>📊</span>
+                <span className="font-semibold text-sm">{render.label}</span>
+              </div>
+              <video
+                src={api.files.getLiveUrl(render.path)}
+                autoPlay
+                muted
+                playsInline
+                controls
+                className="w-full max-h-[360px] rounded-lg bg-black"
+              />
+            </div>
+          ))}
+        </div>
+      )}
+
       {/* Review stappen bovenaan */}
       {reviewSteps.length > 0 && (
         <div className="space-y-3">